@@ -1,5 +1,8 @@
 """
 ASGI config for vsla_backend project.
+
+HTTP requests go to Django; WebSocket connections to ``/ws/chat/`` are served
+by the chat transport in ``vsla_backend.chat.websocket``.
 """
 
 import os
@@ -8,4 +11,22 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'vsla_backend.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported after Django is set up, since it loads models
+from vsla_backend.chat.websocket import chat_websocket  # noqa: E402
+
+websocket_routes = {
+    '/ws/chat/': chat_websocket,
+}
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'websocket':
+        handler = websocket_routes.get(scope['path'].rstrip('/') + '/')
+        if handler is None:
+            # Reject the handshake for unknown paths
+            await send({'type': 'websocket.close', 'code': 4404})
+            return
+        return await handler(scope, receive, send)
+    return await django_application(scope, receive, send)
@@ -0,0 +1,70 @@
+from collections import defaultdict
+
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from rest_framework import serializers
+
+from vsla_backend.users.models import full_name_expression
+from .models import ChatRoomParticipant, HealthWorkerMessage
+from .serializers import ChatRoomSerializer, HealthWorkerMessageSerializer
+
+
+def room_inbox(user):
+    """The user's active rooms as participant rows, newest conversation first.
+
+    Each row is annotated with ``unread_count`` (messages from others after
+    the ``last_read_at`` watermark, or after joining if the room was never
+    read) and ``last_message_id``. Both are correlated subqueries over the
+    ``(chat_room, timestamp, id)`` index, so the whole inbox is one query
+    whatever the number of rooms or messages.
+    """
+    messages = HealthWorkerMessage.objects.filter(chat_room=OuterRef('chat_room')).order_by()
+    unread = (
+        messages.filter(timestamp__gt=OuterRef('read_watermark'))
+        .exclude(sender=user)
+        .values('chat_room')
+        .annotate(total=Count('id'))
+        .values('total')
+    )
+    last_message = messages.order_by('-timestamp', '-id').values('id')[:1]
+
+    return (
+        ChatRoomParticipant.objects.filter(user=user, is_active=True, chat_room__is_active=True)
+        .select_related('chat_room')
+        .annotate(read_watermark=Coalesce('last_read_at', 'joined_at'))
+        .annotate(
+            unread_count=Coalesce(Subquery(unread, output_field=IntegerField()), Value(0)),
+            last_message_id=Subquery(last_message),
+        )
+        .order_by(F('chat_room__last_message_at').desc(nulls_last=True), '-chat_room__created_at', '-id')
+    )
+
+
+def serialize_inbox(participations):
+    """Render a page of ``room_inbox`` rows with three more queries, however long the page"""
+    room_ids = [participation.chat_room_id for participation in participations]
+    last_messages = HealthWorkerMessage.objects.select_related('sender').prefetch_related(
+        'message_attachments'
+    ).in_bulk([participation.last_message_id for participation in participations if participation.last_message_id])
+
+    members = defaultdict(list)
+    rows = ChatRoomParticipant.objects.filter(chat_room_id__in=room_ids, is_active=True).annotate(
+        name=full_name_expression('user')
+    ).order_by('joined_at', 'id').values('chat_room_id', 'user_id', 'name')
+    for row in rows:
+        members[row['chat_room_id']].append({'id': row['user_id'], 'name': row['name']})
+
+    datetime_field = serializers.DateTimeField()
+    entries = []
+    for participation in participations:
+        entry = ChatRoomSerializer(participation.chat_room).data
+        last_message = last_messages.get(participation.last_message_id)
+        entry.update({
+            'participants': members[participation.chat_room_id],
+            'unread_count': participation.unread_count,
+            'last_read_at': datetime_field.to_representation(participation.last_read_at)
+            if participation.last_read_at else None,
+            'last_message': HealthWorkerMessageSerializer(last_message).data if last_message else None,
+        })
+        entries.append(entry)
+    return entries
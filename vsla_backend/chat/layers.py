@@ -0,0 +1,127 @@
+"""
+Channel layers that fan chat events out to the WebSocket connections of a room.
+
+``InMemoryChannelLayer`` delivers within one ASGI worker and is the default.
+``RedisChannelLayer`` relays events through Redis pub/sub so rooms span
+several workers or nodes. Pick one with the ``CHAT_CHANNEL_LAYER`` setting.
+"""
+import asyncio
+import json
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class InMemoryChannelLayer:
+    """Process-local groups of connection callbacks.
+
+    A member is any ``async def send(event)`` callable, usually the bound
+    ``send_event`` of a connection, so an idle connection costs one set entry
+    per room rather than a queue or a task.
+    """
+
+    def __init__(self, send_timeout=5, **options):
+        self.send_timeout = send_timeout
+        self.groups = {}
+
+    async def group_add(self, group, member):
+        self.groups.setdefault(group, set()).add(member)
+
+    async def group_discard(self, group, member):
+        members = self.groups.get(group)
+        if members is None:
+            return
+        members.discard(member)
+        if not members:
+            del self.groups[group]
+
+    async def group_send(self, group, event):
+        await self.deliver(group, event)
+
+    async def deliver(self, group, event):
+        """Send ``event`` to every local member of ``group`` concurrently"""
+        members = list(self.groups.get(group, ()))
+        if not members:
+            return
+        # A slow or dead client must not hold up the rest of the room
+        await asyncio.gather(
+            *(asyncio.wait_for(member(event), self.send_timeout) for member in members),
+            return_exceptions=True,
+        )
+
+    def group_count(self):
+        return len(self.groups)
+
+    def member_count(self):
+        return sum(len(members) for members in self.groups.values())
+
+
+class RedisChannelLayer(InMemoryChannelLayer):
+    """Relay group events through Redis pub/sub for multi-worker deployments.
+
+    Each worker keeps its members locally and subscribes to a Redis channel
+    only while it has members in that group; ``group_send`` publishes and
+    every subscribed worker (including this one) delivers locally.
+    """
+
+    def __init__(self, url='redis://localhost:6379/0', prefix='vsla:chat:', **options):
+        super().__init__(**options)
+        # Imported lazily so the default in-memory layer needs no Redis client
+        import redis.asyncio as redis
+
+        self.redis = redis.from_url(url)
+        self.prefix = prefix
+        self.pubsub = None
+        self.listener = None
+
+    async def group_add(self, group, member):
+        first = group not in self.groups
+        await super().group_add(group, member)
+        if first:
+            await self._pubsub().subscribe(self.prefix + group)
+            if self.listener is None or self.listener.done():
+                self.listener = asyncio.create_task(self._listen())
+
+    async def group_discard(self, group, member):
+        await super().group_discard(group, member)
+        if group not in self.groups and self.pubsub is not None:
+            await self.pubsub.unsubscribe(self.prefix + group)
+
+    async def group_send(self, group, event):
+        await self.redis.publish(self.prefix + group, json.dumps(event, default=str))
+
+    def _pubsub(self):
+        if self.pubsub is None:
+            self.pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+        return self.pubsub
+
+    async def _listen(self):
+        while self.groups:
+            message = await self.pubsub.get_message(timeout=1.0)
+            if message is None:
+                continue
+            group = message['channel'].decode()[len(self.prefix):]
+            await self.deliver(group, json.loads(message['data']))
+
+
+_channel_layer = None
+
+
+def get_channel_layer():
+    """The process-wide channel layer configured by ``CHAT_CHANNEL_LAYER``"""
+    global _channel_layer
+    if _channel_layer is None:
+        config = getattr(settings, 'CHAT_CHANNEL_LAYER', {})
+        backend = import_string(config.get('BACKEND', 'vsla_backend.chat.layers.InMemoryChannelLayer'))
+        _channel_layer = backend(**config.get('OPTIONS', {}))
+    return _channel_layer
+
+
+def room_group(room_id):
+    return f'room.{room_id}'
+
+
+def broadcast(room_id, event):
+    """Fan an event out to a room from synchronous code such as a REST view"""
+    async_to_sync(get_channel_layer().group_send)(room_group(room_id), event)
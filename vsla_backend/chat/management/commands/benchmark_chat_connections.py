@@ -0,0 +1,127 @@
+import asyncio
+import json
+import time
+import tracemalloc
+import uuid
+
+from asgiref.sync import async_to_sync
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework_simplejwt.tokens import AccessToken
+
+from vsla_backend.chat.layers import get_channel_layer
+from vsla_backend.chat.models import ChatRoom, ChatRoomParticipant
+from vsla_backend.chat.websocket import chat_websocket
+from vsla_backend.users.models import UserProfile
+
+
+class FakeSocket:
+    """Minimal in-process ASGI WebSocket client, so the server side dominates the measurement"""
+    __slots__ = ('pending', 'waiter', 'received', 'on_receive')
+
+    def __init__(self):
+        self.pending = [{'type': 'websocket.connect'}]
+        self.waiter = None
+        self.received = 0
+        self.on_receive = None
+
+    async def receive(self):
+        while not self.pending:
+            self.waiter = asyncio.get_running_loop().create_future()
+            await self.waiter
+        return self.pending.pop(0)
+
+    def push(self, event):
+        self.pending.append(event)
+        if self.waiter is not None and not self.waiter.done():
+            self.waiter.set_result(None)
+
+    async def send(self, event):
+        if event['type'] == 'websocket.send':
+            self.received += 1
+            if self.on_receive:
+                self.on_receive(json.loads(event['text']))
+
+
+class Command(BaseCommand):
+    help = 'Open many idle chat WebSocket connections in-process and report memory and fan-out latency'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--connections', type=int, default=2000)
+        parser.add_argument('--room-size', type=int, default=50, help='Participants per room')
+
+    def handle(self, *args, **options):
+        if options['connections'] < options['room_size'] or options['room_size'] < 2:
+            raise CommandError('Need at least two participants per room and one full room')
+        # Seeded users and rooms are rolled back afterwards
+        with transaction.atomic():
+            users, rooms = self._seed(options['connections'], options['room_size'])
+            async_to_sync(self._run)(users, rooms)
+            transaction.set_rollback(True)
+
+    def _seed(self, connections, room_size):
+        prefix = f'ws{uuid.uuid4().hex[:8]}'
+        UserProfile.objects.bulk_create([
+            UserProfile(username=f'{prefix}{i}', phone_number=f'{prefix}{i}') for i in range(connections)
+        ])
+        users = list(UserProfile.objects.filter(username__startswith=prefix).order_by('id'))
+        rooms = ChatRoom.objects.bulk_create([
+            ChatRoom(room_type='group', name=f'{prefix} room {i}', created_by=users[0])
+            for i in range(connections // room_size)
+        ])
+        ChatRoomParticipant.objects.bulk_create([
+            ChatRoomParticipant(chat_room=rooms[i // room_size], user=user)
+            for i, user in enumerate(users[:len(rooms) * room_size])
+        ])
+        return users, rooms
+
+    async def _run(self, users, rooms):
+        tokens = [str(AccessToken.for_user(user)) for user in users]
+        layer = get_channel_layer()
+
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        started = time.perf_counter()
+        sockets, tasks = [], []
+        for token in tokens:
+            socket = FakeSocket()
+            scope = {'type': 'websocket', 'path': '/ws/chat/', 'query_string': f'token={token}'.encode(), 'headers': []}
+            sockets.append(socket)
+            tasks.append(asyncio.ensure_future(chat_websocket(scope, socket.receive, socket.send)))
+        # Wait until every connection has joined its room and is idle in receive()
+        while layer.member_count() < len(rooms) * (len(users) // len(rooms)):
+            await asyncio.sleep(0.05)
+        connect_seconds = time.perf_counter() - started
+        per_connection = (tracemalloc.get_traced_memory()[0] - baseline) / len(sockets)
+        tracemalloc.stop()
+
+        self.stdout.write(f'{len(sockets)} connections open in {connect_seconds:.1f}s')
+        self.stdout.write(f'~{per_connection / 1024:.1f} KiB of Python heap per idle connection (including the fake client)')
+
+        # Fan one message out to the first room and time until every member has it
+        room_size = len(users) // len(rooms)
+        members = sockets[:room_size]
+        done = asyncio.get_running_loop().create_future()
+        pending = {'count': room_size}
+
+        def on_receive(event):
+            if event.get('type') == 'message':
+                pending['count'] -= 1
+                if pending['count'] == 0 and not done.done():
+                    done.set_result(None)
+
+        for socket in members:
+            socket.on_receive = on_receive
+        started = time.perf_counter()
+        members[0].push({'type': 'websocket.receive', 'text': json.dumps(
+            {'type': 'message', 'room': rooms[0].id, 'message': 'benchmark'}
+        )})
+        await asyncio.wait_for(done, 30)
+        self.stdout.write(f'Fan-out to {room_size} members in {(time.perf_counter() - started) * 1000:.1f} ms')
+
+        for socket in sockets:
+            socket.push({'type': 'websocket.disconnect'})
+        await asyncio.gather(*tasks)
+        if layer.member_count():
+            raise CommandError(f'{layer.member_count()} memberships left behind after disconnect')
+        self.stdout.write(self.style.SUCCESS('All connections closed cleanly'))
@@ -0,0 +1,36 @@
+import os
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from vsla_backend.chat.models import AttachmentUpload
+from vsla_backend.chat.uploads import hash_states, part_path
+
+
+class Command(BaseCommand):
+    help = 'Delete chunked attachment uploads that stopped receiving data, along with their part files'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=48, help='Idle time after which an upload is abandoned')
+
+    def handle(self, *args, **options):
+        if options['hours'] < 1:
+            raise CommandError('--hours must be at least 1')
+
+        cutoff = timezone.now() - timedelta(hours=options['hours'])
+        # An upload left 'assembling' for that long belongs to a completion that crashed
+        stale = AttachmentUpload.objects.filter(status__in=['uploading', 'assembling'], updated_at__lt=cutoff)
+        purged = freed = 0
+        for upload in stale.iterator():
+            path = part_path(upload)
+            if os.path.exists(path):
+                freed += os.path.getsize(path)
+                os.remove(path)
+            hash_states.discard(upload.upload_id)
+            upload.delete()
+            purged += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Purged {purged} abandoned uploads ({freed / (1024 * 1024):.1f} MiB of part files)'
+        ))
@@ -1,3 +1,5 @@
+import uuid
+
 from django.db import models
 from vsla_backend.users.models import UserProfile
 
@@ -13,7 +15,17 @@ class HealthWorkerMessage(models.Model):
     receiver = models.ForeignKey(
         UserProfile, 
         on_delete=models.CASCADE, 
-        related_name='received_messages'
+        related_name='received_messages',
+        null=True,
+        blank=True,
+        help_text="Set for direct messages; group room messages go to every participant"
+    )
+    chat_room = models.ForeignKey(
+        'ChatRoom',
+        on_delete=models.CASCADE,
+        related_name='messages',
+        null=True,
+        blank=True
     )
     
     # Message content
@@ -58,24 +70,29 @@ class HealthWorkerMessage(models.Model):
             models.Index(fields=['sender', 'receiver', 'timestamp']),
             models.Index(fields=['receiver', 'is_read', 'timestamp']),
             models.Index(fields=['timestamp']),
+            models.Index(fields=['chat_room', 'timestamp', 'id']),
         ]
     
     def __str__(self):
-        return f"{self.sender.get_full_name()} → {self.receiver.get_full_name()}: {self.message[:50]}"
+        recipient = self.receiver.get_full_name() if self.receiver_id else str(self.chat_room)
+        return f"{self.sender.get_full_name()} → {recipient}: {self.message[:50]}"
     
     def mark_as_read(self):
         """Mark message as read"""
         from django.utils import timezone
+        # Conditional UPDATE so a stale instance can't overwrite an earlier read_at;
+        # WebSocket receipts go through chat.receipts in batches instead
         if not self.is_read:
+            read_at = timezone.now()
+            if HealthWorkerMessage.objects.filter(pk=self.pk, is_read=False).update(is_read=True, read_at=read_at):
+                self.read_at = read_at
             self.is_read = True
-            self.read_at = timezone.now()
-            self.save(update_fields=['is_read', 'read_at'])
     
     def mark_as_delivered(self):
         """Mark message as delivered"""
         if not self.is_delivered:
+            HealthWorkerMessage.objects.filter(pk=self.pk, is_delivered=False).update(is_delivered=True)
             self.is_delivered = True
-            self.save(update_fields=['is_delivered'])
     
     def edit_message(self, new_message):
         """Edit the message content"""
@@ -135,7 +152,7 @@ class ChatRoom(models.Model):
     
     def get_last_message(self):
         """Get the last message in the chat room"""
-        return self.messages.order_by('-timestamp').first()
+        return self.messages.order_by('-timestamp', '-id').first()
     
     def update_last_message_time(self):
         """Update the last message timestamp"""
@@ -188,16 +205,21 @@ class ChatRoomParticipant(models.Model):
     def mark_as_read(self):
         """Mark all messages as read for this participant"""
         from django.utils import timezone
-        self.last_read_at = timezone.now()
-        self.save(update_fields=['last_read_at'])
+        now = timezone.now()
         
-        # Mark unread messages as read
-        unread_messages = HealthWorkerMessage.objects.filter(
-            receiver=self.user,
-            chat_room=self.chat_room,
-            is_read=False
-        )
-        unread_messages.update(is_read=True, read_at=timezone.now())
+        # Unread counts come from this watermark; it only ever moves forwards
+        ChatRoomParticipant.objects.filter(pk=self.pk).filter(
+            models.Q(last_read_at__isnull=True) | models.Q(last_read_at__lt=now)
+        ).update(last_read_at=now)
+        self.last_read_at = now
+        
+        # Keep the per-message flags of direct messages in step, in one UPDATE
+        HealthWorkerMessage.objects.filter(
+            chat_room_id=self.chat_room_id,
+            receiver_id=self.user_id,
+            is_read=False,
+            timestamp__lte=now
+        ).update(is_read=True, read_at=now)
 
 
 class MessageAttachment(models.Model):
@@ -222,10 +244,18 @@ class MessageAttachment(models.Model):
     file_name = models.CharField(max_length=255)
     file_size = models.PositiveIntegerField(help_text="File size in bytes")
     file_type = models.CharField(max_length=20, choices=ATTACHMENT_TYPE_CHOICES)
+    content_hash = models.CharField(
+        max_length=64, blank=True, db_index=True, help_text="SHA-256 of the file; identical uploads share one file"
+    )
     
     # Metadata
     description = models.CharField(max_length=500, blank=True)
     is_processed = models.BooleanField(default=False)
+    variants = models.JSONField(default=dict, blank=True, help_text="Downscaled copies of images by size name")
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+    duration = models.FloatField(null=True, blank=True, help_text="Length of audio in seconds")
+    media_metadata = models.JSONField(default=dict, blank=True)
     
     # Timestamps
     uploaded_at = models.DateTimeField(auto_now_add=True)
@@ -245,3 +275,49 @@ class MessageAttachment(models.Model):
     def get_file_extension(self):
         """Get file extension"""
         return self.file_name.split('.')[-1].lower() if '.' in self.file_name else ''
+
+
+class AttachmentUpload(models.Model):
+    """A resumable, chunked upload that becomes a MessageAttachment once complete"""
+    
+    STATUS_CHOICES = [
+        ('uploading', 'Uploading'),
+        ('assembling', 'Assembling'),
+        ('completed', 'Completed'),
+    ]
+    
+    upload_id = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    user = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='attachment_uploads')
+    chat_room = models.ForeignKey(ChatRoom, on_delete=models.CASCADE, related_name='attachment_uploads')
+    message = models.ForeignKey(
+        HealthWorkerMessage, on_delete=models.CASCADE, null=True, blank=True, related_name='attachment_uploads',
+        help_text="Existing message to attach to; a new message is sent on completion otherwise"
+    )
+    
+    # File information
+    file_name = models.CharField(max_length=255)
+    file_type = models.CharField(max_length=20, choices=MessageAttachment.ATTACHMENT_TYPE_CHOICES)
+    description = models.CharField(max_length=500, blank=True)
+    total_size = models.PositiveBigIntegerField(help_text="Declared size in bytes")
+    received_bytes = models.PositiveBigIntegerField(default=0)
+    expected_hash = models.CharField(max_length=64, blank=True, help_text="Optional SHA-256 to verify against")
+    
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='uploading')
+    attachment = models.OneToOneField(
+        MessageAttachment, on_delete=models.SET_NULL, null=True, blank=True, related_name='upload'
+    )
+    
+    # Timestamps
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Attachment Upload'
+        verbose_name_plural = 'Attachment Uploads'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'updated_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.file_name} ({self.received_bytes}/{self.total_size} bytes)"
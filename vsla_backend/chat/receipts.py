@@ -0,0 +1,163 @@
+"""
+Write-behind batching of chat read and delivered receipts.
+
+A busy room produces a receipt per message per reader. Instead of one UPDATE
+each, receipts are folded into a high-water mark per ``(user, room)`` and
+written by ``apply_receipts`` as one range UPDATE per key, every
+``flush_interval`` seconds or as soon as ``max_batch`` keys are waiting.
+
+Receipts are watermarks that only move forwards, so applying one twice is
+harmless. A flush swaps the pending keys out for an empty buffer, which keeps
+collecting receipts while the batch is written; if the write fails the batch
+is merged back into the buffer and retried, and the room is told about a
+receipt only once it is stored. Clients resend receipts that were never
+confirmed after reconnecting, which gives at-least-once delivery even if a
+worker dies with a full buffer.
+"""
+import asyncio
+import time
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.db.models import Q
+
+from .models import ChatRoomParticipant, HealthWorkerMessage
+
+
+def apply_receipts(read, delivered):
+    """Store a batch of coalesced receipts in one transaction.
+
+    ``read`` maps ``(user_id, room_id)`` to ``(message_id, read_at)`` where
+    either may be None; ``delivered`` maps ``(user_id, room_id)`` to the
+    highest message id received. Returns the watermarks that actually moved,
+    in the same shapes: ``({key: read_at}, {key: message_id})``.
+    """
+    moved_read, moved_delivered = {}, {}
+    with transaction.atomic():
+        message_ids = [message_id for message_id, _ in read.values() if message_id]
+        stamps = {
+            message_id: (room_id, timestamp)
+            for message_id, room_id, timestamp in HealthWorkerMessage.objects.filter(id__in=message_ids)
+            .values_list('id', 'chat_room_id', 'timestamp')
+        }
+
+        for (user_id, room_id), (message_id, read_at) in read.items():
+            candidates = [read_at] if read_at else []
+            if message_id in stamps and stamps[message_id][0] == room_id:
+                candidates.append(stamps[message_id][1])
+            if not candidates:
+                continue
+            read_at = max(candidates)
+
+            moved = ChatRoomParticipant.objects.filter(chat_room_id=room_id, user_id=user_id).filter(
+                Q(last_read_at__isnull=True) | Q(last_read_at__lt=read_at)
+            ).update(last_read_at=read_at)
+            if moved:
+                HealthWorkerMessage.objects.filter(
+                    chat_room_id=room_id, receiver_id=user_id, is_read=False, timestamp__lte=read_at
+                ).update(is_read=True, read_at=read_at)
+                moved_read[(user_id, room_id)] = read_at
+
+        for (user_id, room_id), up_to in delivered.items():
+            updated = HealthWorkerMessage.objects.filter(
+                chat_room_id=room_id, id__lte=up_to, is_delivered=False
+            ).exclude(sender_id=user_id).update(is_delivered=True)
+            if updated:
+                moved_delivered[(user_id, room_id)] = up_to
+
+    return moved_read, moved_delivered
+
+
+class ReceiptCoalescer:
+    """Buffer receipts inside an ASGI worker and flush them in batches.
+
+    ``on_flush(read, delivered)`` is awaited after each committed flush with
+    the watermarks that moved, e.g. to tell the rooms.
+    """
+
+    def __init__(self, flush_interval=0.25, max_batch=200, on_flush=None):
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.on_flush = on_flush
+        self.read = {}
+        self.delivered = {}
+        self.lock = asyncio.Lock()
+        self.timer = None
+        self.metrics = {
+            'received': 0,
+            'flushes': 0,
+            'flushed_keys': 0,
+            'failed_flushes': 0,
+            'last_flush_ms': 0.0,
+            'max_flush_ms': 0.0,
+        }
+
+    def depth(self):
+        """Number of ``(user, room)`` keys waiting for the next flush, not the batch in flight"""
+        return len(self.read.keys() | self.delivered.keys())
+
+    def stats(self):
+        return dict(self.metrics, buffered=self.depth())
+
+    def add_read(self, user_id, room_id, message_id=None, read_at=None):
+        self._merge_read((user_id, room_id), message_id, read_at)
+        self._received()
+
+    def add_delivered(self, user_id, room_id, up_to):
+        self._merge_delivered((user_id, room_id), up_to)
+        self._received()
+
+    def _merge_read(self, key, message_id, read_at):
+        previous_id, previous_at = self.read.get(key, (None, None))
+        self.read[key] = (
+            max(filter(None, (previous_id, message_id)), default=None),
+            max(filter(None, (previous_at, read_at)), default=None),
+        )
+
+    def _merge_delivered(self, key, up_to):
+        self.delivered[key] = max(self.delivered.get(key, up_to), up_to)
+
+    def _received(self):
+        self.metrics['received'] += 1
+        if self.depth() >= self.max_batch:
+            asyncio.ensure_future(self.flush())
+        else:
+            self._schedule()
+
+    def _schedule(self):
+        if self.timer is None:
+            self.timer = asyncio.get_running_loop().call_later(
+                self.flush_interval, lambda: asyncio.ensure_future(self.flush())
+            )
+
+    async def flush(self):
+        async with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            if not self.read and not self.delivered:
+                return
+
+            read, self.read = self.read, {}
+            delivered, self.delivered = self.delivered, {}
+            started = time.perf_counter()
+            try:
+                moved_read, moved_delivered = await sync_to_async(apply_receipts)(read, delivered)
+            except Exception:
+                # Put the batch back, merged with anything newer, and retry on the next tick
+                self.metrics['failed_flushes'] += 1
+                for key, (message_id, read_at) in read.items():
+                    self._merge_read(key, message_id, read_at)
+                for key, up_to in delivered.items():
+                    self._merge_delivered(key, up_to)
+                self._schedule()
+                return
+
+            elapsed = (time.perf_counter() - started) * 1000
+            self.metrics['flushes'] += 1
+            self.metrics['flushed_keys'] += len(read.keys() | delivered.keys())
+            self.metrics['last_flush_ms'] = elapsed
+            self.metrics['max_flush_ms'] = max(self.metrics['max_flush_ms'], elapsed)
+
+        if self.on_flush is not None:
+            await self.on_flush(moved_read, moved_delivered)
@@ -0,0 +1,88 @@
+from rest_framework import serializers
+from vsla_backend.media_processing.serializers import VariantURLsField
+from .models import AttachmentUpload, ChatRoom, HealthWorkerMessage, MessageAttachment
+
+
+class MessageAttachmentSerializer(serializers.ModelSerializer):
+    """Serializer for message attachments, with downscaled image variants once processed"""
+    variants = VariantURLsField()
+    
+    class Meta:
+        model = MessageAttachment
+        fields = [
+            'id', 'message', 'file', 'file_name', 'file_size', 'file_type', 'content_hash',
+            'description', 'is_processed', 'variants', 'width', 'height', 'duration', 'uploaded_at'
+        ]
+        read_only_fields = fields
+
+
+class HealthWorkerMessageSerializer(serializers.ModelSerializer):
+    """Serializer for chat messages"""
+    sender_name = serializers.CharField(source='sender.get_full_name', read_only=True)
+    files = MessageAttachmentSerializer(source='message_attachments', many=True, read_only=True)
+    
+    class Meta:
+        model = HealthWorkerMessage
+        fields = [
+            'id', 'chat_room', 'sender', 'sender_name', 'receiver', 'message', 'message_type',
+            'is_delivered', 'is_edited', 'timestamp', 'edited_at', 'reply_to', 'attachments', 'files'
+        ]
+        read_only_fields = [
+            'id', 'chat_room', 'sender', 'receiver', 'is_delivered', 'is_edited', 'timestamp', 'edited_at'
+        ]
+
+
+class ChatRoomSerializer(serializers.ModelSerializer):
+    """Serializer for chat rooms"""
+    
+    class Meta:
+        model = ChatRoom
+        fields = [
+            'id', 'room_type', 'name', 'description', 'is_private', 'created_by',
+            'last_message_at', 'created_at'
+        ]
+        read_only_fields = fields
+
+
+class ChatMessageCreateSerializer(serializers.Serializer):
+    """Serializer for messages sent over the REST API"""
+    chat_room = serializers.IntegerField()
+    message = serializers.CharField(trim_whitespace=False)
+    message_type = serializers.ChoiceField(
+        choices=HealthWorkerMessage._meta.get_field('message_type').choices, default='text'
+    )
+    reply_to = serializers.IntegerField(required=False, allow_null=True)
+    
+    def validate_message(self, value):
+        if not value.strip():
+            raise serializers.ValidationError('Message cannot be empty')
+        return value
+
+
+class AttachmentUploadSerializer(serializers.ModelSerializer):
+    """Serializer for opening a chunked attachment upload and reporting its progress"""
+    
+    class Meta:
+        model = AttachmentUpload
+        fields = [
+            'upload_id', 'chat_room', 'message', 'file_name', 'file_type', 'description',
+            'total_size', 'expected_hash', 'received_bytes', 'status', 'attachment', 'created_at'
+        ]
+        read_only_fields = ['upload_id', 'received_bytes', 'status', 'attachment', 'created_at']
+    
+    def validate_total_size(self, value):
+        from .uploads import UPLOAD_MAX_BYTES
+        if not 0 < value <= UPLOAD_MAX_BYTES:
+            raise serializers.ValidationError(f'Attachments must be between 1 and {UPLOAD_MAX_BYTES} bytes')
+        return value
+    
+    def validate_expected_hash(self, value):
+        if value and (len(value) != 64 or any(c not in '0123456789abcdef' for c in value.lower())):
+            raise serializers.ValidationError('expected_hash must be a hex SHA-256 digest')
+        return value.lower()
+    
+    def validate(self, attrs):
+        message = attrs.get('message')
+        if message is not None and message.chat_room_id != attrs['chat_room'].id:
+            raise serializers.ValidationError({'message': 'Message is not in this chat room'})
+        return attrs
@@ -0,0 +1,237 @@
+"""
+Chunked, resumable uploads for chat attachments.
+
+A client opens an ``AttachmentUpload``, appends the file in chunks at the
+offset the server reports, and completes it. Chunks are streamed straight to a
+part file in small blocks, so memory use does not grow with the file or chunk
+size. If a link drops, the client asks for the current offset and carries on
+from there.
+
+The SHA-256 of the file is carried forward chunk by chunk in process memory.
+If that state was lost (restart, another worker, a retried chunk), the part
+file is hashed again when the upload completes. Completed files are stored
+under their hash, so identical voice notes or videos are kept once. Saving the
+attachment queues it for the ``process_media`` worker.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import AttachmentUpload, ChatRoom, HealthWorkerMessage, MessageAttachment
+
+
+CHUNK_MAX_BYTES = getattr(settings, 'CHAT_UPLOAD_CHUNK_MAX_BYTES', 4 * 1024 * 1024)
+UPLOAD_MAX_BYTES = getattr(settings, 'CHAT_UPLOAD_MAX_BYTES', 100 * 1024 * 1024)
+BLOCK_SIZE = 64 * 1024
+
+# Message type sent for each attachment type when the upload creates the message
+MESSAGE_TYPES = {
+    'image': 'image',
+    'audio': 'voice',
+    'video': 'video',
+    'document': 'file',
+    'other': 'file',
+}
+
+
+class UploadError(Exception):
+    """An upload request that cannot be applied; ``offset`` is the server's current offset"""
+
+    def __init__(self, message, offset=None):
+        super().__init__(message)
+        self.offset = offset
+
+
+class HashStates:
+    """Running SHA-256 per upload, bounded so abandoned uploads cannot pile up"""
+
+    def __init__(self, limit=256):
+        self.limit = limit
+        self.states = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, upload_id, offset):
+        """The running hash if it covers exactly the first ``offset`` bytes"""
+        with self.lock:
+            state = self.states.get(upload_id)
+            if state is None or state[0] != offset:
+                return None
+            return state[1].copy()
+
+    def put(self, upload_id, offset, digest):
+        with self.lock:
+            self.states[upload_id] = (offset, digest)
+            self.states.move_to_end(upload_id)
+            while len(self.states) > self.limit:
+                self.states.popitem(last=False)
+
+    def discard(self, upload_id):
+        with self.lock:
+            self.states.pop(upload_id, None)
+
+
+hash_states = HashStates()
+
+
+def part_path(upload):
+    directory = os.path.join(settings.MEDIA_ROOT, 'chat_uploads')
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, f'{upload.upload_id}.part')
+
+
+def append_chunk(upload, stream, offset, length):
+    """Write ``length`` bytes from ``stream`` at ``offset`` and return the new offset.
+
+    ``offset`` must equal the bytes received so far; a retried chunk that
+    the server already has is rejected with the current offset so the client
+    can skip ahead.
+    """
+    if upload.status != 'uploading':
+        raise UploadError('Upload is already complete', upload.received_bytes)
+    if offset != upload.received_bytes:
+        raise UploadError('Offset does not match the bytes received', upload.received_bytes)
+    if length <= 0 or length > CHUNK_MAX_BYTES:
+        raise UploadError(f'Chunks must be between 1 and {CHUNK_MAX_BYTES} bytes', upload.received_bytes)
+    if offset + length > upload.total_size:
+        raise UploadError('Chunk runs past the declared size', upload.received_bytes)
+
+    digest = hash_states.get(upload.upload_id, offset)
+    path = part_path(upload)
+    written = 0
+    with open(path, 'r+b' if os.path.exists(path) else 'wb') as part:
+        part.seek(offset)
+        while written < length:
+            block = stream.read(min(BLOCK_SIZE, length - written))
+            if not block:
+                break
+            part.write(block)
+            if digest is not None:
+                digest.update(block)
+            written += len(block)
+        # Drop anything a previous, interrupted attempt left past this chunk
+        part.truncate(offset + written)
+
+    if written != length:
+        raise UploadError('Chunk ended early', upload.received_bytes)
+
+    # Only one request may move the offset; a concurrent duplicate loses here
+    new_offset = offset + written
+    # update() skips auto_now, and purge_stale_uploads judges idleness by updated_at
+    moved = AttachmentUpload.objects.filter(pk=upload.pk, received_bytes=offset, status='uploading').update(
+        received_bytes=new_offset, updated_at=timezone.now()
+    )
+    if not moved:
+        upload.refresh_from_db(fields=['received_bytes'])
+        raise UploadError('Offset does not match the bytes received', upload.received_bytes)
+
+    upload.received_bytes = new_offset
+    if digest is not None:
+        hash_states.put(upload.upload_id, new_offset, digest)
+    return new_offset
+
+
+def start_upload(upload):
+    """Register the running hash of a freshly opened upload"""
+    hash_states.put(upload.upload_id, 0, hashlib.sha256())
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as part:
+        for block in iter(lambda: part.read(BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def complete_upload(upload):
+    """Assemble a fully received upload into a MessageAttachment.
+
+    Returns ``(attachment, message, deduplicated)``. When another attachment
+    already has the same content, its stored file is reused and the part file
+    is dropped. The upload is claimed first, so a retried request that races
+    the original one is rejected instead of creating a second message.
+    """
+    if upload.status != 'uploading':
+        raise UploadError('Upload is already complete', upload.received_bytes)
+    if upload.received_bytes != upload.total_size:
+        raise UploadError('Upload is missing bytes', upload.received_bytes)
+
+    claimed = AttachmentUpload.objects.filter(
+        pk=upload.pk, status='uploading', received_bytes=upload.total_size
+    ).update(status='assembling', updated_at=timezone.now())
+    if not claimed:
+        upload.refresh_from_db(fields=['status', 'received_bytes'])
+        raise UploadError('Upload is already being completed', upload.received_bytes)
+
+    try:
+        attachment, message, deduplicated = assemble_upload(upload)
+    except BaseException:
+        # Hand the upload back so the client can retry the completion
+        AttachmentUpload.objects.filter(pk=upload.pk, status='assembling').update(
+            status='uploading', updated_at=timezone.now()
+        )
+        raise
+
+    hash_states.discard(upload.upload_id)
+    try:
+        os.remove(part_path(upload))
+    except FileNotFoundError:
+        pass
+    return attachment, message, deduplicated
+
+
+def assemble_upload(upload):
+    """Store the part file of a claimed upload and create its attachment and message"""
+    path = part_path(upload)
+    digest = hash_states.get(upload.upload_id, upload.received_bytes)
+    content_hash = digest.hexdigest() if digest is not None else file_hash(path)
+    if upload.expected_hash and upload.expected_hash.lower() != content_hash:
+        raise UploadError('Content hash does not match', upload.received_bytes)
+
+    existing = MessageAttachment.objects.filter(
+        content_hash=content_hash, file_size=upload.total_size
+    ).exclude(file='').only('file').first()
+    if existing is not None:
+        stored_name = existing.file.name
+    else:
+        extension = os.path.splitext(upload.file_name)[1].lower()[:10]
+        with open(path, 'rb') as part:
+            stored_name = default_storage.save(
+                f'chat_attachments/{content_hash[:2]}/{content_hash}{extension}', File(part)
+            )
+
+    with transaction.atomic():
+        message = upload.message
+        if message is None:
+            message = HealthWorkerMessage.objects.create(
+                sender_id=upload.user_id,
+                chat_room_id=upload.chat_room_id,
+                message=upload.description or upload.file_name,
+                message_type=MESSAGE_TYPES[upload.file_type],
+            )
+            ChatRoom.objects.filter(pk=upload.chat_room_id).filter(
+                Q(last_message_at__isnull=True) | Q(last_message_at__lt=message.timestamp)
+            ).update(last_message_at=message.timestamp)
+
+        attachment = MessageAttachment.objects.create(
+            message=message,
+            file=stored_name,
+            file_name=upload.file_name,
+            file_size=upload.total_size,
+            file_type=upload.file_type,
+            content_hash=content_hash,
+            description=upload.description,
+        )
+        upload.status = 'completed'
+        upload.message = message
+        upload.attachment = attachment
+        upload.save(update_fields=['status', 'message', 'attachment', 'updated_at'])
+    return attachment, message, existing is not None
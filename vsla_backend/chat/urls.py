@@ -0,0 +1,19 @@
+from django.urls import path
+from . import views
+
+app_name = 'chat'
+
+urlpatterns = [
+    # Inbox and rooms
+    path('chat/rooms/', views.ChatRoomInboxView.as_view(), name='chat-room-inbox'),
+    path('chat/rooms/<int:room_id>/read/', views.mark_room_read, name='chat-room-read'),
+    
+    # Messages
+    path('chat/messages/', views.ChatMessageCreateView.as_view(), name='chat-message-create'),
+    path('chat/messages/<int:room_id>/', views.ChatRoomMessagesView.as_view(), name='chat-room-messages'),
+    
+    # Chunked attachment uploads
+    path('chat/uploads/', views.AttachmentUploadView.as_view(), name='chat-upload-create'),
+    path('chat/uploads/<uuid:upload_id>/', views.AttachmentUploadDetailView.as_view(), name='chat-upload-detail'),
+    path('chat/uploads/<uuid:upload_id>/complete/', views.complete_attachment_upload, name='chat-upload-complete'),
+]
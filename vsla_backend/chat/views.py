@@ -0,0 +1,182 @@
+from rest_framework import status, generics, permissions
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from vsla_backend.pagination import KeysetPagination
+from .inbox import room_inbox, serialize_inbox
+from .layers import broadcast
+from .models import AttachmentUpload, ChatRoomParticipant, HealthWorkerMessage
+from .serializers import (
+    AttachmentUploadSerializer, HealthWorkerMessageSerializer, ChatMessageCreateSerializer,
+    MessageAttachmentSerializer
+)
+from .uploads import UploadError, append_chunk, complete_upload, start_upload
+from .websocket import active_room_ids, create_message, mark_read, message_event, read_event
+
+
+class ChatMessageCursorPagination(KeysetPagination):
+    """Keyset pagination over a room's history, newest first"""
+    ordering = ('-timestamp', '-id')
+    page_size = 50
+
+
+class ChatRoomInboxView(generics.ListAPIView):
+    """List the user's chat rooms with the last message and unread count of each"""
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get_queryset(self):
+        return room_inbox(self.request.user)
+    
+    def list(self, request, *args, **kwargs):
+        page = self.paginate_queryset(self.get_queryset())
+        if page is not None:
+            return self.get_paginated_response(serialize_inbox(page))
+        return Response(serialize_inbox(list(self.get_queryset())))
+
+
+class ChatRoomMessagesView(generics.ListAPIView):
+    """Message history of a room, newest first, paginated by cursor"""
+    serializer_class = HealthWorkerMessageSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = ChatMessageCursorPagination
+    
+    def list(self, request, *args, **kwargs):
+        if not active_room_ids(request.user, [self.kwargs['room_id']]):
+            return Response({'error': 'Not a participant of this room'}, status=status.HTTP_403_FORBIDDEN)
+        return super().list(request, *args, **kwargs)
+    
+    def get_queryset(self):
+        return HealthWorkerMessage.objects.filter(
+            chat_room_id=self.kwargs['room_id']
+        ).select_related('sender').prefetch_related('message_attachments')
+
+
+class ChatMessageCreateView(APIView):
+    """Send a message to a room the user takes part in"""
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def post(self, request):
+        serializer = ChatMessageCreateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        
+        if not active_room_ids(request.user, [data['chat_room']]):
+            return Response({'error': 'Not a participant of this room'}, status=status.HTTP_403_FORBIDDEN)
+        
+        payload = create_message(
+            request.user, data['chat_room'], data['message'], data['message_type'], data.get('reply_to')
+        )
+        # Reach clients connected over WebSocket as well
+        broadcast(data['chat_room'], message_event(data['chat_room'], payload))
+        return Response(payload, status=status.HTTP_201_CREATED)
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def mark_room_read(request, room_id):
+    """Move the user's read watermark in a room to now, or to ``message_id``"""
+    participation = ChatRoomParticipant.objects.filter(
+        chat_room_id=room_id, user=request.user, is_active=True
+    ).first()
+    if participation is None:
+        return Response({'error': 'Not a participant of this room'}, status=status.HTTP_403_FORBIDDEN)
+    
+    message_id = request.data.get('message_id')
+    if message_id is not None and not isinstance(message_id, int):
+        return Response({'error': 'message_id must be a message id'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    read_at = mark_read(request.user, room_id, message_id)
+    if read_at is not None:
+        broadcast(room_id, read_event(request.user.id, room_id, read_at))
+    participation.refresh_from_db(fields=['last_read_at'])
+    return Response({
+        'room': room_id,
+        'last_read_at': participation.last_read_at
+    })
+
+
+class AttachmentUploadView(APIView):
+    """Open a chunked, resumable attachment upload"""
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def post(self, request):
+        serializer = AttachmentUploadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        
+        if not active_room_ids(request.user, [data['chat_room'].id]):
+            return Response({'error': 'Not a participant of this room'}, status=status.HTTP_403_FORBIDDEN)
+        if data.get('message') is not None and data['message'].sender_id != request.user.id:
+            return Response({'error': 'Attachments can only be added to your own messages'}, status=status.HTTP_403_FORBIDDEN)
+        
+        upload = serializer.save(user=request.user)
+        start_upload(upload)
+        return Response(AttachmentUploadSerializer(upload).data, status=status.HTTP_201_CREATED)
+
+
+class AttachmentUploadDetailView(APIView):
+    """Report an upload's offset (GET) or append the next chunk at ``Upload-Offset`` (PUT)"""
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get_upload(self, request, upload_id):
+        return AttachmentUpload.objects.filter(upload_id=upload_id, user=request.user).first()
+    
+    def get(self, request, upload_id):
+        upload = self.get_upload(request, upload_id)
+        if upload is None:
+            return Response({'error': 'Upload not found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(AttachmentUploadSerializer(upload).data)
+    
+    def put(self, request, upload_id):
+        upload = self.get_upload(request, upload_id)
+        if upload is None:
+            return Response({'error': 'Upload not found'}, status=status.HTTP_404_NOT_FOUND)
+        try:
+            offset = int(request.headers.get('Upload-Offset', ''))
+            length = int(request.headers.get('Content-Length', ''))
+        except ValueError:
+            return Response(
+                {'error': 'Upload-Offset and Content-Length headers are required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # The raw body is streamed to disk; request.data is never touched
+        try:
+            received = append_chunk(upload, request, offset, length)
+        except UploadError as error:
+            return Response(
+                {'error': str(error), 'received_bytes': error.offset}, status=status.HTTP_409_CONFLICT
+            )
+        return Response({'upload_id': upload.upload_id, 'received_bytes': received, 'total_size': upload.total_size})
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def complete_attachment_upload(request, upload_id):
+    """Assemble a fully received upload into a message attachment"""
+    upload = AttachmentUpload.objects.filter(
+        upload_id=upload_id, user=request.user
+    ).select_related('message').first()
+    if upload is None:
+        return Response({'error': 'Upload not found'}, status=status.HTTP_404_NOT_FOUND)
+    if upload.status == 'completed':
+        # Completing twice is a no-op so clients can retry safely
+        return Response({
+            'attachment': MessageAttachmentSerializer(upload.attachment).data if upload.attachment else None,
+            'message': upload.message_id,
+            'deduplicated': False
+        })
+    
+    try:
+        attachment, message, deduplicated = complete_upload(upload)
+    except UploadError as error:
+        return Response({'error': str(error), 'received_bytes': error.offset}, status=status.HTTP_409_CONFLICT)
+    
+    broadcast(upload.chat_room_id, message_event(
+        upload.chat_room_id, HealthWorkerMessageSerializer(message).data
+    ))
+    return Response({
+        'attachment': MessageAttachmentSerializer(attachment).data,
+        'message': message.id,
+        'deduplicated': deduplicated
+    }, status=status.HTTP_201_CREATED)
@@ -0,0 +1,276 @@
+"""
+WebSocket transport for chat rooms, mounted at ``/ws/chat/`` by ``vsla_backend.asgi``.
+
+Clients authenticate with their JWT access token (``?token=...`` or an
+``Authorization: Bearer`` header) and are subscribed to every room they are an
+active participant of. Frames are JSON objects with a ``type``:
+
+- ``message``: ``{room, message, message_type?, reply_to?, client_id?}`` stores
+  and fans out a message; the echo carries ``client_id`` back to the sender
+- ``delivered``: ``{room, up_to}`` (or ``message_ids``) sets ``is_delivered`` up to a message
+- ``read``: ``{room, message_id?}`` moves ``ChatRoomParticipant.last_read_at``
+- ``join``: ``{room}`` subscribes to a room joined after connecting
+- ``ping``: answered with ``pong``
+- ``stats``: receipt buffer and fan-out metrics of this worker (staff only)
+
+Receipts are batched by ``chat.receipts.ReceiptCoalescer`` and announced to the
+room once stored; clients should resend unconfirmed receipts after reconnecting.
+"""
+import asyncio
+import json
+import weakref
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+from .layers import get_channel_layer, room_group
+from .models import ChatRoom, ChatRoomParticipant, HealthWorkerMessage
+from .receipts import ReceiptCoalescer, apply_receipts
+from .serializers import HealthWorkerMessageSerializer
+
+
+CLOSE_UNAUTHORIZED = 4401
+MAX_FRAME_BYTES = 64 * 1024
+MESSAGE_TYPES = {choice for choice, _ in HealthWorkerMessage._meta.get_field('message_type').choices}
+
+
+def authenticate(scope):
+    """Return the user for the connection's access token, or None"""
+    token = parse_qs(scope.get('query_string', b'').decode()).get('token', [None])[0]
+    if not token:
+        headers = dict(scope.get('headers', []))
+        scheme, _, token = headers.get(b'authorization', b'').decode().partition(' ')
+        if scheme.lower() != 'bearer':
+            token = None
+    if not token:
+        return None
+
+    authentication = JWTAuthentication()
+    try:
+        return authentication.get_user(authentication.get_validated_token(token))
+    except (InvalidToken, TokenError, AuthenticationFailed):
+        return None
+
+
+def active_room_ids(user, room_ids=None):
+    """Ids of the active rooms ``user`` currently takes part in"""
+    participations = ChatRoomParticipant.objects.filter(user=user, is_active=True, chat_room__is_active=True)
+    if room_ids is not None:
+        participations = participations.filter(chat_room_id__in=room_ids)
+    return set(participations.values_list('chat_room_id', flat=True))
+
+
+def create_message(user, room_id, text, message_type='text', reply_to=None):
+    """Store a message sent over the socket and return its serialized form"""
+    with transaction.atomic():
+        receiver_id = None
+        if ChatRoom.objects.filter(pk=room_id, room_type='direct').exists():
+            receiver_id = ChatRoomParticipant.objects.filter(chat_room_id=room_id).exclude(
+                user=user
+            ).values_list('user_id', flat=True).first()
+        if reply_to and not HealthWorkerMessage.objects.filter(pk=reply_to, chat_room_id=room_id).exists():
+            reply_to = None
+
+        message = HealthWorkerMessage.objects.create(
+            sender=user, receiver_id=receiver_id, chat_room_id=room_id,
+            message=text, message_type=message_type, reply_to_id=reply_to
+        )
+        # Only ever move last_message_at forwards
+        ChatRoom.objects.filter(pk=room_id).filter(
+            Q(last_message_at__isnull=True) | Q(last_message_at__lt=message.timestamp)
+        ).update(last_message_at=message.timestamp)
+    return HealthWorkerMessageSerializer(message).data
+
+
+def mark_read(user, room_id, message_id=None):
+    """Move the participant's ``last_read_at`` watermark forward, returning it if it moved.
+
+    Goes through ``apply_receipts`` like socket receipts, so the direct
+    messages it covers get ``is_read``/``read_at`` as well.
+    """
+    key = (user.pk, room_id)
+    receipt = (message_id, None) if message_id is not None else (None, timezone.now())
+    moved_read, _ = apply_receipts({key: receipt}, {})
+    return moved_read.get(key)
+
+
+def message_event(room_id, payload, client_id=None):
+    return {'type': 'message', 'room': room_id, 'message': payload, 'client_id': client_id}
+
+
+def read_event(user_id, room_id, read_at):
+    return {
+        'type': 'read', 'room': room_id, 'user': user_id,
+        'last_read_at': serializers.DateTimeField().to_representation(read_at),
+    }
+
+
+def delivered_event(user_id, room_id, up_to):
+    return {'type': 'delivered', 'room': room_id, 'user': user_id, 'up_to': up_to}
+
+
+async def announce_receipts(read, delivered):
+    """Tell each room about receipts once they are stored"""
+    layer = get_channel_layer()
+    for (user_id, room_id), read_at in read.items():
+        await layer.group_send(room_group(room_id), read_event(user_id, room_id, read_at))
+    for (user_id, room_id), up_to in delivered.items():
+        await layer.group_send(room_group(room_id), delivered_event(user_id, room_id, up_to))
+
+
+_coalescers = weakref.WeakKeyDictionary()
+
+
+def get_receipt_coalescer():
+    """The receipt coalescer of the running event loop"""
+    loop = asyncio.get_running_loop()
+    if loop not in _coalescers:
+        _coalescers[loop] = ReceiptCoalescer(on_flush=announce_receipts)
+    return _coalescers[loop]
+
+
+class FrameError(Exception):
+    """A client frame that cannot be handled; reported back as an ``error`` event"""
+
+
+class ChatConnection:
+    """One WebSocket client.
+
+    Kept deliberately small: an idle connection is this object, its room
+    memberships in the channel layer, and the coroutine waiting in
+    ``receive()``. Database work is handed to Django's sync thread.
+    """
+    __slots__ = ('scope', 'send', 'layer', 'user', 'rooms')
+    frame_types = ('ping', 'join', 'message', 'delivered', 'read', 'stats')
+
+    def __init__(self, scope, send):
+        self.scope = scope
+        self.send = send
+        self.layer = get_channel_layer()
+        self.user = None
+        self.rooms = set()
+
+    async def run(self, receive):
+        event = await receive()
+        if event['type'] != 'websocket.connect':
+            return
+
+        self.user = await sync_to_async(authenticate)(self.scope)
+        if self.user is None:
+            await self.send({'type': 'websocket.close', 'code': CLOSE_UNAUTHORIZED})
+            return
+
+        await self.send({'type': 'websocket.accept'})
+        try:
+            await self.join(await sync_to_async(active_room_ids)(self.user))
+            while True:
+                event = await receive()
+                if event['type'] == 'websocket.disconnect':
+                    break
+                if event['type'] == 'websocket.receive':
+                    await self.receive_frame(event.get('text') or (event.get('bytes') or b'').decode())
+        finally:
+            for room_id in self.rooms:
+                await self.layer.group_discard(room_group(room_id), self.send_event)
+
+    async def join(self, room_ids):
+        for room_id in room_ids - self.rooms:
+            self.rooms.add(room_id)
+            await self.layer.group_add(room_group(room_id), self.send_event)
+
+    async def send_event(self, event):
+        await self.send({'type': 'websocket.send', 'text': json.dumps(event)})
+
+    async def receive_frame(self, text):
+        try:
+            if len(text) > MAX_FRAME_BYTES:
+                raise FrameError('Frame too large')
+            try:
+                data = json.loads(text)
+            except ValueError:
+                raise FrameError('Frames must be JSON objects')
+            if not isinstance(data, dict):
+                raise FrameError('Frames must be JSON objects')
+
+            if data.get('type') not in self.frame_types:
+                raise FrameError(f"Unknown frame type: {data.get('type')}")
+            await getattr(self, f"handle_{data['type']}")(data)
+        except FrameError as error:
+            await self.send_event({'type': 'error', 'error': str(error)})
+
+    def room_id(self, data):
+        try:
+            room_id = int(data.get('room'))
+        except (TypeError, ValueError):
+            raise FrameError('room must be a chat room id')
+        if room_id not in self.rooms:
+            raise FrameError('Not a participant of this room')
+        return room_id
+
+    async def handle_ping(self, data):
+        await self.send_event({'type': 'pong'})
+
+    async def handle_stats(self, data):
+        if self.user.role != 'staff':
+            raise FrameError('Insufficient permissions')
+        await self.send_event({
+            'type': 'stats',
+            'receipts': get_receipt_coalescer().stats(),
+            'groups': self.layer.group_count(),
+            'connections': self.layer.member_count(),
+        })
+
+    async def handle_join(self, data):
+        try:
+            room_id = int(data.get('room'))
+        except (TypeError, ValueError):
+            raise FrameError('room must be a chat room id')
+        if not await sync_to_async(active_room_ids)(self.user, [room_id]):
+            raise FrameError('Not a participant of this room')
+        await self.join({room_id})
+        await self.send_event({'type': 'joined', 'room': room_id})
+
+    async def handle_message(self, data):
+        room_id = self.room_id(data)
+        text = data.get('message')
+        if not isinstance(text, str) or not text.strip():
+            raise FrameError('message must be a non-empty string')
+        message_type = data.get('message_type', 'text')
+        if message_type not in MESSAGE_TYPES:
+            raise FrameError('Invalid message_type')
+        reply_to = data.get('reply_to')
+        if reply_to is not None and not isinstance(reply_to, int):
+            raise FrameError('reply_to must be a message id')
+
+        payload = await sync_to_async(create_message)(self.user, room_id, text, message_type, reply_to)
+        await self.layer.group_send(room_group(room_id), message_event(room_id, payload, data.get('client_id')))
+
+    async def handle_delivered(self, data):
+        room_id = self.room_id(data)
+        up_to = data.get('up_to')
+        message_ids = data.get('message_ids')
+        if up_to is None and isinstance(message_ids, list) and message_ids:
+            up_to = max(message_ids) if all(isinstance(i, int) for i in message_ids) else None
+        if not isinstance(up_to, int):
+            raise FrameError('Send up_to or message_ids with message ids')
+        get_receipt_coalescer().add_delivered(self.user.id, room_id, up_to)
+
+    async def handle_read(self, data):
+        room_id = self.room_id(data)
+        message_id = data.get('message_id')
+        if message_id is not None and not isinstance(message_id, int):
+            raise FrameError('message_id must be a message id')
+        read_at = timezone.now() if message_id is None else None
+        get_receipt_coalescer().add_read(self.user.id, room_id, message_id, read_at)
+
+
+async def chat_websocket(scope, receive, send):
+    """ASGI application for ``/ws/chat/`` connections"""
+    await ChatConnection(scope, send).run(receive)
@@ -0,0 +1,104 @@
+"""
+Indexed service and facility catalog for access points.
+
+``services``, ``facilities`` and ``accessibility_features`` stay JSON lists
+for the app, but SQLite cannot index inside them, so every filter on them
+decoded every row. Each list is mirrored into a many-to-many table
+(``service_catalog`` to ``AccessPointService``, ``facility_catalog`` to
+``AccessPointFacility``), kept in step when an access point is saved.
+Filtering by "offers Vaccination and has wheelchair access" then reads the
+through tables' item index once per wanted item and intersects the matching
+ids.
+"""
+from django.db import transaction
+
+
+def catalog_names(value):
+    """The distinct non-empty names of a JSON list, in order"""
+    names = []
+    for item in value if isinstance(value, list) else []:
+        if isinstance(item, str) and item.strip() and item.strip()[:100] not in names:
+            names.append(item.strip()[:100])
+    return names
+
+
+def sync_catalog(access_point_ids):
+    """Rebuild the catalog rows of some access points from their JSON lists"""
+    from .models import AccessPointFacility, AccessPointService, HealthAccessPoint
+
+    ServiceLink = HealthAccessPoint.service_catalog.through
+    FacilityLink = HealthAccessPoint.facility_catalog.through
+    access_point_ids = list(access_point_ids)
+    rows = list(HealthAccessPoint.objects.filter(pk__in=access_point_ids).values_list(
+        'pk', 'services', 'facilities', 'accessibility_features'
+    ))
+
+    with transaction.atomic():
+        # Names seen for the first time get their catalog entry here
+        service_names = {name for row in rows for name in catalog_names(row[1])}
+        facility_keys = {
+            (kind, name) for row in rows
+            for kind, value in (('facility', row[2]), ('accessibility', row[3]))
+            for name in catalog_names(value)
+        }
+        AccessPointService.objects.bulk_create(
+            [AccessPointService(name=name, description='') for name in service_names], ignore_conflicts=True
+        )
+        AccessPointFacility.objects.bulk_create(
+            [AccessPointFacility(kind=kind, name=name) for kind, name in facility_keys], ignore_conflicts=True
+        )
+        service_ids = dict(AccessPointService.objects.filter(name__in=service_names).values_list('name', 'pk'))
+        facility_ids = {
+            (kind, name): pk for kind, name, pk in AccessPointFacility.objects.filter(
+                name__in={name for _, name in facility_keys}
+            ).values_list('kind', 'name', 'pk')
+        }
+
+        service_links, facility_links = [], []
+        for pk, services, facilities, accessibility in rows:
+            service_links.extend(
+                ServiceLink(healthaccesspoint_id=pk, accesspointservice_id=service_ids[name])
+                for name in catalog_names(services)
+            )
+            facility_links.extend(
+                FacilityLink(healthaccesspoint_id=pk, accesspointfacility_id=facility_ids[kind, name])
+                for kind, value in (('facility', facilities), ('accessibility', accessibility))
+                for name in catalog_names(value)
+            )
+        ServiceLink.objects.filter(healthaccesspoint_id__in=access_point_ids).delete()
+        FacilityLink.objects.filter(healthaccesspoint_id__in=access_point_ids).delete()
+        ServiceLink.objects.bulk_create(service_links, batch_size=1000)
+        FacilityLink.objects.bulk_create(facility_links, batch_size=1000)
+    return len(service_links) + len(facility_links)
+
+
+def with_catalog(queryset, services=(), facilities=(), accessibility=()):
+    """Narrow ``queryset`` to access points listing every given service, facility and feature"""
+    from .models import AccessPointFacility, AccessPointService, HealthAccessPoint
+
+    ServiceLink = HealthAccessPoint.service_catalog.through
+    FacilityLink = HealthAccessPoint.facility_catalog.through
+    wanted_services, wanted_facilities = set(services), {
+        (kind, name) for kind, names in (('facility', facilities), ('accessibility', accessibility)) for name in names
+    }
+    if not wanted_services and not wanted_facilities:
+        return queryset
+    service_ids = list(AccessPointService.objects.filter(name__in=wanted_services).values_list('pk', flat=True))
+    facility_ids = [
+        pk for kind, name, pk in AccessPointFacility.objects.filter(
+            name__in={name for _, name in wanted_facilities}
+        ).values_list('kind', 'name', 'pk') if (kind, name) in wanted_facilities
+    ]
+    # Something nobody lists matches nothing
+    if len(service_ids) < len(wanted_services) or len(facility_ids) < len(wanted_facilities):
+        return queryset.none()
+
+    for service_id in service_ids:
+        queryset = queryset.filter(pk__in=ServiceLink.objects.filter(
+            accesspointservice_id=service_id
+        ).values('healthaccesspoint_id'))
+    for facility_id in facility_ids:
+        queryset = queryset.filter(pk__in=FacilityLink.objects.filter(
+            accesspointfacility_id=facility_id
+        ).values('healthaccesspoint_id'))
+    return queryset
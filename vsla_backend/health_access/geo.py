@@ -0,0 +1,174 @@
+"""
+Nearest access point search without GIS extensions.
+
+Every access point stores numeric ``latitude``/``longitude`` and a
+``grid_cell``: its position on a 2^15 x 2^15 grid (about 600 m x 1.2 km at the
+equator), with the row and column bits interleaved into one Z-order integer
+like a geohash. Any coarser cell of that grid is then one contiguous range of
+``grid_cell`` values, so a search picks a cell size to suit its radius, covers
+a bounding box with a few such cells and reads them as index range scans.
+
+Candidates are ranked by exact haversine distance. The radius starts small
+and widens until enough matches lie inside the circle; each wider ring only
+reads the ranges earlier rings did not, so dense towns touch a few hundred
+rows and sparse rural areas still find the closest point.
+"""
+import math
+
+from django.conf import settings
+from django.db.models import Exists, OuterRef, Q
+
+
+EARTH_RADIUS_KM = 6371.0088
+GRID_BITS = 15
+GRID_SIZE = 1 << GRID_BITS
+# Upper bound on the cells used to cover one search box
+MAX_CELLS = 24
+INITIAL_RADIUS_KM = getattr(settings, 'ACCESS_POINT_SEARCH_INITIAL_RADIUS_KM', 2)
+
+
+def parse_coordinates(text):
+    """Parse a ``"lat,lng"`` string, returning ``(lat, lng)`` or None"""
+    try:
+        latitude, longitude = (float(part) for part in (text or '').split(','))
+    except ValueError:
+        return None
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        return None
+    return latitude, longitude
+
+
+def grid_row(latitude):
+    return min(int((latitude + 90) / 180 * GRID_SIZE), GRID_SIZE - 1)
+
+
+def grid_column(longitude):
+    return math.floor((longitude + 180) / 360 * GRID_SIZE)
+
+
+def interleave(row, column):
+    """Z-order code of a grid position: column bits at even positions, row bits at odd ones"""
+    code = 0
+    for bit in range(GRID_BITS):
+        code |= ((column >> bit) & 1) << (2 * bit) | ((row >> bit) & 1) << (2 * bit + 1)
+    return code
+
+
+def grid_cell(latitude, longitude):
+    return interleave(grid_row(latitude), grid_column(longitude) % GRID_SIZE)
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """``(min_lat, max_lat, min_lng, max_lng)`` of a box containing the circle"""
+    lat_delta = math.degrees(radius_km / EARTH_RADIUS_KM)
+    # Longitude degrees shrink towards the poles; near them the box spans every longitude
+    cos_lat = math.cos(math.radians(latitude))
+    lng_delta = 180 if cos_lat < 1e-6 else min(180, lat_delta / cos_lat)
+    return (
+        max(-90, latitude - lat_delta), min(90, latitude + lat_delta),
+        longitude - lng_delta, longitude + lng_delta,
+    )
+
+
+def cell_ranges(min_lat, max_lat, min_lng, max_lng):
+    """Cover a box with at most ``MAX_CELLS`` cells, as merged ``(low, high)`` grid_cell ranges"""
+    first_row, last_row = grid_row(min_lat), grid_row(max_lat)
+    first_column, last_column = grid_column(min_lng), grid_column(max_lng)
+    # Start with cells about a quarter of the box and coarsen until few enough cover it
+    shift = max(0, min(GRID_BITS, (last_row - first_row + 1).bit_length() - 2))
+    while True:
+        rows = range(first_row >> shift, (last_row >> shift) + 1)
+        # A box wider than the whole grid wraps onto itself, so cap the columns at one full turn
+        columns = range(
+            first_column >> shift, min((last_column >> shift) + 1, (first_column >> shift) + (GRID_SIZE >> shift))
+        )
+        if len(rows) * len(columns) <= MAX_CELLS or shift == GRID_BITS:
+            break
+        shift += 1
+
+    span = 1 << (2 * shift)
+    lows = sorted(
+        interleave(row << shift, (column % (GRID_SIZE >> shift)) << shift)
+        for row in rows for column in columns
+    )
+    return merge_ranges((low, low + span - 1) for low in lows)
+
+
+def merge_ranges(ranges):
+    """Sort ranges and join the ones that touch or overlap"""
+    merged = []
+    for low, high in sorted(ranges):
+        if merged and low <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], high))
+        else:
+            merged.append((low, high))
+    return merged
+
+
+def subtract_ranges(ranges, seen):
+    """The parts of ``ranges`` not already covered by the sorted, disjoint ``seen`` ranges"""
+    remaining = []
+    for low, high in ranges:
+        for seen_low, seen_high in seen:
+            if seen_high < low or seen_low > high:
+                continue
+            if seen_low > low:
+                remaining.append((low, seen_low - 1))
+            low = seen_high + 1
+            if low > high:
+                break
+        if low <= high:
+            remaining.append((low, high))
+    return remaining
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def nearest(queryset, latitude, longitude, limit=10, max_radius_km=50, service=None, type=None):
+    """The ``limit`` closest rows of ``queryset`` within ``max_radius_km``.
+
+    Returns ``[(id, distance_km), ...]`` nearest first. ``service`` keeps
+    only access points listing that service in the service catalog and
+    ``type`` only those of that type; ``type`` goes into every range condition
+    so SQLite can seek the ``(type, grid_cell)`` index rather than scan all
+    points of a type.
+    """
+    from .models import AccessPointService, HealthAccessPoint
+
+    extra = {'type': type} if type else {}
+    distances = {}
+    seen = []
+    radius = min(INITIAL_RADIUS_KM, max_radius_km)
+    if service is not None:
+        service_id = AccessPointService.objects.filter(name=service).values_list('pk', flat=True).first()
+        if service_id is None:
+            return []
+        # Checked per candidate on the through table's (access point, service) index, so the
+        # grid cell ranges stay the driving scan rather than every point offering the service
+        queryset = queryset.filter(Exists(HealthAccessPoint.service_catalog.through.objects.filter(
+            healthaccesspoint_id=OuterRef('pk'), accesspointservice_id=service_id
+        )))
+    while True:
+        new_ranges = subtract_ranges(cell_ranges(*bounding_box(latitude, longitude, radius)), seen)
+        if new_ranges:
+            seen = merge_ranges(seen + new_ranges)
+            condition = Q()
+            for low, high in new_ranges:
+                condition |= Q(grid_cell__range=(low, high), **extra)
+            # order_by() drops the model's default ordering, which would sort every candidate by name
+            for pk, point_latitude, point_longitude in queryset.filter(condition).order_by().values_list(
+                'id', 'latitude', 'longitude'
+            ):
+                distances[pk] = haversine_km(latitude, longitude, point_latitude, point_longitude)
+
+        # Everything inside the circle has been seen, so the closest ``limit`` are final
+        inside = sorted((distance, pk) for pk, distance in distances.items() if distance <= radius)
+        if len(inside) >= limit or radius >= max_radius_km:
+            return [(pk, distance) for distance, pk in inside[:limit]]
+        # Matches grow with the area, so aim the next ring at enough of them, at least doubling
+        growth = min(4, max(2, math.sqrt(limit / max(len(inside), 1))))
+        radius = min(radius * growth, max_radius_km)
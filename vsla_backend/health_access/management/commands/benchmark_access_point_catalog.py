@@ -0,0 +1,94 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from vsla_backend.health_access.catalog import sync_catalog, with_catalog
+from vsla_backend.health_access.models import AccessPointService, HealthAccessPoint
+
+
+SERVICES = [choice for choice, _ in AccessPointService.SERVICE_CHOICES]
+FACILITIES = ['Waiting Area', 'Private Room', 'Toilets', 'Drinking Water', 'Pharmacy', 'Laboratory', 'Parking']
+ACCESSIBILITY = ['Wheelchair Access', 'Sign Language', 'Braille Materials', 'Ramp', 'Accessible Toilet']
+
+
+class Command(BaseCommand):
+    help = 'Benchmark catalog filtering of access points against scanning their JSON lists'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--points', type=int, default=100_000)
+        parser.add_argument('--queries', type=int, default=50)
+
+    def handle(self, *args, **options):
+        if options['points'] < 1 or options['queries'] < 1:
+            raise CommandError('--points and --queries must be at least 1')
+        # Seeded rows are rolled back afterwards
+        with transaction.atomic():
+            self._run(options['points'], options['queries'])
+            transaction.set_rollback(True)
+
+    def _seed(self, count, rng):
+        batch = [
+            HealthAccessPoint(
+                name=f'Bench point {i}', type='clinic', location='benchmark', contact_person='Bench',
+                phone_number='000', services=rng.sample(SERVICES, rng.randint(1, 6)),
+                facilities=rng.sample(FACILITIES, rng.randint(0, 4)),
+                accessibility_features=rng.sample(ACCESSIBILITY, rng.randint(0, 2)),
+            )
+            for i in range(count)
+        ]
+        # bulk_create skips the save signals, so the catalog is synced in chunks as the backfill does
+        HealthAccessPoint.objects.bulk_create(batch, batch_size=5000)
+        ids = list(HealthAccessPoint.objects.filter(location='benchmark').values_list('pk', flat=True))
+        for start in range(0, len(ids), 5000):
+            sync_catalog(ids[start:start + 5000])
+
+    def _run(self, points, queries):
+        rng = random.Random(42)
+        started = time.perf_counter()
+        self._seed(points, rng)
+        self.stdout.write(f'Seeded {points} access points in {time.perf_counter() - started:.1f}s')
+
+        filters = [
+            {
+                'services': rng.sample(SERVICES, rng.randint(1, 2)),
+                'facilities': rng.sample(FACILITIES, rng.randint(0, 1)),
+                'accessibility': rng.sample(ACCESSIBILITY, rng.randint(0, 1)),
+            }
+            for _ in range(queries)
+        ]
+        active = HealthAccessPoint.objects.filter(is_active=True).order_by()
+
+        def scan(wanted):
+            # What filtering looked like before: decode every row's lists and test membership
+            return {
+                pk for pk, services, facilities, accessibility in active.values_list(
+                    'pk', 'services', 'facilities', 'accessibility_features'
+                )
+                if set(wanted['services']) <= set(services)
+                and set(wanted['facilities']) <= set(facilities)
+                and set(wanted['accessibility']) <= set(accessibility)
+            }
+
+        def indexed(wanted):
+            return set(with_catalog(active, **wanted).values_list('pk', flat=True))
+
+        results = {}
+        for label, search in (('catalog join', indexed), ('JSON scan', scan)):
+            timings = []
+            for wanted in filters:
+                began = time.perf_counter()
+                results.setdefault(label, []).append(search(wanted))
+                timings.append((time.perf_counter() - began) * 1000)
+            timings.sort()
+            self.stdout.write(
+                f'{label:<14} median={statistics.median(timings):8.2f} ms  '
+                f'p95={timings[int(len(timings) * 0.95) - 1]:8.2f} ms'
+            )
+
+        mismatches = sum(a != b for a, b in zip(results['catalog join'], results['JSON scan']))
+        if mismatches:
+            raise CommandError(f'{mismatches} filters differ from the JSON scan')
+        self.stdout.write(self.style.SUCCESS('Catalog results match the JSON scan'))
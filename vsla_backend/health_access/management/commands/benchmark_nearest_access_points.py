@@ -0,0 +1,110 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from vsla_backend.health_access.catalog import sync_catalog
+from vsla_backend.health_access.geo import grid_cell, haversine_km, nearest, parse_coordinates
+from vsla_backend.health_access.models import AccessPointService, HealthAccessPoint
+
+
+# Towns the synthetic access points cluster around, so density varies like real data
+TOWNS = [(-15.42, 28.28), (-12.80, 28.21), (-17.85, 25.85), (-13.13, 27.85), (-10.21, 31.18), (-13.64, 32.65)]
+SERVICES = [choice for choice, _ in AccessPointService.SERVICE_CHOICES]
+TYPES = [choice for choice, _ in HealthAccessPoint.TYPE_CHOICES]
+
+
+class Command(BaseCommand):
+    help = 'Benchmark nearest access point search on synthetic data and check it against a full scan'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--points', type=int, default=100_000)
+        parser.add_argument('--queries', type=int, default=200)
+
+    def handle(self, *args, **options):
+        if options['points'] < 1 or options['queries'] < 1:
+            raise CommandError('--points and --queries must be at least 1')
+        # Seeded rows are rolled back afterwards
+        with transaction.atomic():
+            self._run(options['points'], options['queries'])
+            transaction.set_rollback(True)
+
+    def _seed(self, count, rng):
+        batch = []
+        for i in range(count):
+            if rng.random() < 0.8:
+                town_lat, town_lng = rng.choice(TOWNS)
+                latitude, longitude = rng.gauss(town_lat, 0.15), rng.gauss(town_lng, 0.15)
+            else:
+                latitude, longitude = rng.uniform(-18, -8.5), rng.uniform(22, 33.5)
+            batch.append(HealthAccessPoint(
+                name=f'Bench point {i}', type=rng.choice(TYPES), location='benchmark',
+                coordinates=f'{latitude:.6f},{longitude:.6f}', latitude=latitude, longitude=longitude,
+                grid_cell=grid_cell(latitude, longitude), services=rng.sample(SERVICES, 4),
+                contact_person='Bench', phone_number='000',
+            ))
+        # bulk_create skips the save signals, and the service filter reads the catalog
+        HealthAccessPoint.objects.bulk_create(batch, batch_size=5000)
+        ids = list(HealthAccessPoint.objects.filter(location='benchmark').values_list('pk', flat=True))
+        for start in range(0, len(ids), 5000):
+            sync_catalog(ids[start:start + 5000])
+
+    def _run(self, points, queries):
+        rng = random.Random(42)
+        started = time.perf_counter()
+        self._seed(points, rng)
+        self.stdout.write(f'Seeded {points} access points in {time.perf_counter() - started:.1f}s')
+
+        active = HealthAccessPoint.objects.filter(is_active=True)
+        spots = [
+            (rng.gauss(lat, 0.2), rng.gauss(lng, 0.2)) if rng.random() < 0.7
+            else (rng.uniform(-18, -8.5), rng.uniform(22, 33.5))
+            for lat, lng in (rng.choice(TOWNS) for _ in range(queries))
+        ]
+        cases = [
+            ('nearest 10', {}),
+            ('nearest 10, HIV Self-Test', {'service': 'HIV Self-Test'}),
+            ('nearest 5 clinics, HIV Self-Test', {'service': 'HIV Self-Test', 'type': 'clinic', 'limit': 5}),
+        ]
+        for label, case in cases:
+            timings, query_counts = [], []
+            for latitude, longitude in spots:
+                with CaptureQueriesContext(connection) as captured:
+                    began = time.perf_counter()
+                    nearest(
+                        active, latitude, longitude,
+                        limit=case.get('limit', 10), service=case.get('service'), type=case.get('type')
+                    )
+                    timings.append((time.perf_counter() - began) * 1000)
+                query_counts.append(len(captured))
+            timings.sort()
+            self.stdout.write(
+                f'{label:<36} median={statistics.median(timings):6.2f} ms  '
+                f'p95={timings[int(len(timings) * 0.95) - 1]:6.2f} ms  queries<={max(query_counts)}'
+            )
+
+        # What the endpoint replaces: parse every row's coordinate text and sort
+        latitude, longitude = spots[0]
+        began = time.perf_counter()
+        scanned = sorted(
+            (haversine_km(latitude, longitude, *parse_coordinates(text)), pk)
+            for pk, text in active.values_list('id', 'coordinates')
+        )
+        self.stdout.write(f'{"full scan of coordinate text":<36} {(time.perf_counter() - began) * 1000:6.1f} ms')
+
+        mismatches = 0
+        for latitude, longitude in spots[:20]:
+            expected = sorted(
+                (distance, pk) for distance, pk in (
+                    (haversine_km(latitude, longitude, lat, lng), pk)
+                    for pk, lat, lng in active.values_list('id', 'latitude', 'longitude')
+                ) if distance <= 50
+            )[:10]
+            found = nearest(active, latitude, longitude)
+            mismatches += [pk for _, pk in expected] != [pk for pk, _ in found]
+        if mismatches:
+            raise CommandError(f'{mismatches} searches differ from the full scan')
+        self.stdout.write(self.style.SUCCESS('Search results match the full scan'))
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from vsla_backend.health_access.geo import grid_cell, parse_coordinates
+from vsla_backend.health_access.models import HealthAccessPoint
+
+
+class Command(BaseCommand):
+    help = 'Fill latitude, longitude and grid_cell of access points from their "lat,lng" coordinates text'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        indexed = unparsable = 0
+        batch = []
+        for point in HealthAccessPoint.objects.exclude(coordinates='').only('id', 'coordinates').iterator():
+            parsed = parse_coordinates(point.coordinates)
+            if parsed is None:
+                unparsable += 1
+                continue
+            point.latitude, point.longitude = parsed
+            point.grid_cell = grid_cell(*parsed)
+            batch.append(point)
+            if len(batch) >= options['batch_size']:
+                indexed += self._flush(batch)
+        indexed += self._flush(batch)
+
+        self.stdout.write(self.style.SUCCESS(f'Indexed {indexed} access points'))
+        if unparsable:
+            self.stdout.write(self.style.WARNING(f'{unparsable} access points have coordinates that could not be parsed'))
+
+    def _flush(self, batch):
+        # bulk_update skips save(), so the location fields are written as computed here
+        HealthAccessPoint.objects.bulk_update(batch, ['latitude', 'longitude', 'grid_cell'])
+        count = len(batch)
+        batch.clear()
+        return count
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from vsla_backend.health_access.models import HealthAccessPoint
+from vsla_backend.health_access.schedule import rebuild_opening_intervals
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the opening interval index of every access point from its schedules'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        ids = list(HealthAccessPoint.objects.order_by('pk').values_list('pk', flat=True))
+        intervals = 0
+        for start in range(0, len(ids), options['batch_size']):
+            intervals += rebuild_opening_intervals(ids[start:start + options['batch_size']])
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {intervals} opening intervals for {len(ids)} access points'))
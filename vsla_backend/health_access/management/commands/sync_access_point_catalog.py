@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from vsla_backend.health_access.catalog import sync_catalog
+from vsla_backend.health_access.models import HealthAccessPoint
+
+
+class Command(BaseCommand):
+    help = 'Fill the service and facility catalog of every access point from its JSON lists'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        ids = list(HealthAccessPoint.objects.order_by('pk').values_list('pk', flat=True))
+        links = 0
+        for start in range(0, len(ids), options['batch_size']):
+            links += sync_catalog(ids[start:start + options['batch_size']])
+
+        self.stdout.write(self.style.SUCCESS(f'Linked {len(ids)} access points to {links} catalog entries'))
@@ -1,5 +1,10 @@
+import copy
+
 from django.db import models
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from vsla_backend.users.models import UserProfile
+from .schedule import MINUTES_PER_DAY, DAYS, rebuild_opening_intervals
 
 
 class HealthAccessPoint(models.Model):
@@ -19,9 +24,15 @@ class HealthAccessPoint(models.Model):
     location = models.CharField(max_length=200)
     address = models.TextField(blank=True)
     coordinates = models.CharField(max_length=100, blank=True, help_text="Latitude,Longitude")
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    grid_cell = models.IntegerField(null=True, blank=True, editable=False, help_text="Spatial index cell, see geo.py")
     
     # Services offered
     services = models.JSONField(default=list, help_text="List of available health services")
+    service_catalog = models.ManyToManyField(
+        'AccessPointService', blank=True, related_name='access_points', help_text="Indexed copy of services"
+    )
     
     # Contact information
     contact_person = models.CharField(max_length=200)
@@ -36,6 +47,10 @@ class HealthAccessPoint(models.Model):
     description = models.TextField(blank=True)
     facilities = models.JSONField(default=list, help_text="Available facilities")
     accessibility_features = models.JSONField(default=list, help_text="Accessibility features")
+    facility_catalog = models.ManyToManyField(
+        'AccessPointFacility', blank=True, related_name='access_points',
+        help_text="Indexed copy of facilities and accessibility_features"
+    )
     
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
@@ -48,11 +63,52 @@ class HealthAccessPoint(models.Model):
         indexes = [
             models.Index(fields=['type', 'is_active']),
             models.Index(fields=['location']),
+            models.Index(fields=['grid_cell']),
+            models.Index(fields=['type', 'grid_cell']),
         ]
     
+    _stored_coordinates = None
+    _stored_schedule = None
+    _stored_catalog = None
+    
     def __str__(self):
         return f"{self.name} ({self.get_type_display()}) - {self.location}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored text so save() can tell which side of the location was edited
+        if 'coordinates' in field_names:
+            instance._stored_coordinates = instance.coordinates
+        # Copies, so lists and dicts edited in place still count as changed
+        if 'schedule' in field_names:
+            instance._stored_schedule = copy.deepcopy(instance.schedule)
+        if {'services', 'facilities', 'accessibility_features'} <= set(field_names):
+            instance._stored_catalog = instance.catalog_lists()
+        return instance
+    
+    def save(self, *args, **kwargs):
+        """Keep ``coordinates``, ``latitude``/``longitude`` and ``grid_cell`` in step"""
+        self.sync_location()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'coordinates', 'latitude', 'longitude'} & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'coordinates', 'latitude', 'longitude', 'grid_cell'}
+        super().save(*args, **kwargs)
+        self._stored_coordinates = self.coordinates
+    
+    def sync_location(self):
+        from .geo import grid_cell, parse_coordinates
+        parsed = parse_coordinates(self.coordinates)
+        if parsed and (self.coordinates != self._stored_coordinates or self.latitude is None or self.longitude is None):
+            self.latitude, self.longitude = parsed
+        elif self.latitude is not None and self.longitude is not None:
+            self.coordinates = f"{self.latitude:.6f},{self.longitude:.6f}"
+        has_location = self.latitude is not None and self.longitude is not None
+        self.grid_cell = grid_cell(self.latitude, self.longitude) if has_location else None
+    
+    def catalog_lists(self):
+        return copy.deepcopy((self.services, self.facilities, self.accessibility_features))
+    
     def get_available_services(self):
         """Get list of available services"""
         return self.services if self.services else []
@@ -68,6 +124,11 @@ class HealthAccessPoint(models.Model):
         if not self.schedule:
             return None
         return self.schedule.get(day.lower())
+    
+    def get_opening_status(self, when=None):
+        """``{'open_now', 'opens_at', 'closes_at'}`` from the interval index, or None if hours are unknown"""
+        from .schedule import opening_status
+        return opening_status([self.pk], when).get(self.pk)
 
 
 class AccessPointService(models.Model):
@@ -102,6 +163,27 @@ class AccessPointService(models.Model):
         return self.name
 
 
+class AccessPointFacility(models.Model):
+    """Facilities and accessibility features listed by health access points"""
+    
+    KIND_CHOICES = [
+        ('facility', 'Facility'),
+        ('accessibility', 'Accessibility Feature'),
+    ]
+    
+    name = models.CharField(max_length=100)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    
+    class Meta:
+        verbose_name = 'Access Point Facility'
+        verbose_name_plural = 'Access Point Facilities'
+        unique_together = ['kind', 'name']
+        ordering = ['kind', 'name']
+    
+    def __str__(self):
+        return f"{self.name} ({self.get_kind_display()})"
+
+
 class AccessPointSchedule(models.Model):
     """Detailed schedule for health access points"""
     
@@ -134,7 +216,69 @@ class AccessPointSchedule(models.Model):
         return f"{self.access_point.name} - {self.get_day_display()} ({self.open_time} - {self.close_time})"
     
     def is_currently_open(self):
-        """Check if access point is currently open"""
+        """Check if access point is currently open on this day, in local time"""
         from django.utils import timezone
-        now = timezone.now().time()
-        return self.open_time <= now <= self.close_time
+        if self.is_closed:
+            return False
+        now = timezone.localtime()
+        minute = now.hour * 60 + now.minute
+        opens = self.open_time.hour * 60 + self.open_time.minute
+        closes = self.close_time.hour * 60 + self.close_time.minute
+        today = DAYS[now.weekday()]
+        if closes > opens:
+            return self.day == today and opens <= minute < closes
+        # Overnight: open from today's opening, or still open after yesterday's
+        yesterday = DAYS[now.weekday() - 1]
+        return (self.day == today and minute >= opens) or (self.day == yesterday and minute < closes)
+
+
+class AccessPointOpeningInterval(models.Model):
+    """Open or closed piece of an access point's week, rebuilt from its schedules (see schedule.py)"""
+    
+    access_point = models.ForeignKey(HealthAccessPoint, on_delete=models.CASCADE, related_name='opening_intervals')
+    start_minute = models.PositiveIntegerField(help_text="Local minutes since Monday 00:00, inclusive")
+    end_minute = models.PositiveIntegerField(help_text="Exclusive; never past the end of start_minute's day")
+    is_open = models.BooleanField()
+    next_change_minute = models.PositiveIntegerField(
+        null=True, blank=True, help_text="Minute of the week it next closes (open) or opens (closed)"
+    )
+    
+    class Meta:
+        verbose_name = 'Access Point Opening Interval'
+        verbose_name_plural = 'Access Point Opening Intervals'
+        ordering = ['access_point', 'start_minute']
+        indexes = [
+            models.Index(fields=['is_open', 'start_minute', 'end_minute']),
+            models.Index(fields=['access_point', 'start_minute']),
+        ]
+    
+    def __str__(self):
+        day = DAYS[self.start_minute // MINUTES_PER_DAY].title()
+        state = 'open' if self.is_open else 'closed'
+        return f"{self.access_point_id} {day} {self.start_minute % MINUTES_PER_DAY}-{self.end_minute % MINUTES_PER_DAY or MINUTES_PER_DAY} {state}"
+
+
+@receiver(post_save, sender=HealthAccessPoint)
+def rebuild_intervals_for_access_point(sender, instance, created, raw=False, **kwargs):
+    """Keep the opening interval index in step with the schedule JSON"""
+    if raw or (not created and instance.schedule == instance._stored_schedule):
+        return
+    instance._stored_schedule = copy.deepcopy(instance.schedule)
+    rebuild_opening_intervals([instance.pk])
+
+
+@receiver(post_save, sender=HealthAccessPoint)
+def sync_catalog_for_access_point(sender, instance, created, raw=False, **kwargs):
+    """Keep the service and facility catalog in step with the JSON lists"""
+    from .catalog import sync_catalog
+    if raw or (not created and instance.catalog_lists() == instance._stored_catalog):
+        return
+    instance._stored_catalog = instance.catalog_lists()
+    sync_catalog([instance.pk])
+
+
+@receiver([post_save, post_delete], sender=AccessPointSchedule)
+def rebuild_intervals_for_schedule(sender, instance, raw=False, **kwargs):
+    """Detailed schedules override the JSON for their day, so any change rebuilds the index"""
+    if not raw:
+        rebuild_opening_intervals([instance.access_point_id])
@@ -0,0 +1,199 @@
+"""
+Opening hours as an indexed table of minute-of-week intervals.
+
+An access point's week is cut into open and closed pieces from its
+``AccessPointSchedule`` rows (which win for their day) and its ``schedule``
+JSON (``{"monday": "08:00-16:00", ...}``). Spans that run past midnight,
+including Sunday into Monday, are carried into the next day. Pieces are then
+split at local midnight, so the piece covering minute ``m`` always starts on
+the same day as ``m`` and is found with one short range scan of
+``start_minute``.
+
+Every piece also stores the minute its status next changes: when an open
+piece's span closes, or when a closed piece's point next opens. Status,
+``closes_at`` and ``opens_at`` for any set of points at any time therefore
+come from a single indexed query. Minutes are local (``TIME_ZONE``) wall-clock
+minutes since Monday 00:00.
+"""
+import re
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+DAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+SPAN_PATTERN = re.compile(r'^\s*(\d{1,2}):(\d{2})\s*-\s*(\d{1,2}):(\d{2})\s*$')
+
+
+def minute_of_week(when=None):
+    """Local minute of the week of ``when`` (default now), Monday 00:00 being 0"""
+    local = timezone.localtime(when)
+    return local.weekday() * MINUTES_PER_DAY + local.hour * 60 + local.minute
+
+
+def at_minute(when, minute):
+    """The first moment at or after ``when`` whose local minute of the week is ``minute``"""
+    local = timezone.localtime(when)
+    week_start = datetime.combine(local.date() - timedelta(days=local.weekday()), time())
+    moment = timezone.make_aware(week_start + timedelta(minutes=minute), local.tzinfo)
+    if moment < local.replace(second=0, microsecond=0):
+        moment = timezone.make_aware(week_start + timedelta(days=7, minutes=minute), local.tzinfo)
+    return moment
+
+
+def parse_span(value):
+    """``"08:00-16:00"`` as ``(480, 960)`` minutes of the day; overnight spans end past 1440"""
+    match = SPAN_PATTERN.match(value) if isinstance(value, str) else None
+    if match is None:
+        return None
+    open_hour, open_minute, close_hour, close_minute = map(int, match.groups())
+    opens, closes = open_hour * 60 + open_minute, close_hour * 60 + close_minute
+    if opens >= MINUTES_PER_DAY or closes > MINUTES_PER_DAY or open_minute > 59 or close_minute > 59:
+        return None
+    return (opens, closes if closes > opens else closes + MINUTES_PER_DAY)
+
+
+def json_spans(value):
+    """Spans of one day of the ``schedule`` JSON: a span string, a list of them, or ``{"open", "close"}``"""
+    if isinstance(value, dict):
+        value = f"{value.get('open', '')}-{value.get('close', '')}"
+    values = value if isinstance(value, list) else [value]
+    return [span for span in map(parse_span, values) if span is not None]
+
+
+def time_span(open_time, close_time):
+    opens = open_time.hour * 60 + open_time.minute
+    closes = close_time.hour * 60 + close_time.minute
+    return opens, closes if closes > opens else closes + MINUTES_PER_DAY
+
+
+def weekly_spans(schedule, detailed):
+    """Open ``(start, end)`` minute-of-week spans, merged and sorted, from both schedule sources.
+
+    ``detailed`` maps a day name to ``(open_time, close_time, is_closed)``.
+    Returns None when neither source says anything about the week.
+    """
+    if not schedule and not detailed:
+        return None
+    schedule = schedule if isinstance(schedule, dict) else {}
+    spans = []
+    for index, day in enumerate(DAYS):
+        if day in detailed:
+            open_time, close_time, is_closed = detailed[day]
+            day_spans = [] if is_closed else [time_span(open_time, close_time)]
+        else:
+            day_spans = json_spans(schedule.get(day))
+        for opens, closes in day_spans:
+            start, end = index * MINUTES_PER_DAY + opens, index * MINUTES_PER_DAY + closes
+            # Sunday night spans carry on into Monday morning
+            if end > MINUTES_PER_WEEK:
+                spans.append((0, end - MINUTES_PER_WEEK))
+                end = MINUTES_PER_WEEK
+            spans.append((start, end))
+
+    merged = []
+    for start, end in sorted(spans):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def week_pieces(spans):
+    """Cut the week into ``(start, end, is_open, next_change)`` pieces that never cross midnight"""
+    if spans == [(0, MINUTES_PER_WEEK)]:
+        pieces = [(0, MINUTES_PER_WEEK, True, None)]
+    elif not spans:
+        pieces = [(0, MINUTES_PER_WEEK, False, None)]
+    else:
+        wraps = spans[0][0] == 0 and spans[-1][1] == MINUTES_PER_WEEK
+        pieces, cursor = [], 0
+        for start, end in spans:
+            if start > cursor:
+                pieces.append((cursor, start, False, start))
+            closes = end
+            if end == MINUTES_PER_WEEK and wraps:
+                # Open through Sunday midnight: it closes when Monday's first span does
+                closes = spans[0][1]
+            pieces.append((start, end, True, closes % MINUTES_PER_WEEK))
+            cursor = end
+        if cursor < MINUTES_PER_WEEK:
+            pieces.append((cursor, MINUTES_PER_WEEK, False, spans[0][0]))
+
+    split = []
+    for start, end, is_open, next_change in pieces:
+        while start < end:
+            day_end = min(end, (start // MINUTES_PER_DAY + 1) * MINUTES_PER_DAY)
+            split.append((start, day_end, is_open, next_change))
+            start = day_end
+    return split
+
+
+def rebuild_opening_intervals(access_point_ids):
+    """Recompute the interval rows of some access points from their schedules"""
+    from .models import AccessPointOpeningInterval, AccessPointSchedule, HealthAccessPoint
+
+    access_point_ids = list(access_point_ids)
+    detailed = {}
+    for row in AccessPointSchedule.objects.filter(access_point_id__in=access_point_ids).values(
+        'access_point_id', 'day', 'open_time', 'close_time', 'is_closed'
+    ):
+        detailed.setdefault(row['access_point_id'], {})[row['day']] = (
+            row['open_time'], row['close_time'], row['is_closed']
+        )
+
+    rows = []
+    for pk, schedule in HealthAccessPoint.objects.filter(pk__in=access_point_ids).values_list('pk', 'schedule'):
+        spans = weekly_spans(schedule, detailed.get(pk, {}))
+        if spans is None:
+            continue
+        rows.extend(
+            AccessPointOpeningInterval(
+                access_point_id=pk, start_minute=start, end_minute=end, is_open=is_open, next_change_minute=change
+            )
+            for start, end, is_open, change in week_pieces(spans)
+        )
+
+    with transaction.atomic():
+        AccessPointOpeningInterval.objects.filter(access_point_id__in=access_point_ids).delete()
+        AccessPointOpeningInterval.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def intervals_at(when=None):
+    """Filter for the interval rows covering ``when``: one range scan over a single day"""
+    minute = minute_of_week(when)
+    day_start = minute - minute % MINUTES_PER_DAY
+    return Q(start_minute__gte=day_start, start_minute__lte=minute, end_minute__gt=minute)
+
+
+def open_access_points(queryset, when=None):
+    """Narrow ``queryset`` to the access points open at ``when`` (default now)"""
+    from .models import AccessPointOpeningInterval
+    return queryset.filter(Exists(
+        AccessPointOpeningInterval.objects.filter(intervals_at(when), access_point=OuterRef('pk'), is_open=True)
+    ))
+
+
+def opening_status(access_point_ids, when=None):
+    """``{id: {'open_now', 'opens_at', 'closes_at'}}`` at ``when`` for points with known hours"""
+    from .models import AccessPointOpeningInterval
+    when = when or timezone.now()
+    status = {}
+    for pk, is_open, change in AccessPointOpeningInterval.objects.filter(
+        intervals_at(when), access_point_id__in=access_point_ids
+    ).values_list('access_point_id', 'is_open', 'next_change_minute'):
+        moment = at_minute(when, change) if change is not None else None
+        if moment is not None and moment <= when:
+            moment += timedelta(days=7)
+        status[pk] = {
+            'open_now': is_open,
+            'opens_at': None if is_open else moment,
+            'closes_at': moment if is_open else None,
+        }
+    return status
@@ -0,0 +1,70 @@
+from rest_framework import serializers
+from .models import HealthAccessPoint, AccessPointService
+
+
+class HealthAccessPointSerializer(serializers.ModelSerializer):
+    """Serializer for health access points.
+    
+    Views listing many points pass ``opening_status`` (see schedule.py) in the
+    context so the open/closed state of a whole page comes from one query.
+    """
+    open_now = serializers.SerializerMethodField()
+    opens_at = serializers.SerializerMethodField()
+    closes_at = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = HealthAccessPoint
+        fields = [
+            'id', 'name', 'type', 'location', 'address', 'coordinates', 'latitude', 'longitude',
+            'services', 'contact_person', 'phone_number', 'email', 'is_active', 'schedule',
+            'open_now', 'opens_at', 'closes_at',
+            'description', 'facilities', 'accessibility_features', 'created_at', 'updated_at'
+        ]
+        read_only_fields = fields
+    
+    def opening_status(self, obj):
+        if 'opening_status' in self.context:
+            return self.context['opening_status'].get(obj.pk)
+        return obj.get_opening_status()
+    
+    def get_open_now(self, obj):
+        status = self.opening_status(obj)
+        return status['open_now'] if status else None
+    
+    def get_opens_at(self, obj):
+        return self.status_time(obj, 'opens_at')
+    
+    def get_closes_at(self, obj):
+        return self.status_time(obj, 'closes_at')
+    
+    def status_time(self, obj, key):
+        status = self.opening_status(obj)
+        if not status or status[key] is None:
+            return None
+        return serializers.DateTimeField().to_representation(status[key])
+
+
+class NearestAccessPointFilterSerializer(serializers.Serializer):
+    """Query parameters of the nearest access point search"""
+    lat = serializers.FloatField(min_value=-90, max_value=90)
+    lng = serializers.FloatField(min_value=-180, max_value=180)
+    radius_km = serializers.FloatField(min_value=0.1, max_value=500, default=50)
+    limit = serializers.IntegerField(min_value=1, max_value=50, default=10)
+    service = serializers.ChoiceField(choices=AccessPointService.SERVICE_CHOICES, required=False)
+    type = serializers.ChoiceField(choices=HealthAccessPoint.TYPE_CHOICES, required=False)
+    open_now = serializers.BooleanField(default=False)
+
+
+class OpenAccessPointFilterSerializer(serializers.Serializer):
+    """Query parameters of the open access point listing"""
+    at = serializers.DateTimeField(required=False)
+    service = serializers.ChoiceField(choices=AccessPointService.SERVICE_CHOICES, required=False)
+    type = serializers.ChoiceField(choices=HealthAccessPoint.TYPE_CHOICES, required=False)
+
+
+class CatalogFilterSerializer(serializers.Serializer):
+    """Query parameters of the catalog filter; each name may be repeated and all must match"""
+    service = serializers.ListField(child=serializers.CharField(max_length=100), required=False, max_length=10)
+    facility = serializers.ListField(child=serializers.CharField(max_length=100), required=False, max_length=10)
+    accessibility = serializers.ListField(child=serializers.CharField(max_length=100), required=False, max_length=10)
+    type = serializers.ChoiceField(choices=HealthAccessPoint.TYPE_CHOICES, required=False)
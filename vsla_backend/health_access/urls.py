@@ -0,0 +1,13 @@
+from django.urls import path
+from . import views
+
+app_name = 'health_access'
+
+urlpatterns = [
+    path('access-points/', views.HealthAccessPointListView.as_view(), name='access-point-list'),
+    path('access-points/open/', views.OpenAccessPointListView.as_view(), name='access-point-open'),
+    path('access-points/filter/', views.CatalogAccessPointListView.as_view(), name='access-point-filter'),
+    path('access-points/nearest/', views.nearest_access_points, name='access-point-nearest'),
+    path('access-points/by-type/<str:type>/', views.HealthAccessPointListView.as_view(), name='access-point-by-type'),
+    path('access-points/<int:pk>/', views.HealthAccessPointDetailView.as_view(), name='access-point-detail'),
+]
@@ -0,0 +1,106 @@
+from rest_framework import generics, permissions
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+from django.utils import timezone
+from .catalog import with_catalog
+from .geo import nearest
+from .models import HealthAccessPoint
+from .schedule import open_access_points, opening_status
+from .serializers import (
+    CatalogFilterSerializer, HealthAccessPointSerializer, NearestAccessPointFilterSerializer,
+    OpenAccessPointFilterSerializer
+)
+
+
+class HealthAccessPointListView(generics.ListAPIView):
+    """List active health access points"""
+    serializer_class = HealthAccessPointSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get_queryset(self):
+        queryset = HealthAccessPoint.objects.filter(is_active=True)
+        if 'type' in self.kwargs:
+            queryset = queryset.filter(type=self.kwargs['type'])
+        return queryset
+    
+    def opening_time(self):
+        return timezone.now()
+    
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        # Opening status of the whole page in one query, rather than one per point
+        self.page_status = opening_status([point.pk for point in page or []], self.opening_time())
+        return page
+    
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if hasattr(self, 'page_status'):
+            context['opening_status'] = self.page_status
+        return context
+
+
+class OpenAccessPointListView(HealthAccessPointListView):
+    """List active access points open at ``at`` (default now), optionally offering ``service`` or of ``type``"""
+    
+    def get_queryset(self):
+        params = OpenAccessPointFilterSerializer(data=self.request.query_params)
+        params.is_valid(raise_exception=True)
+        self.params = params.validated_data
+        queryset = open_access_points(super().get_queryset(), self.opening_time())
+        if 'type' in self.params:
+            queryset = queryset.filter(type=self.params['type'])
+        if 'service' in self.params:
+            queryset = with_catalog(queryset, services=[self.params['service']])
+        return queryset
+    
+    def opening_time(self):
+        return self.params.get('at') or timezone.now()
+
+
+class HealthAccessPointDetailView(generics.RetrieveAPIView):
+    """Get a health access point"""
+    queryset = HealthAccessPoint.objects.all()
+    serializer_class = HealthAccessPointSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+
+class CatalogAccessPointListView(HealthAccessPointListView):
+    """List active access points offering every ``service``, ``facility`` and ``accessibility`` feature given"""
+    
+    def get_queryset(self):
+        params = CatalogFilterSerializer(data=self.request.query_params)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+        queryset = super().get_queryset()
+        if 'type' in data:
+            queryset = queryset.filter(type=data['type'])
+        return with_catalog(
+            queryset, services=data.get('service', []), facilities=data.get('facility', []),
+            accessibility=data.get('accessibility', [])
+        )
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def nearest_access_points(request):
+    """Active access points nearest to ``lat``/``lng``, optionally offering ``service``, of ``type`` or ``open_now``"""
+    params = NearestAccessPointFilterSerializer(data=request.query_params)
+    params.is_valid(raise_exception=True)
+    data = params.validated_data
+    
+    now = timezone.now()
+    queryset = HealthAccessPoint.objects.filter(is_active=True)
+    if data['open_now']:
+        queryset = open_access_points(queryset, now)
+    ranked = nearest(
+        queryset, data['lat'], data['lng'], limit=data['limit'],
+        max_radius_km=data['radius_km'], service=data.get('service'), type=data.get('type')
+    )
+    points = HealthAccessPoint.objects.in_bulk([pk for pk, _ in ranked])
+    context = {'request': request, 'opening_status': opening_status(points, now)}
+    results = []
+    for pk, distance in ranked:
+        entry = HealthAccessPointSerializer(points[pk], context=context).data
+        entry['distance_km'] = round(distance, 3)
+        results.append(entry)
+    return Response({'count': len(results), 'results': results})
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import ScreeningResult, HealthWorkerProfile
+from .models import ScreeningResult, HealthWorkerProfile, ScreeningStatisticsRollup, FollowUpTask
 
 
 @admin.register(ScreeningResult)
@@ -89,3 +89,38 @@ class HealthWorkerProfileAdmin(admin.ModelAdmin):
     
     def get_queryset(self, request):
         return super().get_queryset(request).select_related('user')
+
+
+@admin.register(ScreeningStatisticsRollup)
+class ScreeningStatisticsRollupAdmin(admin.ModelAdmin):
+    """Read-only admin interface for the screening statistics rollup"""
+    
+    list_display = ['day', 'test_type', 'status', 'location', 'count', 'follow_up_count']
+    
+    list_filter = ['test_type', 'status', 'location', 'day']
+    
+    ordering = ['-day', 'test_type', 'status', 'location']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(FollowUpTask)
+class FollowUpTaskAdmin(admin.ModelAdmin):
+    """Admin interface for the follow-up queue"""
+    
+    list_display = ['screening', 'patient', 'peer_navigator', 'due_at', 'status', 'completed_at']
+    
+    list_filter = ['status', 'due_at']
+    
+    search_fields = ['patient__first_name', 'patient__last_name', 'patient__username']
+    
+    raw_id_fields = ['screening', 'patient', 'peer_navigator']
+    
+    ordering = ['due_at']
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('screening__patient', 'patient', 'peer_navigator')
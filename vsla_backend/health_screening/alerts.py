@@ -0,0 +1,139 @@
+"""
+Follow-up queue and alerts for abnormal screening results.
+
+A screening is flagged while its status is ``abnormal`` or it requires a
+follow-up, the predicate of the abnormal list. Every flagged screening has one
+``FollowUpTask`` row, due on its follow-up date or ``FOLLOW_UP_DAYS`` after
+the screening, and assigned to the navigator of the patient's active
+``PeerNavigatorAssignment``. Tasks are created, moved and removed as
+screenings change, from ``ScreeningResult.save()`` and the bulk import.
+
+When a screening becomes abnormal, the patient and their navigator each get
+an ``abnormal_result`` notification. The notifications are queued for the
+dispatcher, which releases them right away, or when the recipient's quiet
+hours end, and announces them through ``notifications_dispatched``.
+"""
+from datetime import timedelta
+
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+from vsla_backend.notifications.fanout import in_quiet_hours, quiet_hours_end
+from vsla_backend.notifications.models import NotificationItem, NotificationPreference
+from vsla_backend.peer_navigation.models import PeerNavigatorAssignment
+from vsla_backend.users.models import full_name_expression
+
+from .models import FollowUpTask
+
+
+# Days after the screening a follow-up falls due when no follow-up date is set
+FOLLOW_UP_DAYS = 7
+
+
+def is_flagged(status, requires_follow_up):
+    """Whether a screening belongs on the abnormal list and the follow-up queue"""
+    return status == 'abnormal' or bool(requires_follow_up)
+
+
+def follow_up_due(screening):
+    return screening.follow_up_date or screening.date + timedelta(days=FOLLOW_UP_DAYS)
+
+
+def active_navigators(patient_ids):
+    """``{patient_id: (navigator_id, patient_name)}`` from active assignments, the latest winning"""
+    assignments = PeerNavigatorAssignment.objects.filter(
+        youth_id__in=patient_ids, status='active'
+    ).annotate(youth_name=full_name_expression('youth')).order_by('assigned_date', 'pk')
+    return {
+        youth_id: (navigator_id, name)
+        for youth_id, navigator_id, name in assignments.values_list('youth_id', 'peer_navigator_id', 'youth_name')
+    }
+
+
+def build_tasks(screenings, navigators):
+    return [
+        FollowUpTask(
+            screening_id=screening.pk, patient_id=screening.patient_id,
+            peer_navigator_id=navigators.get(screening.patient_id, (None, None))[0],
+            screening_date=screening.date, due_at=follow_up_due(screening),
+        )
+        for screening in screenings
+    ]
+
+
+def queue_alerts(screenings, navigators, now=None):
+    """Queue an ``abnormal_result`` notification for the patient and navigator of each screening"""
+    now = now or timezone.now()
+    items = []
+    for screening in screenings:
+        navigator_id, patient_name = navigators.get(screening.patient_id, (None, None))
+        items.append(NotificationItem(
+            user_id=screening.patient_id, title='Your screening result needs attention',
+            message=f'Your {screening.test_type} result needs a follow-up. Please contact your health worker.',
+            type='abnormal_result', action='view_result', related_id=str(screening.pk),
+            priority=NotificationItem.PRIORITY_HIGH, category='screening',
+        ))
+        if navigator_id:
+            items.append(NotificationItem(
+                user_id=navigator_id, title='Abnormal screening result',
+                message=f'{patient_name} has an abnormal {screening.test_type} result that needs a follow-up.',
+                type='abnormal_result', action='review_abnormal_result', related_id=str(screening.pk),
+                priority=NotificationItem.PRIORITY_HIGH, category='screening',
+            ))
+    if not items:
+        return []
+
+    local_time = timezone.localtime(now).time()
+    quiet_hours = NotificationPreference.objects.filter(user_id__in={item.user_id for item in items}).values_list(
+        'user_id', 'quiet_hours_start', 'quiet_hours_end'
+    )
+    deferred = {
+        user_id: quiet_hours_end(end, now)
+        for user_id, start, end in quiet_hours if in_quiet_hours(start, end, local_time)
+    }
+    for item in items:
+        item.scheduled_for = deferred.get(item.user_id, now)
+
+    # Scheduled notifications join the unread counters when the dispatcher releases them
+    return NotificationItem.objects.bulk_create(items)
+
+
+def enqueue_follow_ups(screenings):
+    """Queue tasks and alerts for newly inserted screenings, e.g. after a ``bulk_create``"""
+    flagged = [screening for screening in screenings if is_flagged(screening.status, screening.requires_follow_up)]
+    if not flagged:
+        return
+    navigators = active_navigators({screening.patient_id for screening in flagged})
+    FollowUpTask.objects.bulk_create(build_tasks(flagged, navigators))
+    queue_alerts([screening for screening in flagged if screening.status == 'abnormal'], navigators)
+
+
+def screening_saved(screening, previous_state):
+    """Move a saved screening's task, given its ``get_rollup_state()`` before the save (None if new)"""
+    if previous_state is None:
+        enqueue_follow_ups([screening])
+        return
+
+    (_, _, previous_status, _), previous_follow_up = previous_state
+    was_flagged = is_flagged(previous_status, previous_follow_up)
+    if not is_flagged(screening.status, screening.requires_follow_up):
+        if was_flagged:
+            FollowUpTask.objects.filter(screening_id=screening.pk).delete()
+        return
+
+    due_at = follow_up_due(screening)
+    # A new due date, e.g. from schedule_follow_up(), reopens a finished task
+    moved = FollowUpTask.objects.filter(screening_id=screening.pk).update(
+        screening_date=screening.date, due_at=due_at,
+        status=Case(When(due_at=due_at, then=F('status')), default=Value('open')),
+        completed_at=Case(When(due_at=due_at, then=F('completed_at')), default=Value(None)),
+        updated_at=timezone.now(),
+    )
+    becomes_abnormal = screening.status == 'abnormal' and previous_status != 'abnormal'
+    if moved and not becomes_abnormal:
+        return
+    navigators = active_navigators([screening.patient_id])
+    if not moved:
+        FollowUpTask.objects.bulk_create(build_tasks([screening], navigators))
+    if becomes_abnormal:
+        queue_alerts([screening], navigators)
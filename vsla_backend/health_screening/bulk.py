@@ -0,0 +1,71 @@
+from django.db import transaction
+
+from vsla_backend.users.models import UserProfile
+from .alerts import enqueue_follow_ups
+from .models import ScreeningResult, ScreeningStatisticsRollup
+from .serializers import ScreeningResultBulkItemSerializer
+
+
+def referenced_user_ids(records):
+    """Collect every patient and conductor id mentioned in an upload"""
+    ids = set()
+    for record in records:
+        if not isinstance(record, dict):
+            continue
+        for key in ('patient', 'conducted_by'):
+            try:
+                ids.add(int(record[key]))
+            except (KeyError, TypeError, ValueError):
+                pass
+    return ids
+
+
+def ingest_screenings(records, conducted_by, chunk_size=500):
+    """Validate and insert a batch of screening records.
+
+    All referenced users are loaded with one query, status inference runs on
+    unsaved instances and rows are written with ``bulk_create`` in chunks
+    inside a single transaction. Invalid rows are skipped and reported.
+
+    Returns ``(created, errors)`` where ``errors`` is a list of
+    ``{'index': ..., 'errors': ...}`` entries for rejected records.
+    """
+    users = UserProfile.objects.only('id', 'role').in_bulk(referenced_user_ids(records))
+    serializer_context = {'users': users}
+
+    screenings = []
+    errors = []
+    for index, record in enumerate(records):
+        serializer = ScreeningResultBulkItemSerializer(data=record, context=serializer_context)
+        if not serializer.is_valid():
+            errors.append({'index': index, 'errors': serializer.errors})
+            continue
+
+        data = serializer.validated_data
+        screening = ScreeningResult(
+            patient_id=data['patient'],
+            test_type=data['test_type'],
+            result=data['result'],
+            notes=data['notes'],
+            location=data['location'],
+            # Set the conducted_by to the uploading user if not specified
+            conducted_by_id=data.get('conducted_by') or conducted_by.id,
+        )
+        screening.infer_status()
+        screenings.append(screening)
+
+    created = []
+    with transaction.atomic():
+        for start in range(0, len(screenings), chunk_size):
+            created.extend(ScreeningResult.objects.bulk_create(screenings[start:start + chunk_size]))
+
+        # bulk_create bypasses save(), so fold the new rows into the rollup here
+        deltas = {}
+        for screening in created:
+            bucket, requires_follow_up = screening.get_rollup_state()
+            count, follow_up = deltas.get(bucket, (0, 0))
+            deltas[bucket] = (count + 1, follow_up + int(requires_follow_up))
+        ScreeningStatisticsRollup.apply_deltas(deltas)
+        enqueue_follow_ups(created)
+
+    return created, errors
@@ -0,0 +1,78 @@
+import csv
+import json
+
+from django.utils import timezone
+
+from vsla_backend.users.models import full_name_expression
+
+
+# (header, queryset field) pairs, in output order
+EXPORT_COLUMNS = [
+    ('id', 'id'),
+    ('patient_id', 'patient_id'),
+    ('patient_name', 'patient_name'),
+    ('patient_phone', 'patient__phone_number'),
+    ('test_type', 'test_type'),
+    ('result', 'result'),
+    ('status', 'status'),
+    ('date', 'date'),
+    ('location', 'location'),
+    ('conducted_by_id', 'conducted_by_id'),
+    ('conducted_by_name', 'conducted_by_name'),
+    ('requires_follow_up', 'requires_follow_up'),
+    ('follow_up_date', 'follow_up_date'),
+    ('follow_up_instructions', 'follow_up_instructions'),
+    ('notes', 'notes'),
+]
+
+EXPORT_HEADERS = [header for header, _ in EXPORT_COLUMNS]
+
+EXPORT_CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+class Echo:
+    """File-like object that hands back what is written, for streaming csv rows"""
+    
+    def write(self, value):
+        return value
+
+
+def export_rows(queryset, chunk_size=2000):
+    """Yield plain tuples for ``EXPORT_COLUMNS`` without building model instances.
+
+    Names are computed in SQL and rows are fetched ``chunk_size`` at a time,
+    so memory use does not depend on the size of the export.
+    """
+    rows = queryset.annotate(
+        patient_name=full_name_expression('patient'),
+        conducted_by_name=full_name_expression('conducted_by'),
+    ).values_list(*(field for _, field in EXPORT_COLUMNS))
+    
+    for row in rows.iterator(chunk_size=chunk_size):
+        yield tuple(
+            timezone.localtime(value).isoformat() if hasattr(value, 'tzinfo') else value
+            for value in row
+        )
+
+
+def stream_csv(rows):
+    """Yield CSV lines, starting with the header"""
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_HEADERS)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def stream_ndjson(rows):
+    """Yield one JSON object per line"""
+    for row in rows:
+        yield json.dumps(dict(zip(EXPORT_HEADERS, row))) + '\n'
+
+
+STREAM_WRITERS = {
+    'csv': stream_csv,
+    'ndjson': stream_ndjson,
+}
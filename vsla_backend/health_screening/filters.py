@@ -0,0 +1,34 @@
+import django_filters
+
+from .models import ScreeningResult
+from .statistics import local_day_bounds
+
+
+class ScreeningResultFilter(django_filters.FilterSet):
+    """Filters shared by the screening list and export endpoints"""
+    date_from = django_filters.DateFilter(method='filter_date_from')
+    date_to = django_filters.DateFilter(method='filter_date_to')
+    
+    class Meta:
+        model = ScreeningResult
+        fields = ['patient', 'test_type', 'status', 'location', 'requires_follow_up']
+    
+    def filter_date_from(self, queryset, name, value):
+        start, _ = local_day_bounds(date_from=value)
+        return queryset.filter(date__gte=start)
+    
+    def filter_date_to(self, queryset, name, value):
+        _, end = local_day_bounds(date_to=value)
+        return queryset.filter(date__lt=end)
+
+
+def visible_screenings(user, queryset=None):
+    """Limit screenings to those the user may see"""
+    if queryset is None:
+        queryset = ScreeningResult.objects.all()
+    
+    # If user is youth, only show their own results
+    if user.role == 'youth':
+        queryset = queryset.filter(patient=user)
+    
+    return queryset
@@ -0,0 +1,71 @@
+import random
+import statistics
+import time
+
+from django.db import connection, reset_queries
+from django.test.utils import CaptureQueriesContext
+
+from vsla_backend.users.models import UserProfile
+from vsla_backend.health_screening.models import ScreeningResult
+
+
+class BenchmarkRollback(Exception):
+    """Raised inside a benchmark transaction to discard the seeded rows"""
+
+
+def seed_screening_results(rows, patients=500, conductors=50, batch_size=5000, seed=42):
+    """Insert synthetic users and screening results for benchmarking"""
+    rng = random.Random(seed)
+    prefix = f'bench{rng.randrange(10 ** 6):06d}'
+
+    users = [
+        UserProfile(username=f'{prefix}y{i}', phone_number=f'{prefix}y{i}', role='youth',
+                    first_name='Youth', last_name=str(i))
+        for i in range(patients)
+    ] + [
+        UserProfile(username=f'{prefix}s{i}', phone_number=f'{prefix}s{i}', role='staff',
+                    first_name='Staff', last_name=str(i))
+        for i in range(conductors)
+    ]
+    UserProfile.objects.bulk_create(users, batch_size=batch_size)
+    patient_ids = list(UserProfile.objects.filter(username__startswith=f'{prefix}y').values_list('id', flat=True))
+    conductor_ids = list(UserProfile.objects.filter(username__startswith=f'{prefix}s').values_list('id', flat=True))
+
+    statuses = [choice[0] for choice in ScreeningResult.STATUS_CHOICES]
+    locations = [choice[0] for choice in ScreeningResult.LOCATION_CHOICES]
+    test_types = [choice[0] for choice in ScreeningResult.TEST_TYPE_CHOICES]
+
+    created = 0
+    while created < rows:
+        batch = []
+        for _ in range(min(batch_size, rows - created)):
+            status = rng.choice(statuses)
+            batch.append(ScreeningResult(
+                patient_id=rng.choice(patient_ids),
+                conducted_by_id=rng.choice(conductor_ids),
+                test_type=rng.choice(test_types),
+                result='normal' if status == 'normal' else 'elevated',
+                status=status,
+                location=rng.choice(locations),
+                requires_follow_up=status in ('abnormal', 'follow_up_needed'),
+            ))
+        ScreeningResult.objects.bulk_create(batch, batch_size=batch_size)
+        created += len(batch)
+
+    return patient_ids, conductor_ids
+
+
+def measure(func, repeat=5):
+    """Run ``func`` repeatedly and return (median_ms, query_count, result)"""
+    timings = []
+    result = None
+    query_count = 0
+    for _ in range(repeat):
+        # Seeding can fill the debug query log, which would hide new queries
+        reset_queries()
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            result = func()
+            timings.append((time.perf_counter() - started) * 1000)
+        query_count = len(queries)
+    return statistics.median(timings), query_count, result
@@ -0,0 +1,66 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from vsla_backend.health_screening.models import ScreeningResult
+from vsla_backend.health_screening.serializers import ScreeningResultSerializer, ScreeningResultRowSerializer
+from ._benchmark import BenchmarkRollback, measure, seed_screening_results
+
+
+def render_with_serializer(page_size, offset=0):
+    queryset = ScreeningResult.objects.select_related('patient', 'conducted_by').order_by('-date', '-id')
+    page = queryset[offset:offset + page_size]
+    return JSONRenderer().render(ScreeningResultSerializer(page, many=True).data)
+
+
+def render_with_fast_path(page_size, offset=0):
+    rows = ScreeningResultRowSerializer.get_values(ScreeningResult.objects.order_by('-date', '-id'))
+    page = rows[offset:offset + page_size]
+    return JSONRenderer().render(ScreeningResultRowSerializer.serialize(page))
+
+
+class Command(BaseCommand):
+    help = 'Check the list fast path against ScreeningResultSerializer and benchmark both'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=20_000, help='Screening rows to seed')
+        parser.add_argument('--page-sizes', type=int, nargs='+', default=[20, 100, 500])
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per measurement (median is reported)')
+
+    def handle(self, *args, **options):
+        # Everything runs in one transaction that is rolled back, so the
+        # configured database is left untouched.
+        try:
+            with transaction.atomic():
+                self._run(options['rows'], options['page_sizes'], options['repeat'])
+                raise BenchmarkRollback
+        except BenchmarkRollback:
+            pass
+
+    def _run(self, rows, page_sizes, repeat):
+        self.stdout.write(f'Seeding {rows} screening results...')
+        started = time.perf_counter()
+        seed_screening_results(rows)
+        # Cover the optional columns: rows without a conductor and with a follow-up date
+        ids = list(ScreeningResult.objects.order_by('-date', '-id').values_list('id', flat=True)[:max(page_sizes)])
+        ScreeningResult.objects.filter(id__in=ids[::3]).update(conducted_by=None)
+        ScreeningResult.objects.filter(id__in=ids[1::3]).update(follow_up_date=timezone.now())
+        self.stdout.write(f'Seeded in {time.perf_counter() - started:.1f}s')
+
+        # Contract: both paths must render byte-identical JSON
+        for page_size in page_sizes:
+            for offset in (0, page_size):
+                if render_with_serializer(page_size, offset) != render_with_fast_path(page_size, offset):
+                    raise CommandError(f'Fast path output differs from ScreeningResultSerializer (page size {page_size})')
+        self.stdout.write(self.style.SUCCESS('Fast path output is byte-identical to ScreeningResultSerializer'))
+
+        for page_size in page_sizes:
+            serializer_ms, _, _ = measure(lambda: render_with_serializer(page_size), repeat)
+            fast_ms, _, _ = measure(lambda: render_with_fast_path(page_size), repeat)
+            self.stdout.write(
+                f'page size {page_size:<4} serializer={serializer_ms:8.1f} ms  '
+                f'fast path={fast_ms:8.1f} ms  speedup={serializer_ms / fast_ms:4.1f}x'
+            )
@@ -0,0 +1,78 @@
+import time
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from vsla_backend.health_screening.models import ScreeningResult
+from vsla_backend.health_screening.statistics import compute_screening_statistics, get_screening_statistics
+from ._benchmark import BenchmarkRollback, measure, seed_screening_results
+
+
+def legacy_screening_statistics():
+    """The per-bucket ``count()`` implementation the aggregate query replaced"""
+    test_type_counts = {}
+    for test_type in ScreeningResult.TEST_TYPE_CHOICES:
+        test_type_counts[test_type[0]] = ScreeningResult.objects.filter(test_type=test_type[0]).count()
+    return {
+        'total_screenings': ScreeningResult.objects.count(),
+        'normal_results': ScreeningResult.objects.filter(status='normal').count(),
+        'abnormal_results': ScreeningResult.objects.filter(status='abnormal').count(),
+        'pending_results': ScreeningResult.objects.filter(status='pending').count(),
+        'follow_up_needed': ScreeningResult.objects.filter(requires_follow_up=True).count(),
+        'test_type_breakdown': test_type_counts,
+    }
+
+
+class Command(BaseCommand):
+    help = 'Benchmark query count and latency of screening statistics on synthetic data'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000, help='Screening rows to seed')
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per measurement (median is reported)')
+
+    def handle(self, *args, **options):
+        # Everything runs in one transaction that is rolled back, so the
+        # configured database is left untouched.
+        try:
+            with transaction.atomic():
+                self._run(options['rows'], options['repeat'])
+                raise BenchmarkRollback
+        except BenchmarkRollback:
+            pass
+
+    def _run(self, rows, repeat):
+        self.stdout.write(f'Seeding {rows} screening results...')
+        started = time.perf_counter()
+        _, conductor_ids = seed_screening_results(rows)
+        self.stdout.write(f'Seeded in {time.perf_counter() - started:.1f}s')
+        # Seeding uses bulk_create, which does not maintain the rollup
+        call_command('rebuild_screening_rollup', stdout=StringIO())
+
+        cases = [
+            ('legacy per-bucket counts', legacy_screening_statistics),
+            ('aggregate engine', compute_screening_statistics),
+            ('aggregate engine, location filter', lambda: compute_screening_statistics(location='market')),
+            ('aggregate engine, conducted_by filter',
+             lambda: compute_screening_statistics(conducted_by=conductor_ids[0])),
+            ('rollup', get_screening_statistics),
+            ('rollup, location filter', lambda: get_screening_statistics(location='market')),
+        ]
+
+        results = {}
+        for label, func in cases:
+            median_ms, query_count, results[label] = measure(func, repeat)
+            self.stdout.write(f'{label:<40} queries={query_count:<3} median={median_ms:9.1f} ms')
+
+        legacy = results['legacy per-bucket counts']
+        differing = []
+        for label in ('aggregate engine', 'rollup'):
+            mismatched = [key for key in legacy if legacy[key] != results[label][key]]
+            if mismatched:
+                self.stderr.write(self.style.ERROR(f'{label} differs for: {", ".join(mismatched)}'))
+                differing.append(label)
+            else:
+                self.stdout.write(self.style.SUCCESS(f'{label} matches the legacy counts'))
+        if differing:
+            raise CommandError(f'Statistics differ from the legacy counts: {", ".join(differing)}')
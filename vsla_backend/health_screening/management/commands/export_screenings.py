@@ -0,0 +1,58 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from vsla_backend.users.models import UserProfile
+from vsla_backend.health_screening.models import ScreeningResult
+from vsla_backend.health_screening.export import STREAM_WRITERS, export_rows
+from vsla_backend.health_screening.filters import ScreeningResultFilter, visible_screenings
+
+
+class Command(BaseCommand):
+    help = 'Stream screening results to a CSV or NDJSON file with constant memory'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=sorted(STREAM_WRITERS), default='csv', dest='export_format')
+        parser.add_argument('--output', help='File to write to (defaults to stdout)')
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Rows fetched per database round trip')
+        parser.add_argument('--as-user', type=int, help='Only export what this user id could see through the API')
+
+        # Same filters as GET /api/v1/screenings/
+        parser.add_argument('--patient')
+        parser.add_argument('--test-type')
+        parser.add_argument('--status')
+        parser.add_argument('--location')
+        parser.add_argument('--requires-follow-up', choices=['true', 'false'])
+        parser.add_argument('--date-from', help='YYYY-MM-DD, inclusive')
+        parser.add_argument('--date-to', help='YYYY-MM-DD, inclusive')
+
+    def handle(self, *args, **options):
+        queryset = ScreeningResult.objects.all()
+        if options['as_user']:
+            try:
+                user = UserProfile.objects.get(id=options['as_user'])
+            except UserProfile.DoesNotExist:
+                raise CommandError(f'User {options["as_user"]} does not exist')
+            queryset = visible_screenings(user, queryset)
+
+        filter_names = ['patient', 'test_type', 'status', 'location', 'requires_follow_up', 'date_from', 'date_to']
+        filterset = ScreeningResultFilter(
+            data={name: options[name] for name in filter_names if options[name] is not None},
+            queryset=queryset,
+        )
+        if not filterset.is_valid():
+            raise CommandError(f'Invalid filters: {dict(filterset.errors)}')
+
+        rows = export_rows(filterset.qs.order_by('-date', '-id'), chunk_size=options['chunk_size'])
+        lines = STREAM_WRITERS[options['export_format']](rows)
+
+        output = open(options['output'], 'w', newline='', encoding='utf-8') if options['output'] else sys.stdout
+        try:
+            for line in lines:
+                output.write(line)
+        finally:
+            if output is not sys.stdout:
+                output.close()
+
+        if options['output']:
+            self.stdout.write(self.style.SUCCESS(f'Exported screening results to {options["output"]}'))
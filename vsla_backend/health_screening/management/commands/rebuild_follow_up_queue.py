@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+
+from vsla_backend.health_screening.alerts import active_navigators, build_tasks, follow_up_due
+from vsla_backend.health_screening.models import FollowUpTask, ScreeningResult
+
+
+class Command(BaseCommand):
+    help = 'Bring the follow-up queue in line with the screenings, or check it for drift; no alerts are sent'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Only compare the queue with the screenings and fail if they differ'
+        )
+        parser.add_argument('--batch-size', type=int, default=1000, help='Tasks created per query')
+
+    def handle(self, *args, **options):
+        flagged = ScreeningResult.objects.filter(Q(status='abnormal') | Q(requires_follow_up=True))
+        with transaction.atomic():
+            missing = list(
+                flagged.filter(follow_up_task__isnull=True).only('id', 'patient_id', 'date', 'follow_up_date')
+            )
+            stale = FollowUpTask.objects.exclude(screening__in=flagged.values('pk'))
+            stale_count = stale.count()
+            moved = []
+            for task in FollowUpTask.objects.filter(screening__in=flagged.values('pk')).select_related('screening'):
+                expected = (task.screening.date, follow_up_due(task.screening), task.screening.patient_id)
+                if (task.screening_date, task.due_at, task.patient_id) != expected:
+                    task.screening_date, task.due_at, task.patient_id = expected
+                    moved.append(task)
+
+            summary = f'{len(missing)} missing, {stale_count} stale and {len(moved)} out-of-date tasks'
+            if options['check']:
+                if missing or stale_count or moved:
+                    raise CommandError(f'The follow-up queue has drifted: {summary}')
+                self.stdout.write(self.style.SUCCESS('The follow-up queue is in sync'))
+                return
+
+            stale.delete()
+            FollowUpTask.objects.bulk_update(
+                moved, ['screening_date', 'due_at', 'patient'], batch_size=options['batch_size']
+            )
+            for start in range(0, len(missing), options['batch_size']):
+                batch = missing[start:start + options['batch_size']]
+                navigators = active_navigators({screening.patient_id for screening in batch})
+                FollowUpTask.objects.bulk_create(build_tasks(batch, navigators))
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt the follow-up queue: {summary} fixed'))
@@ -0,0 +1,83 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count, Q
+from django.db.models.functions import TruncDate
+
+from vsla_backend.health_screening.models import ScreeningResult, ScreeningStatisticsRollup
+
+
+def expected_rollup():
+    """Recompute every rollup bucket from the screenings in one grouped query"""
+    buckets = (
+        ScreeningResult.objects.order_by()
+        .annotate(day=TruncDate('date'))
+        .values('day', 'test_type', 'status', 'location')
+        .annotate(count=Count('id'), follow_up_count=Count('id', filter=Q(requires_follow_up=True)))
+    )
+    return {
+        (bucket['day'], bucket['test_type'], bucket['status'], bucket['location']):
+            (bucket['count'], bucket['follow_up_count'])
+        for bucket in buckets
+    }
+
+
+def stored_rollup():
+    """Load the current rollup table, leaving out empty buckets"""
+    rows = ScreeningStatisticsRollup.objects.order_by().values_list(
+        'day', 'test_type', 'status', 'location', 'count', 'follow_up_count'
+    )
+    return {
+        (day, test_type, status, location): (count, follow_up_count)
+        for day, test_type, status, location, count, follow_up_count in rows
+        if count or follow_up_count
+    }
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the screening statistics rollup from scratch, or check it for drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Only compare the rollup with the screenings and fail if they differ'
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            expected = expected_rollup()
+            stored = stored_rollup()
+            drifted = sorted(
+                (bucket for bucket in expected.keys() | stored.keys()
+                 if expected.get(bucket, (0, 0)) != stored.get(bucket, (0, 0))),
+                key=str,
+            )
+
+            for bucket in drifted[:20]:
+                self.stdout.write(
+                    f'{" / ".join(str(part) for part in bucket)}: '
+                    f'stored {stored.get(bucket, (0, 0))}, expected {expected.get(bucket, (0, 0))}'
+                )
+            if len(drifted) > 20:
+                self.stdout.write(f'... and {len(drifted) - 20} more')
+
+            if options['check']:
+                if drifted:
+                    raise CommandError(f'{len(drifted)} of {len(expected)} rollup buckets have drifted')
+                self.stdout.write(self.style.SUCCESS(f'All {len(expected)} rollup buckets are in sync'))
+                return
+
+            ScreeningStatisticsRollup.objects.all().delete()
+            ScreeningStatisticsRollup.objects.bulk_create(
+                [
+                    ScreeningStatisticsRollup(
+                        day=day, test_type=test_type, status=status, location=location,
+                        count=count, follow_up_count=follow_up_count
+                    )
+                    for (day, test_type, status, location), (count, follow_up_count) in expected.items()
+                ],
+                batch_size=1000,
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt {len(expected)} rollup buckets ({len(drifted)} had drifted)'
+        ))
@@ -1,5 +1,9 @@
-from django.db import models
+from django.db import models, transaction, IntegrityError
+from django.db.models import F
+from django.db.models.signals import pre_delete
+from django.dispatch import receiver
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.utils import timezone
 from vsla_backend.users.models import UserProfile
 
 
@@ -76,21 +80,63 @@ class ScreeningResult(models.Model):
             models.Index(fields=['patient', 'date']),
             models.Index(fields=['status', 'date']),
             models.Index(fields=['test_type', 'date']),
+            models.Index(fields=['test_type', 'status', 'requires_follow_up']),
         ]
     
+    # Fields that decide which statistics rollup bucket a row counts towards
+    ROLLUP_FIELDS = ('date', 'test_type', 'status', 'location', 'requires_follow_up')
+    
     def __str__(self):
         return f"{self.patient.get_full_name()} - {self.test_type} ({self.status})"
     
-    def save(self, *args, **kwargs):
-        # Auto-update status based on result
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored bucket so save() and delete can move the row in the rollup
+        if not instance.get_deferred_fields().intersection(cls.ROLLUP_FIELDS):
+            instance._stored_rollup_state = instance.get_rollup_state()
+        return instance
+    
+    @staticmethod
+    def rollup_state(date, test_type, status, location, requires_follow_up):
+        """Build the (bucket, follow-up flag) pair used by the statistics rollup"""
+        return (timezone.localdate(date), test_type, status, location), requires_follow_up
+    
+    def get_rollup_state(self):
+        """Get the rollup bucket and follow-up flag for the current field values"""
+        return self.rollup_state(*(getattr(self, field) for field in self.ROLLUP_FIELDS))
+    
+    def _get_stored_rollup_state(self):
+        if self._state.adding:
+            return None
+        state = getattr(self, '_stored_rollup_state', None)
+        if state is None:
+            stored = ScreeningResult.objects.filter(pk=self.pk).values_list(*self.ROLLUP_FIELDS).first()
+            state = self.rollup_state(*stored) if stored else None
+        return state
+    
+    def infer_status(self):
+        """Auto-update status and follow-up flag based on the result"""
         if self.result and self.status == 'pending':
             if 'normal' in self.result.lower() or self.result.isdigit():
                 self.status = 'normal'
             else:
                 self.status = 'abnormal'
                 self.requires_follow_up = True
+    
+    def save(self, *args, **kwargs):
+        self.infer_status()
+        
+        from .alerts import screening_saved
         
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            previous_state = self._get_stored_rollup_state()
+            super().save(*args, **kwargs)
+            current_state = self.get_rollup_state()
+            ScreeningStatisticsRollup.record_transition(previous_state, current_state)
+            # Keep the follow-up queue in step and alert on a new abnormal result
+            screening_saved(self, previous_state)
+        self._stored_rollup_state = current_state
     
     def get_abnormal_results(self):
         """Get all abnormal results for this patient"""
@@ -107,6 +153,129 @@ class ScreeningResult(models.Model):
         self.save(update_fields=['follow_up_date', 'follow_up_instructions', 'requires_follow_up'])
 
 
+@receiver(pre_delete, sender=ScreeningResult)
+def remove_screening_from_rollup(sender, instance, **kwargs):
+    """Take deleted screenings, including cascaded deletes, out of the rollup"""
+    # Runs inside the delete transaction, while deferred fields can still be loaded
+    ScreeningStatisticsRollup.record_transition(instance._get_stored_rollup_state(), None)
+
+
+class ScreeningStatisticsRollup(models.Model):
+    """Screening counts per day, test type, status and location.
+
+    Maintained incrementally by ``ScreeningResult.save()`` and deletes so the
+    statistics endpoints read a handful of buckets instead of every screening.
+    Bulk ``QuerySet.update()`` calls bypass it; ``rebuild_screening_rollup``
+    recomputes the table and reports drift.
+    """
+    
+    day = models.DateField()
+    test_type = models.CharField(max_length=50, choices=ScreeningResult.TEST_TYPE_CHOICES)
+    status = models.CharField(max_length=20, choices=ScreeningResult.STATUS_CHOICES)
+    location = models.CharField(max_length=20, choices=ScreeningResult.LOCATION_CHOICES)
+    count = models.IntegerField(default=0)
+    follow_up_count = models.IntegerField(default=0)
+    
+    class Meta:
+        verbose_name = 'Screening Statistics Rollup'
+        verbose_name_plural = 'Screening Statistics Rollups'
+        ordering = ['-day']
+        unique_together = ['day', 'test_type', 'status', 'location']
+        indexes = [
+            models.Index(fields=['location', 'day']),
+        ]
+    
+    def __str__(self):
+        return f"{self.day} {self.test_type} {self.status} @ {self.location}: {self.count}"
+    
+    @classmethod
+    def record_transition(cls, previous_state, current_state):
+        """Move one screening between buckets, given ``get_rollup_state()`` values or None"""
+        deltas = {}
+        for state, sign in ((previous_state, -1), (current_state, 1)):
+            if state is None:
+                continue
+            bucket, requires_follow_up = state
+            count, follow_up = deltas.get(bucket, (0, 0))
+            deltas[bucket] = (count + sign, follow_up + sign * int(bool(requires_follow_up)))
+        cls.apply_deltas(deltas)
+    
+    @classmethod
+    def apply_deltas(cls, deltas):
+        """Apply ``{(day, test_type, status, location): (count, follow_up_count)}`` deltas"""
+        for (day, test_type, status, location), (count, follow_up) in deltas.items():
+            if not count and not follow_up:
+                continue
+            bucket = cls.objects.filter(day=day, test_type=test_type, status=status, location=location)
+            changes = {
+                'count': F('count') + count,
+                'follow_up_count': F('follow_up_count') + follow_up,
+            }
+            if bucket.update(**changes) or count <= 0:
+                continue
+            try:
+                with transaction.atomic():
+                    cls.objects.create(
+                        day=day, test_type=test_type, status=status, location=location,
+                        count=count, follow_up_count=follow_up
+                    )
+            except IntegrityError:
+                # Another writer created the bucket first
+                bucket.update(**changes)
+
+
+class FollowUpTask(models.Model):
+    """Work queue of screenings that are abnormal or need a follow-up, one row per screening.
+    
+    Kept in step by ``ScreeningResult.save()`` and the bulk import (see
+    alerts.py) so the abnormal list and overdue follow-ups are index reads.
+    Bulk ``QuerySet.update()`` calls bypass it; ``rebuild_follow_up_queue``
+    recomputes the table.
+    """
+    
+    STATUS_CHOICES = [
+        ('open', 'Open'),
+        ('done', 'Done'),
+    ]
+    
+    screening = models.OneToOneField(ScreeningResult, on_delete=models.CASCADE, related_name='follow_up_task')
+    patient = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='follow_up_tasks')
+    peer_navigator = models.ForeignKey(
+        UserProfile, 
+        on_delete=models.SET_NULL, 
+        null=True, 
+        blank=True,
+        related_name='assigned_follow_up_tasks',
+        help_text="Navigator of the patient's active assignment when the task was queued"
+    )
+    screening_date = models.DateTimeField(help_text="Copy of the screening date, the order of the abnormal list")
+    due_at = models.DateTimeField(help_text="The screening's follow-up date, or a default after the screening")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='open')
+    completed_at = models.DateTimeField(null=True, blank=True)
+    
+    # Timestamps
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Follow-up Task'
+        verbose_name_plural = 'Follow-up Tasks'
+        ordering = ['due_at']
+        indexes = [
+            models.Index(fields=['status', 'due_at']),
+            models.Index(fields=['peer_navigator', 'status', 'due_at']),
+            models.Index(fields=['screening_date', 'screening']),
+            models.Index(fields=['patient', 'screening_date', 'screening']),
+        ]
+    
+    def __str__(self):
+        return f"Follow-up of screening {self.screening_id} due {self.due_at:%Y-%m-%d} ({self.status})"
+    
+    def is_overdue(self):
+        """Check if the follow-up is still open past its due date"""
+        return self.status == 'open' and self.due_at < timezone.now()
+
+
 class HealthWorkerProfile(models.Model):
     """Health worker profiles for the platform"""
     
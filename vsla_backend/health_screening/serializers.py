@@ -1,5 +1,7 @@
+from django.db.models import F
 from rest_framework import serializers
-from .models import ScreeningResult, HealthWorkerProfile
+from .models import FollowUpTask, ScreeningResult, HealthWorkerProfile
+from vsla_backend.users.models import full_name_expression
 from vsla_backend.users.serializers import UserProfileSerializer
 
 
@@ -20,6 +22,67 @@ class ScreeningResultSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'date', 'created_at', 'updated_at']
 
 
+class ScreeningResultRowSerializer:
+    """Read-only fast path for ``ScreeningResultSerializer`` on list endpoints.
+
+    Rows are fetched with ``.values()`` (names computed in SQL) and turned into
+    dicts directly, skipping model instances and per-field DRF machinery. The
+    output renders to the same JSON bytes as ``ScreeningResultSerializer``,
+    including leaving out ``conducted_by_name`` when there is no conductor.
+    """
+    
+    fields = ScreeningResultSerializer.Meta.fields
+    # Relations come back as raw foreign key columns
+    row_keys = {'patient': 'patient_id', 'conducted_by': 'conducted_by_id'}
+    datetime_fields = ('date', 'follow_up_date', 'created_at', 'updated_at')
+    datetime_field = serializers.DateTimeField()
+    
+    @classmethod
+    def get_values(cls, queryset):
+        """Turn a screening queryset into a ``.values()`` queryset with every output column"""
+        return queryset.values(
+            'id', 'patient_id', 'test_type', 'result', 'date', 'status', 'notes', 'location',
+            'conducted_by_id', 'requires_follow_up', 'follow_up_instructions', 'follow_up_date',
+            'created_at', 'updated_at',
+            patient_name=full_name_expression('patient'),
+            patient_phone=F('patient__phone_number'),
+            conducted_by_name=full_name_expression('conducted_by'),
+        )
+    
+    @classmethod
+    def to_representation(cls, row):
+        data = {}
+        for field in cls.fields:
+            value = row[cls.row_keys.get(field, field)]
+            if field in cls.datetime_fields:
+                value = cls.datetime_field.to_representation(value) if value is not None else None
+            elif field == 'conducted_by_name' and value is None:
+                continue
+            data[field] = value
+        return data
+    
+    @classmethod
+    def serialize(cls, rows):
+        return [cls.to_representation(row) for row in rows]
+
+
+class FollowUpTaskSerializer(serializers.ModelSerializer):
+    """Serializer for entries of the follow-up queue"""
+    patient_name = serializers.CharField(source='patient.get_full_name', read_only=True)
+    patient_phone = serializers.CharField(source='patient.phone_number', read_only=True)
+    test_type = serializers.CharField(source='screening.test_type', read_only=True)
+    follow_up_instructions = serializers.CharField(source='screening.follow_up_instructions', read_only=True)
+    is_overdue = serializers.BooleanField(read_only=True)
+    
+    class Meta:
+        model = FollowUpTask
+        fields = [
+            'id', 'screening', 'patient', 'patient_name', 'patient_phone', 'peer_navigator', 'test_type',
+            'follow_up_instructions', 'screening_date', 'due_at', 'status', 'completed_at', 'is_overdue'
+        ]
+        read_only_fields = fields
+
+
 class ScreeningResultCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating new screening results"""
     
@@ -41,6 +104,40 @@ class ScreeningResultCreateSerializer(serializers.ModelSerializer):
         return attrs
 
 
+class ScreeningResultBulkItemSerializer(serializers.Serializer):
+    """Serializer for one record of a bulk screening upload.
+
+    Patients and conductors are checked against ``context['users']``, a dict
+    of users fetched once for the whole upload, instead of one query per row.
+    """
+    patient = serializers.IntegerField()
+    test_type = serializers.ChoiceField(choices=ScreeningResult.TEST_TYPE_CHOICES)
+    result = serializers.CharField(max_length=200)
+    notes = serializers.CharField(required=False, allow_blank=True, default='')
+    location = serializers.ChoiceField(choices=ScreeningResult.LOCATION_CHOICES, default='clinic')
+    conducted_by = serializers.IntegerField(required=False, allow_null=True)
+    
+    def validate(self, attrs):
+        users = self.context['users']
+        
+        # Ensure the patient is a youth
+        patient = users.get(attrs['patient'])
+        if patient is None:
+            raise serializers.ValidationError({'patient': 'Patient not found'})
+        if patient.role != 'youth':
+            raise serializers.ValidationError("Patient must be a youth")
+        
+        # Ensure the conductor is staff or peer navigator
+        if attrs.get('conducted_by') is not None:
+            conductor = users.get(attrs['conducted_by'])
+            if conductor is None:
+                raise serializers.ValidationError({'conducted_by': 'Conductor not found'})
+            if conductor.role not in ['staff', 'peer_navigator']:
+                raise serializers.ValidationError("Conductor must be staff or peer navigator")
+        
+        return attrs
+
+
 class ScreeningResultUpdateSerializer(serializers.ModelSerializer):
     """Serializer for updating screening results"""
     
@@ -84,11 +181,22 @@ class ScreeningResultFilterSerializer(serializers.Serializer):
     test_type = serializers.CharField(required=False)
     status = serializers.CharField(required=False)
     location = serializers.CharField(required=False)
+    conducted_by = serializers.IntegerField(required=False)
     date_from = serializers.DateField(required=False)
     date_to = serializers.DateField(required=False)
     requires_follow_up = serializers.BooleanField(required=False)
 
 
+class ScreeningTimeseriesFilterSerializer(serializers.Serializer):
+    """Serializer for filtering the screening statistics time series"""
+    interval = serializers.ChoiceField(choices=['day', 'week', 'month'], default='day')
+    test_type = serializers.ChoiceField(choices=ScreeningResult.TEST_TYPE_CHOICES, required=False)
+    status = serializers.ChoiceField(choices=ScreeningResult.STATUS_CHOICES, required=False)
+    location = serializers.ChoiceField(choices=ScreeningResult.LOCATION_CHOICES, required=False)
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+
+
 class HealthWorkerAvailabilitySerializer(serializers.Serializer):
     """Serializer for updating health worker availability"""
     availability = serializers.ChoiceField(choices=HealthWorkerProfile.AVAILABILITY_CHOICES)
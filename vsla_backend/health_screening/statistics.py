@@ -0,0 +1,180 @@
+import datetime
+
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+from django.utils import timezone
+
+from .models import ScreeningResult, ScreeningStatisticsRollup
+
+
+TIMESERIES_INTERVALS = {
+    'day': None,
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+
+
+def local_day_bounds(date_from=None, date_to=None):
+    """Convert an inclusive local date range into aware datetime bounds.
+
+    Returns ``(start, end)`` where ``end`` is exclusive, so callers can filter
+    ``date__gte=start, date__lt=end`` and keep the ``date`` indexes usable
+    instead of wrapping the column in a ``date__date`` conversion.
+    """
+    start = end = None
+    if date_from:
+        start = timezone.make_aware(datetime.datetime.combine(date_from, datetime.time.min))
+    if date_to:
+        next_day = date_to + datetime.timedelta(days=1)
+        end = timezone.make_aware(datetime.datetime.combine(next_day, datetime.time.min))
+    return start, end
+
+
+def filter_screenings(queryset=None, date_from=None, date_to=None, location=None, conducted_by=None):
+    """Apply the statistics filters to a screening queryset"""
+    if queryset is None:
+        queryset = ScreeningResult.objects.all()
+
+    start, end = local_day_bounds(date_from, date_to)
+    if start:
+        queryset = queryset.filter(date__gte=start)
+    if end:
+        queryset = queryset.filter(date__lt=end)
+    if location:
+        queryset = queryset.filter(location=location)
+    if conducted_by:
+        queryset = queryset.filter(conducted_by_id=conducted_by)
+
+    return queryset
+
+
+def get_screening_statistics(date_from=None, date_to=None, location=None, conducted_by=None):
+    """Get dashboard statistics, reading the rollup whenever the filters allow it.
+
+    The rollup has no conductor dimension, so ``conducted_by`` falls back to
+    aggregating the screenings themselves.
+    """
+    if conducted_by:
+        return compute_screening_statistics(
+            date_from=date_from, date_to=date_to, location=location, conducted_by=conducted_by
+        )
+    return compute_rollup_statistics(date_from=date_from, date_to=date_to, location=location)
+
+
+def filter_rollup(date_from=None, date_to=None, location=None, test_type=None, status=None):
+    """Filter rollup buckets; dates are local days like the ``day`` column"""
+    queryset = ScreeningStatisticsRollup.objects.order_by()
+    if date_from:
+        queryset = queryset.filter(day__gte=date_from)
+    if date_to:
+        queryset = queryset.filter(day__lte=date_to)
+    if location:
+        queryset = queryset.filter(location=location)
+    if test_type:
+        queryset = queryset.filter(test_type=test_type)
+    if status:
+        queryset = queryset.filter(status=status)
+    return queryset
+
+
+def compute_rollup_statistics(**filters):
+    """Compute dashboard statistics from the rollup in O(buckets)"""
+    status_counts = {status_value: 0 for status_value, _ in ScreeningResult.STATUS_CHOICES}
+    test_type_counts = {test_type: 0 for test_type, _ in ScreeningResult.TEST_TYPE_CHOICES}
+    total = follow_up = 0
+
+    buckets = filter_rollup(**filters).values('test_type', 'status').annotate(
+        total=Sum('count'), follow_up=Sum('follow_up_count')
+    )
+    for bucket in buckets:
+        total += bucket['total']
+        follow_up += bucket['follow_up']
+        status_counts[bucket['status']] = status_counts.get(bucket['status'], 0) + bucket['total']
+        test_type_counts[bucket['test_type']] = test_type_counts.get(bucket['test_type'], 0) + bucket['total']
+
+    return build_statistics_response(total, follow_up, status_counts, test_type_counts)
+
+
+def compute_rollup_timeseries(interval='day', **filters):
+    """Screening counts per period with a status breakdown, read from the rollup"""
+    truncate = TIMESERIES_INTERVALS[interval]
+    period = truncate('day') if truncate else F('day')
+
+    buckets = (
+        filter_rollup(**filters)
+        .annotate(period=period)
+        .values('period', 'status')
+        .annotate(total=Sum('count'), follow_up=Sum('follow_up_count'))
+        .order_by('period')
+    )
+
+    series = {}
+    for bucket in buckets:
+        point = series.setdefault(bucket['period'], {
+            'period': bucket['period'],
+            'total': 0,
+            'follow_up_needed': 0,
+            'status_breakdown': {status_value: 0 for status_value, _ in ScreeningResult.STATUS_CHOICES},
+        })
+        point['total'] += bucket['total']
+        point['follow_up_needed'] += bucket['follow_up']
+        point['status_breakdown'][bucket['status']] = (
+            point['status_breakdown'].get(bucket['status'], 0) + bucket['total']
+        )
+
+    return list(series.values())
+
+
+def compute_screening_statistics(queryset=None, **filters):
+    """Compute every status, follow-up and test type bucket in a single query.
+
+    Unfiltered statistics are grouped by ``(test_type, status)``, which SQLite
+    answers from the covering ``test_type, status, requires_follow_up`` index.
+    When filters are given the planner would still pick that index and visit
+    every row, so the filtered form uses conditional counts over the rows the
+    filter indexes select instead.
+    """
+    has_filters = any(filters.values())
+    queryset = filter_screenings(queryset, **filters).order_by()
+
+    status_counts = {status_value: 0 for status_value, _ in ScreeningResult.STATUS_CHOICES}
+    test_type_counts = {test_type: 0 for test_type, _ in ScreeningResult.TEST_TYPE_CHOICES}
+    follow_up_count = Count('id', filter=Q(requires_follow_up=True))
+
+    if not has_filters:
+        total = follow_up = 0
+        buckets = queryset.values('test_type', 'status').annotate(count=Count('id'), follow_up=follow_up_count)
+        for bucket in buckets:
+            total += bucket['count']
+            follow_up += bucket['follow_up']
+            status_counts[bucket['status']] = status_counts.get(bucket['status'], 0) + bucket['count']
+            test_type_counts[bucket['test_type']] = test_type_counts.get(bucket['test_type'], 0) + bucket['count']
+        return build_statistics_response(total, follow_up, status_counts, test_type_counts)
+
+    # Aggregate aliases must be plain identifiers, so map them back afterwards
+    aggregates = {'total': Count('id'), 'follow_up': follow_up_count}
+    for index, status_value in enumerate(status_counts):
+        aggregates[f'status_{index}'] = Count('id', filter=Q(status=status_value))
+    for index, test_type in enumerate(test_type_counts):
+        aggregates[f'test_type_{index}'] = Count('id', filter=Q(test_type=test_type))
+
+    row = queryset.aggregate(**aggregates)
+    for index, status_value in enumerate(status_counts):
+        status_counts[status_value] = row[f'status_{index}']
+    for index, test_type in enumerate(test_type_counts):
+        test_type_counts[test_type] = row[f'test_type_{index}']
+
+    return build_statistics_response(row['total'], row['follow_up'], status_counts, test_type_counts)
+
+
+def build_statistics_response(total, follow_up, status_counts, test_type_counts):
+    """Shape bucket counts into the ``screenings/statistics/`` payload"""
+    return {
+        'total_screenings': total,
+        'normal_results': status_counts.get('normal', 0),
+        'abnormal_results': status_counts.get('abnormal', 0),
+        'pending_results': status_counts.get('pending', 0),
+        'follow_up_needed': follow_up,
+        'status_breakdown': status_counts,
+        'test_type_breakdown': test_type_counts,
+    }
@@ -6,10 +6,14 @@ app_name = 'health_screening'
 urlpatterns = [
     # Screening results
     path('screenings/', views.ScreeningResultListCreateView.as_view(), name='screening-list-create'),
+    path('screenings/export/', views.ScreeningResultExportView.as_view(), name='screening-export'),
+    path('screenings/bulk/', views.ScreeningResultBulkCreateView.as_view(), name='screening-bulk-create'),
     path('screenings/<int:pk>/', views.ScreeningResultDetailView.as_view(), name='screening-detail'),
     path('screenings/patient/<int:patient_id>/history/', views.PatientScreeningHistoryView.as_view(), name='patient-history'),
     path('screenings/abnormal/', views.AbnormalResultsView.as_view(), name='abnormal-results'),
     path('screenings/<int:screening_id>/follow-up/', views.schedule_follow_up, name='schedule-follow-up'),
+    path('screenings/follow-ups/overdue/', views.OverdueFollowUpsView.as_view(), name='overdue-follow-ups'),
+    path('screenings/follow-ups/<int:task_id>/complete/', views.complete_follow_up, name='complete-follow-up'),
     
     # Health worker profiles
     path('health-workers/', views.HealthWorkerListView.as_view(), name='health-worker-list'),
@@ -18,4 +22,5 @@ urlpatterns = [
     
     # Statistics
     path('screenings/statistics/', views.screening_statistics, name='screening-statistics'),
+    path('screenings/statistics/timeseries/', views.screening_timeseries, name='screening-timeseries'),
 ]
@@ -1,23 +1,56 @@
 from rest_framework import status, generics, permissions, filters
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
 from django.shortcuts import get_object_or_404
-from django.db.models import Q
-from .models import ScreeningResult, HealthWorkerProfile
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from .models import FollowUpTask, ScreeningResult, HealthWorkerProfile
 from .serializers import (
     ScreeningResultSerializer, ScreeningResultCreateSerializer,
     ScreeningResultUpdateSerializer, HealthWorkerProfileSerializer,
     HealthWorkerProfileUpdateSerializer, ScreeningResultFilterSerializer,
-    HealthWorkerAvailabilitySerializer
+    HealthWorkerAvailabilitySerializer, ScreeningTimeseriesFilterSerializer,
+    ScreeningResultRowSerializer, FollowUpTaskSerializer
 )
+from .statistics import get_screening_statistics, compute_rollup_timeseries
+from .bulk import ingest_screenings
+from .export import STREAM_WRITERS, EXPORT_CONTENT_TYPES, export_rows
+from .filters import ScreeningResultFilter, visible_screenings
+from vsla_backend.pagination import KeysetPagination, CursorPaginationOptInMixin
 
 
-class ScreeningResultListCreateView(generics.ListCreateAPIView):
+class ScreeningResultCursorPagination(KeysetPagination):
+    """Keyset pagination over the ``(date, id)`` ordering of screening lists"""
+    ordering = ('-date', '-id')
+
+
+class AbnormalResultCursorPagination(KeysetPagination):
+    """Keyset pagination over the follow-up queue in screening date order"""
+    ordering = ('-screening_date', '-screening_id')
+
+
+class ScreeningResultFastListMixin:
+    """Serve GET lists through ``ScreeningResultRowSerializer`` instead of model instances"""
+    
+    def list(self, request, *args, **kwargs):
+        rows = ScreeningResultRowSerializer.get_values(self.filter_queryset(self.get_queryset()))
+        
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(ScreeningResultRowSerializer.serialize(page))
+        
+        return Response(ScreeningResultRowSerializer.serialize(rows))
+
+
+class ScreeningResultListCreateView(ScreeningResultFastListMixin, CursorPaginationOptInMixin,
+                                    generics.ListCreateAPIView):
     """List and create screening results"""
+    cursor_pagination_class = ScreeningResultCursorPagination
     queryset = ScreeningResult.objects.all()
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['patient', 'test_type', 'status', 'location', 'requires_follow_up']
+    filterset_class = ScreeningResultFilter
     search_fields = ['patient__first_name', 'patient__last_name', 'notes']
     ordering_fields = ['date', 'created_at', 'status']
     ordering = ['-date']
@@ -28,21 +61,8 @@ class ScreeningResultListCreateView(generics.ListCreateAPIView):
         return ScreeningResultSerializer
     
     def get_queryset(self):
-        queryset = super().get_queryset()
-        
-        # Filter by date range if provided
-        date_from = self.request.query_params.get('date_from')
-        date_to = self.request.query_params.get('date_to')
-        
-        if date_from:
-            queryset = queryset.filter(date__date__gte=date_from)
-        if date_to:
-            queryset = queryset.filter(date__date__lte=date_to)
-        
-        # If user is youth, only show their own results
-        if self.request.user.role == 'youth':
-            queryset = queryset.filter(patient=self.request.user)
-        
+        # Date range filters live in ScreeningResultFilter; youth only see their own results
+        queryset = visible_screenings(self.request.user, super().get_queryset())
         return queryset.select_related('patient', 'conducted_by')
     
     def perform_create(self, serializer):
@@ -53,6 +73,76 @@ class ScreeningResultListCreateView(generics.ListCreateAPIView):
             serializer.save()
 
 
+class ScreeningResultExportView(generics.GenericAPIView):
+    """Stream screening results as CSV or NDJSON using the list filters"""
+    queryset = ScreeningResult.objects.all()
+    permission_classes = [permissions.IsAuthenticated]
+    filter_backends = ScreeningResultListCreateView.filter_backends
+    filterset_class = ScreeningResultListCreateView.filterset_class
+    search_fields = ScreeningResultListCreateView.search_fields
+    ordering_fields = ScreeningResultListCreateView.ordering_fields
+    ordering = ScreeningResultListCreateView.ordering
+    chunk_size = 2000
+    
+    def get_queryset(self):
+        return visible_screenings(self.request.user, super().get_queryset())
+    
+    def get(self, request):
+        # ``format`` is reserved by DRF content negotiation
+        export_format = request.query_params.get('export_format', 'csv')
+        if export_format not in STREAM_WRITERS:
+            return Response(
+                {'error': f'export_format must be one of: {", ".join(STREAM_WRITERS)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = export_rows(queryset, chunk_size=self.chunk_size)
+        response = StreamingHttpResponse(
+            STREAM_WRITERS[export_format](rows),
+            content_type=EXPORT_CONTENT_TYPES[export_format]
+        )
+        filename = f'screenings-{timezone.localdate():%Y%m%d}.{export_format}'
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
+class ScreeningResultBulkCreateView(APIView):
+    """Create many screening results in one request, e.g. an outreach-day upload"""
+    permission_classes = [permissions.IsAuthenticated]
+    max_records = 5000
+    
+    def post(self, request):
+        if request.user.role not in ['staff', 'peer_navigator']:
+            return Response({'error': 'Insufficient permissions'}, status=status.HTTP_403_FORBIDDEN)
+        
+        # Accept either a bare list or {"records": [...]}
+        records = request.data.get('records') if isinstance(request.data, dict) else request.data
+        if not isinstance(records, list) or not records:
+            return Response({'error': 'Expected a non-empty list of records'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(records) > self.max_records:
+            return Response(
+                {'error': f'At most {self.max_records} records can be uploaded per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        created, errors = ingest_screenings(records, conducted_by=request.user)
+        
+        if not errors:
+            response_status = status.HTTP_201_CREATED
+        elif created:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+        
+        return Response({
+            'created': len(created),
+            'failed': len(errors),
+            'ids': [screening.id for screening in created],
+            'errors': errors,
+        }, status=response_status)
+
+
 class ScreeningResultDetailView(generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update, and delete screening results"""
     queryset = ScreeningResult.objects.all()
@@ -72,8 +162,9 @@ class ScreeningResultDetailView(generics.RetrieveUpdateDestroyAPIView):
         return ScreeningResultSerializer
 
 
-class PatientScreeningHistoryView(generics.ListAPIView):
+class PatientScreeningHistoryView(ScreeningResultFastListMixin, CursorPaginationOptInMixin, generics.ListAPIView):
     """Get screening history for a specific patient"""
+    cursor_pagination_class = ScreeningResultCursorPagination
     serializer_class = ScreeningResultSerializer
     permission_classes = [permissions.IsAuthenticated]
     
@@ -91,21 +182,52 @@ class PatientScreeningHistoryView(generics.ListAPIView):
         return ScreeningResult.objects.none()
 
 
-class AbnormalResultsView(generics.ListAPIView):
+class AbnormalResultsView(CursorPaginationOptInMixin, generics.ListAPIView):
     """Get all abnormal results that require follow-up"""
+    cursor_pagination_class = AbnormalResultCursorPagination
     serializer_class = ScreeningResultSerializer
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        queryset = ScreeningResult.objects.filter(
-            Q(status='abnormal') | Q(requires_follow_up=True)
-        ).select_related('patient', 'conducted_by')
+        # The follow-up queue holds exactly the abnormal or follow-up screenings, so the
+        # page is an index read over it instead of an OR across the screenings table
+        tasks = FollowUpTask.objects.order_by('-screening_date', '-screening_id')
         
         # If user is youth, only show their own abnormal results
         if self.request.user.role == 'youth':
-            queryset = queryset.filter(patient=self.request.user)
+            tasks = tasks.filter(patient=self.request.user)
         
-        return queryset
+        return tasks.values('screening_id', 'screening_date')
+    
+    def list(self, request, *args, **kwargs):
+        tasks = self.get_queryset()
+        page = self.paginate_queryset(tasks)
+        ids = [task['screening_id'] for task in (page if page is not None else tasks)]
+        rows = {
+            row['id']: row
+            for row in ScreeningResultRowSerializer.get_values(ScreeningResult.objects.filter(pk__in=ids))
+        }
+        data = ScreeningResultRowSerializer.serialize(rows[pk] for pk in ids if pk in rows)
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+
+class OverdueFollowUpsView(generics.ListAPIView):
+    """Open follow-ups past their due date, most overdue first; peer navigators see their own"""
+    serializer_class = FollowUpTaskSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def list(self, request, *args, **kwargs):
+        if request.user.role not in ['staff', 'peer_navigator']:
+            return Response({'error': 'Insufficient permissions'}, status=status.HTTP_403_FORBIDDEN)
+        return super().list(request, *args, **kwargs)
+    
+    def get_queryset(self):
+        tasks = FollowUpTask.objects.filter(status='open', due_at__lt=timezone.now())
+        if self.request.user.role == 'peer_navigator':
+            tasks = tasks.filter(peer_navigator=self.request.user)
+        return tasks.select_related('screening', 'patient').order_by('due_at', 'pk')
 
 
 class HealthWorkerProfileView(generics.RetrieveUpdateAPIView):
@@ -162,24 +284,34 @@ def screening_statistics(request):
     if request.user.role not in ['staff', 'peer_navigator']:
         return Response({'error': 'Insufficient permissions'}, status=status.HTTP_403_FORBIDDEN)
     
-    total_screenings = ScreeningResult.objects.count()
-    normal_results = ScreeningResult.objects.filter(status='normal').count()
-    abnormal_results = ScreeningResult.objects.filter(status='abnormal').count()
-    pending_results = ScreeningResult.objects.filter(status='pending').count()
-    follow_up_needed = ScreeningResult.objects.filter(requires_follow_up=True).count()
+    filter_serializer = ScreeningResultFilterSerializer(data=request.query_params)
+    filter_serializer.is_valid(raise_exception=True)
+    params = filter_serializer.validated_data
     
-    # Get counts by test type
-    test_type_counts = {}
-    for test_type in ScreeningResult.TEST_TYPE_CHOICES:
-        test_type_counts[test_type[0]] = ScreeningResult.objects.filter(test_type=test_type[0]).count()
+    # Read from the daily rollup unless the filters need the raw screenings
+    return Response(get_screening_statistics(
+        date_from=params.get('date_from'),
+        date_to=params.get('date_to'),
+        location=params.get('location'),
+        conducted_by=params.get('conducted_by'),
+    ))
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def screening_timeseries(request):
+    """Get screening counts per day, week or month"""
+    if request.user.role not in ['staff', 'peer_navigator']:
+        return Response({'error': 'Insufficient permissions'}, status=status.HTTP_403_FORBIDDEN)
+    
+    filter_serializer = ScreeningTimeseriesFilterSerializer(data=request.query_params)
+    filter_serializer.is_valid(raise_exception=True)
+    params = dict(filter_serializer.validated_data)
+    interval = params.pop('interval')
     
     return Response({
-        'total_screenings': total_screenings,
-        'normal_results': normal_results,
-        'abnormal_results': abnormal_results,
-        'pending_results': pending_results,
-        'follow_up_needed': follow_up_needed,
-        'test_type_breakdown': test_type_counts
+        'interval': interval,
+        'series': compute_rollup_timeseries(interval=interval, **params),
     })
 
 
@@ -203,3 +335,21 @@ def schedule_follow_up(request, screening_id):
         'message': 'Follow-up scheduled successfully',
         'screening': ScreeningResultSerializer(screening).data
     })
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def complete_follow_up(request, task_id):
+    """Mark a follow-up of the queue as done"""
+    if request.user.role not in ['staff', 'peer_navigator']:
+        return Response({'error': 'Insufficient permissions'}, status=status.HTTP_403_FORBIDDEN)
+    
+    task = get_object_or_404(FollowUpTask.objects.select_related('screening', 'patient'), id=task_id)
+    now = timezone.now()
+    FollowUpTask.objects.filter(pk=task.pk, status='open').update(status='done', completed_at=now, updated_at=now)
+    task.refresh_from_db(fields=['status', 'completed_at', 'updated_at'])
+    
+    return Response({
+        'message': 'Follow-up completed successfully',
+        'task': FollowUpTaskSerializer(task).data
+    })
@@ -0,0 +1 @@
+# Media processing app for VSLA Backend
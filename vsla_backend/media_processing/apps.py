@@ -0,0 +1,7 @@
+from django.apps import AppConfig
+
+
+class MediaProcessingConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'vsla_backend.media_processing'
+    verbose_name = 'Media Processing'
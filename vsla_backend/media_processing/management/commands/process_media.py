@@ -0,0 +1,50 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from vsla_backend.media_processing.worker import MediaWorker, backfill
+
+
+class Command(BaseCommand):
+    help = 'Generate image variants and audio metadata for queued uploads on a local process pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=2, help='Size of the process pool')
+        parser.add_argument('--batch-size', type=int, default=20, help='Jobs claimed at a time')
+        parser.add_argument('--lease', type=int, default=300, help='Seconds before an unfinished job is retried')
+        parser.add_argument(
+            '--interval', type=int, default=0,
+            help='Keep running and poll for jobs every this many seconds (0 drains the queue and exits)'
+        )
+        parser.add_argument(
+            '--backfill', action='store_true', help='First queue attachments and profile images never processed'
+        )
+
+    def handle(self, *args, **options):
+        if options['processes'] < 1 or options['batch_size'] < 1:
+            raise CommandError('--processes and --batch-size must be at least 1')
+        if options['interval'] < 0:
+            raise CommandError('--interval cannot be negative')
+
+        if options['backfill']:
+            self.stdout.write(f'Queued {backfill()} files')
+
+        with MediaWorker(options['processes'], options['batch_size'], options['lease']) as worker:
+            total_done = total_failed = 0
+            while True:
+                close_old_connections()
+                started = time.monotonic()
+                done, failed = worker.run_once()
+                total_done += done
+                total_failed += failed
+                if done or failed:
+                    self.stdout.write(
+                        f'{done} processed, {failed} failed in {(time.monotonic() - started) * 1000:.0f} ms'
+                    )
+                    continue
+                if not options['interval']:
+                    break
+                time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(f'Processed {total_done} files, {total_failed} failed'))
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('attachment', 'Chat Attachment'), ('profile_image', 'Profile Image')], max_length=20)),
+                ('object_id', models.PositiveBigIntegerField(help_text='Primary key of the attachment or user')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('locked_until', models.DateTimeField(blank=True, help_text='Lease of the worker running the job', null=True)),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Media Job',
+                'verbose_name_plural': 'Media Jobs',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['status', 'locked_until'], name='media_proce_status_8f7658_idx'), models.Index(fields=['kind', 'object_id'], name='media_proce_kind_83f1aa_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,109 @@
+from datetime import timedelta
+
+from django.db import models
+from django.db.models import F, Q
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from vsla_backend.chat.models import MessageAttachment
+from vsla_backend.users.models import UserProfile
+
+
+class MediaJob(models.Model):
+    """A queued processing job for an uploaded file, claimed by the ``process_media`` worker"""
+    
+    KIND_CHOICES = [
+        ('attachment', 'Chat Attachment'),
+        ('profile_image', 'Profile Image'),
+    ]
+    
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+    
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.PositiveBigIntegerField(help_text="Primary key of the attachment or user")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    locked_until = models.DateTimeField(null=True, blank=True, help_text="Lease of the worker running the job")
+    last_error = models.TextField(blank=True)
+    
+    # Timestamps
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Media Job'
+        verbose_name_plural = 'Media Jobs'
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['status', 'locked_until']),
+            models.Index(fields=['kind', 'object_id']),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_kind_display()} {self.object_id} ({self.status})"
+    
+    @classmethod
+    def enqueue(cls, kind, object_id):
+        """Queue ``object_id`` for processing unless it is already waiting"""
+        if cls.objects.filter(kind=kind, object_id=object_id, status='pending').exists():
+            return None
+        return cls.objects.create(kind=kind, object_id=object_id)
+    
+    @staticmethod
+    def claimable(now):
+        """Jobs nobody holds: pending ones, and running ones whose worker's lease ran out"""
+        return Q(status='pending') | Q(status='running', locked_until__lt=now)
+    
+    @classmethod
+    def claim(cls, limit, lease_seconds=300):
+        """Lease up to ``limit`` jobs to the calling worker, oldest first.
+        
+        Each job is taken with a conditional UPDATE, so concurrent workers
+        never run the same job twice while its lease holds.
+        """
+        from django.utils import timezone
+        now = timezone.now()
+        candidates = cls.objects.filter(cls.claimable(now)).order_by('id').values_list('id', flat=True)[:limit]
+        claimed = [
+            job_id for job_id in list(candidates)
+            if cls.objects.filter(cls.claimable(now), pk=job_id).update(
+                status='running', locked_until=now + timedelta(seconds=lease_seconds), attempts=F('attempts') + 1
+            )
+        ]
+        return list(cls.objects.filter(pk__in=claimed))
+    
+    def mark_done(self):
+        MediaJob.objects.filter(pk=self.pk).update(status='done', locked_until=None, last_error='')
+        self.status = 'done'
+    
+    def mark_failed(self, error, max_attempts=3):
+        """Record a failure and put the job back in the queue until it has used up its attempts"""
+        self.status = 'failed' if self.attempts >= max_attempts else 'pending'
+        self.last_error = str(error)[:2000]
+        MediaJob.objects.filter(pk=self.pk).update(status=self.status, locked_until=None, last_error=self.last_error)
+
+
+@receiver(post_save, sender=MessageAttachment)
+def queue_attachment_processing(sender, instance, created, raw=False, **kwargs):
+    """Process every new chat attachment in the background"""
+    if created and not raw and instance.file:
+        MediaJob.enqueue('attachment', instance.pk)
+
+
+@receiver(post_save, sender=UserProfile)
+def queue_profile_image_processing(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    """Rebuild profile image variants whenever a new image is saved"""
+    if update_fields is not None and 'profile_image' not in update_fields:
+        return
+    if raw or not instance.profile_image or instance.profile_image.name == instance._stored_profile_image:
+        return
+    instance._stored_profile_image = instance.profile_image.name
+    # The old variants belong to the previous image
+    UserProfile.objects.filter(pk=instance.pk).update(profile_image_variants={})
+    instance.profile_image_variants = {}
+    MediaJob.enqueue('profile_image', instance.pk)
@@ -0,0 +1,192 @@
+"""
+CPU-bound media work, run inside the ``process_media`` worker's process pool.
+
+Functions here only touch storage, never the database, and return plain dicts
+so results can cross the process boundary cheaply. The parent process writes
+them to the models.
+"""
+import io
+import os
+import struct
+import wave
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+
+# Longest side in pixels of each downscaled copy; mobile clients pick the smallest that fits
+IMAGE_VARIANTS = getattr(settings, 'MEDIA_IMAGE_VARIANTS', {'thumbnail': 160, 'preview': 640})
+JPEG_QUALITY = getattr(settings, 'MEDIA_JPEG_QUALITY', 70)
+
+# AMR-NB frame sizes in bytes (without the header byte) by frame type; every frame is 20 ms
+AMR_FRAME_SIZES = [12, 13, 15, 17, 19, 20, 26, 31, 5, 0, 0, 0, 0, 0, 0, 0]
+
+
+def process_file(name, file_type, shared=False):
+    """Process one stored file and return the fields to store on its model.
+
+    ``shared`` marks content-addressed files whose variants may already exist
+    because an identical file was processed before.
+    """
+    if file_type == 'image':
+        return process_image(name, shared)
+    if file_type == 'audio':
+        return process_audio(name)
+    return {}
+
+
+def variant_name(name, label):
+    directory, base = os.path.split(name)
+    return os.path.join(directory, 'variants', f'{os.path.splitext(base)[0]}_{label}.jpg')
+
+
+def process_image(name, shared=False):
+    """Build a JPEG of every size in ``IMAGE_VARIANTS`` and report the image dimensions"""
+    with default_storage.open(name, 'rb') as source:
+        image = Image.open(source)
+        width, height = image.size
+        if image.getexif().get(0x0112) in (5, 6, 7, 8):
+            # Rotated by its EXIF orientation, so the displayed size is swapped
+            width, height = height, width
+        # Let the JPEG decoder scale down while decoding instead of inflating full resolution
+        largest = max(IMAGE_VARIANTS.values())
+        image.draft('RGB', (largest, largest))
+        image = ImageOps.exif_transpose(image)
+        image = flatten(image)
+
+        variants = {}
+        for label, size in sorted(IMAGE_VARIANTS.items(), key=lambda item: -item[1]):
+            target = variant_name(name, label)
+            if shared and default_storage.exists(target):
+                variants[label] = target
+                continue
+            copy = image.copy()
+            copy.thumbnail((size, size), Image.LANCZOS)
+            buffer = io.BytesIO()
+            copy.save(buffer, 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+            if default_storage.exists(target):
+                default_storage.delete(target)
+            variants[label] = default_storage.save(target, ContentFile(buffer.getvalue()))
+            # Later, smaller variants start from this one rather than the full image
+            image = copy
+
+    return {'width': width, 'height': height, 'variants': variants}
+
+
+def flatten(image):
+    """Convert to RGB, putting transparent areas on white rather than black"""
+    if image.mode in ('RGBA', 'LA', 'P'):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def process_audio(name):
+    """Read the duration and basic stream details of a voice note from its headers"""
+    with default_storage.open(name, 'rb') as source:
+        head = source.read(64)
+        source.seek(0)
+        if head.startswith(b'RIFF') and head[8:12] == b'WAVE':
+            metadata = wav_metadata(source)
+        elif head.startswith(b'OggS'):
+            metadata = ogg_metadata(source, head)
+        elif head[4:8] == b'ftyp':
+            metadata = mp4_metadata(source)
+        elif head.startswith(b'#!AMR\n'):
+            metadata = amr_metadata(source)
+        else:
+            metadata = {}
+
+    duration = metadata.pop('duration', None)
+    return {'duration': round(duration, 3) if duration is not None else None, 'media_metadata': metadata}
+
+
+def wav_metadata(source):
+    with wave.open(source) as audio:
+        return {
+            'format': 'wav',
+            'duration': audio.getnframes() / audio.getframerate(),
+            'sample_rate': audio.getframerate(),
+            'channels': audio.getnchannels(),
+        }
+
+
+def ogg_metadata(source, head):
+    """Opus or Vorbis in Ogg: the last page's granule position is the sample count"""
+    packet = head[28:]
+    if packet.startswith(b'OpusHead'):
+        channels, pre_skip, sample_rate = struct.unpack('<BHI', packet[9:16])
+        codec, granule_rate = 'opus', 48000
+    elif packet.startswith(b'\x01vorbis'):
+        channels, sample_rate = struct.unpack('<BI', packet[11:16])
+        codec, granule_rate, pre_skip = 'vorbis', sample_rate, 0
+    else:
+        return {'format': 'ogg'}
+
+    source.seek(0, os.SEEK_END)
+    size = source.tell()
+    source.seek(max(0, size - 65536))
+    tail = source.read()
+    last_page = tail.rfind(b'OggS')
+    metadata = {'format': codec, 'sample_rate': sample_rate, 'channels': channels}
+    if last_page >= 0 and granule_rate:
+        granule = struct.unpack('<q', tail[last_page + 6:last_page + 14])[0]
+        metadata['duration'] = max(0, granule - pre_skip) / granule_rate
+    return metadata
+
+
+def mp4_metadata(source):
+    """M4A/3GP: the movie header (``moov/mvhd``) holds the timescale and duration"""
+    source.seek(0, os.SEEK_END)
+    end = source.tell()
+    moov = find_box(source, b'moov', 0, end)
+    mvhd = moov and find_box(source, b'mvhd', *moov)
+    if not mvhd:
+        return {'format': 'mp4'}
+
+    source.seek(mvhd[0])
+    version = source.read(4)[0]
+    if version == 1:
+        timescale, duration = struct.unpack('>IQ', source.read(28)[16:28])
+    else:
+        timescale, duration = struct.unpack('>II', source.read(16)[8:16])
+    metadata = {'format': 'mp4'}
+    if timescale:
+        metadata['duration'] = duration / timescale
+    return metadata
+
+
+def find_box(source, box_type, start, end):
+    """Return the ``(start, end)`` of the payload of the first ``box_type`` box in a range"""
+    position = start
+    while position + 8 <= end:
+        source.seek(position)
+        size, kind = struct.unpack('>I4s', source.read(8))
+        header = 8
+        if size == 1:
+            size = struct.unpack('>Q', source.read(8))[0]
+            header = 16
+        elif size == 0:
+            size = end - position
+        if size < header:
+            return None
+        if kind == box_type:
+            return position + header, position + size
+        position += size
+    return None
+
+
+def amr_metadata(source):
+    source.seek(6)
+    frames = 0
+    while True:
+        header = source.read(1)
+        if not header:
+            break
+        source.seek(AMR_FRAME_SIZES[(header[0] >> 3) & 0x0F], os.SEEK_CUR)
+        frames += 1
+    return {'format': 'amr', 'sample_rate': 8000, 'channels': 1, 'duration': frames * 0.02}
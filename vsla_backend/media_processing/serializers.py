@@ -0,0 +1,18 @@
+from django.core.files.storage import default_storage
+from rest_framework import serializers
+
+
+class VariantURLsField(serializers.Field):
+    """Render a ``{size name: storage name}`` dict as ``{size name: URL}``"""
+    
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+    
+    def to_representation(self, value):
+        request = self.context.get('request')
+        urls = {}
+        for label, name in (value or {}).items():
+            url = default_storage.url(name)
+            urls[label] = request.build_absolute_uri(url) if request is not None else url
+        return urls
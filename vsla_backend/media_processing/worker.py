@@ -0,0 +1,129 @@
+"""
+Drain the ``MediaJob`` queue through a local process pool.
+
+The parent process claims jobs, looks up the files, and writes results back.
+Pool processes only decode and encode media (see ``processors``), so one slow
+video or huge photo never blocks the database connection or the other jobs.
+"""
+import concurrent.futures
+
+import django
+from django.db import connections
+
+from vsla_backend.chat.models import MessageAttachment
+from vsla_backend.users.models import UserProfile
+
+from .models import MediaJob
+from .processors import process_file
+
+
+RESULT_FIELDS = ('variants', 'width', 'height', 'duration', 'media_metadata')
+
+
+class MediaWorker:
+    """Claim jobs in batches and run them on a ``ProcessPoolExecutor``"""
+
+    def __init__(self, processes=2, batch_size=20, lease_seconds=300, max_attempts=3):
+        self.processes = processes
+        self.batch_size = batch_size
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.pool = None
+
+    def __enter__(self):
+        # Forked pool processes must not inherit the parent's open database connections
+        connections.close_all()
+        self.pool = concurrent.futures.ProcessPoolExecutor(max_workers=self.processes, initializer=django.setup)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.pool.shutdown()
+
+    def run_once(self):
+        """Process one batch of jobs, returning ``(done, failed)``"""
+        jobs = MediaJob.claim(self.batch_size, self.lease_seconds)
+        if not jobs:
+            return 0, 0
+
+        attachments = MessageAttachment.objects.in_bulk([job.object_id for job in jobs if job.kind == 'attachment'])
+        profiles = dict(UserProfile.objects.filter(
+            pk__in=[job.object_id for job in jobs if job.kind == 'profile_image']
+        ).values_list('pk', 'profile_image'))
+
+        done = failed = 0
+        futures = {}
+        # Identical attachments in one batch are decoded once; the rest share the result
+        leaders, followers = {}, {}
+        for job in jobs:
+            if job.kind == 'attachment':
+                attachment = attachments.get(job.object_id)
+                # A job whose file has gone is finished too; counting it keeps the loop draining the queue
+                if attachment is None:
+                    job.mark_done()
+                    done += 1
+                elif copy_from_duplicate(attachment):
+                    job.mark_done()
+                    done += 1
+                elif attachment.content_hash and attachment.content_hash in leaders:
+                    followers.setdefault(leaders[attachment.content_hash], []).append(job)
+                else:
+                    if attachment.content_hash:
+                        leaders[attachment.content_hash] = job.pk
+                    futures[self.pool.submit(
+                        process_file, attachment.file.name, attachment.file_type, bool(attachment.content_hash)
+                    )] = (job, attachment.file.name)
+            else:
+                name = profiles.get(job.object_id)
+                if not name:
+                    job.mark_done()
+                    done += 1
+                else:
+                    futures[self.pool.submit(process_file, name, 'image')] = (job, name)
+
+        for future in concurrent.futures.as_completed(futures):
+            job, name = futures[future]
+            for current in [job] + followers.get(job.pk, []):
+                try:
+                    apply_result(current, name, future.result())
+                except Exception as error:
+                    current.mark_failed(error, self.max_attempts)
+                    failed += 1
+                else:
+                    current.mark_done()
+                    done += 1
+        return done, failed
+
+
+def copy_from_duplicate(attachment):
+    """Reuse the results of an already processed attachment with the same content"""
+    if not attachment.content_hash:
+        return False
+    source = MessageAttachment.objects.filter(
+        content_hash=attachment.content_hash, file_size=attachment.file_size, is_processed=True
+    ).exclude(pk=attachment.pk).values(*RESULT_FIELDS).first()
+    if source is None:
+        return False
+    MessageAttachment.objects.filter(pk=attachment.pk).update(is_processed=True, **source)
+    return True
+
+
+def apply_result(job, name, result):
+    if job.kind == 'attachment':
+        MessageAttachment.objects.filter(pk=job.object_id).update(is_processed=True, **result)
+    else:
+        # Skip results for an image the user has replaced since the job was queued
+        UserProfile.objects.filter(pk=job.object_id, profile_image=name).update(
+            profile_image_variants=result.get('variants', {})
+        )
+
+
+def backfill():
+    """Queue every file that was stored before processing existed, returning the count"""
+    queued = 0
+    for pk in MessageAttachment.objects.filter(is_processed=False).exclude(file='').values_list('pk', flat=True):
+        queued += MediaJob.enqueue('attachment', pk) is not None
+    for pk in UserProfile.objects.filter(profile_image_variants={}).exclude(profile_image='').exclude(
+        profile_image__isnull=True
+    ).values_list('pk', flat=True):
+        queued += MediaJob.enqueue('profile_image', pk) is not None
+    return queued
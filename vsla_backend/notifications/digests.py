@@ -0,0 +1,193 @@
+"""
+Build daily digests and weekly summaries for every opted-in user.
+
+A run covers one local day or week. Its users are split into contiguous
+user id ranges, each recorded as a ``DigestPartition``, and the partitions
+are built on a process pool. A partition reads its figures with one grouped
+query per source over its id range (new and abnormal screening results,
+unread direct and room messages, points earned), never a query per user, and
+writes one ``summary`` notification per user with something to report.
+
+Everything a partition writes is committed in the same transaction that marks
+it done, so an interrupted run is resumed by running it again: finished
+partitions are skipped and unfinished ones are rebuilt from scratch.
+"""
+import concurrent.futures
+from datetime import datetime, time, timedelta
+
+import django
+from django.db import connections, transaction
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from vsla_backend.chat.models import ChatRoomParticipant, HealthWorkerMessage
+from vsla_backend.health_screening.models import ScreeningResult
+from vsla_backend.users.models import PointsTransaction, UserProfile
+
+from .models import DigestPartition, DigestRun, NotificationItem
+
+
+EARNING_REASONS = ['award', 'achievement']
+TITLES = {
+    'daily': 'Your daily digest',
+    'weekly': 'Your weekly summary',
+}
+# Named after the NotificationPreference flag each kind answers to
+CATEGORIES = {
+    'daily': 'daily_digest',
+    'weekly': 'weekly_summary',
+}
+
+
+def digest_period(kind, day=None):
+    """``(start, end)`` of the local day, or Monday-to-Monday week, containing ``day`` (default: the last full one)"""
+    today = timezone.localdate()
+    if day is None:
+        day = today - timedelta(days=1 if kind == 'daily' else 7)
+    if kind == 'weekly':
+        day -= timedelta(days=day.weekday())
+    length = timedelta(days=1 if kind == 'daily' else 7)
+    start = timezone.make_aware(datetime.combine(day, time()))
+    return start, timezone.make_aware(datetime.combine(day + length, time()))
+
+
+def recipients(kind):
+    """Active users who want this kind of digest; weekly summaries are on unless turned off"""
+    users = UserProfile.objects.filter(is_active=True)
+    if kind == 'daily':
+        return users.filter(notification_preferences__daily_digest=True)
+    return users.filter(
+        Q(notification_preferences__isnull=True) | Q(notification_preferences__weekly_summary=True)
+    )
+
+
+def start_run(kind, period_start, period_end, partition_size=5000):
+    """The run of this period, creating it and its partitions the first time"""
+    with transaction.atomic():
+        run, created = DigestRun.objects.get_or_create(
+            kind=kind, period_start=period_start, defaults={'period_end': period_end}
+        )
+        if created:
+            bounds = recipients(kind).order_by().values_list('pk', flat=True)
+            first = bounds.order_by('pk').first()
+            last = bounds.order_by('-pk').first()
+            if first is not None:
+                DigestPartition.objects.bulk_create([
+                    DigestPartition(run=run, first_user_id=low, last_user_id=min(low + partition_size - 1, last))
+                    for low in range(first, last + 1, partition_size)
+                ])
+    return run
+
+
+def gather(kind, period_start, period_end, first_user_id, last_user_id):
+    """``{user_id: figures}`` for the opted-in users of an id range, one grouped query per source"""
+    users = recipients(kind).filter(pk__gte=first_user_id, pk__lte=last_user_id).order_by()
+    figures = {
+        pk: {'screenings': 0, 'abnormal': 0, 'unread_messages': 0, 'points': 0}
+        for pk in users.values_list('pk', flat=True)
+    }
+    if not figures:
+        return figures
+
+    screenings = ScreeningResult.objects.filter(
+        patient_id__gte=first_user_id, patient_id__lte=last_user_id, date__gte=period_start, date__lt=period_end
+    ).order_by().values('patient').annotate(total=Count('id'), abnormal=Count('id', filter=Q(status='abnormal')))
+    for row in screenings:
+        if row['patient'] in figures:
+            figures[row['patient']]['screenings'] = row['total']
+            figures[row['patient']]['abnormal'] = row['abnormal']
+
+    # Direct messages sent outside any room; those in a room are counted from its watermark below
+    direct = HealthWorkerMessage.objects.filter(
+        receiver_id__gte=first_user_id, receiver_id__lte=last_user_id, chat_room__isnull=True, is_read=False
+    ).order_by().values('receiver').annotate(total=Count('id'))
+    for row in direct:
+        if row['receiver'] in figures:
+            figures[row['receiver']]['unread_messages'] += row['total']
+
+    # Room messages from others since each participant last read the room, as in the chat inbox,
+    # direct rooms included; muted rooms are left out of the digest
+    unread = HealthWorkerMessage.objects.filter(
+        chat_room=OuterRef('chat_room'), timestamp__gt=OuterRef('read_watermark')
+    ).exclude(sender=OuterRef('user')).order_by().values('chat_room').annotate(total=Count('id')).values('total')
+    rooms = ChatRoomParticipant.objects.filter(
+        user_id__gte=first_user_id, user_id__lte=last_user_id, is_active=True, mute_notifications=False,
+        chat_room__is_active=True,
+    ).annotate(read_watermark=Coalesce('last_read_at', 'joined_at')).annotate(
+        unread=Coalesce(Subquery(unread, output_field=IntegerField()), Value(0))
+    ).order_by().values_list('user_id', 'unread')
+    for user_id, count in rooms:
+        if user_id in figures:
+            figures[user_id]['unread_messages'] += count
+
+    points = PointsTransaction.objects.filter(
+        user_id__gte=first_user_id, user_id__lte=last_user_id, created_at__gte=period_start, created_at__lt=period_end,
+        amount__gt=0, reason__in=EARNING_REASONS,
+    ).order_by().values('user').annotate(total=Sum('amount'))
+    for row in points:
+        if row['user'] in figures:
+            figures[row['user']]['points'] = row['total']
+    return figures
+
+
+def digest_message(figures):
+    lines = []
+    if figures['screenings']:
+        abnormal = f" ({figures['abnormal']} need attention)" if figures['abnormal'] else ''
+        lines.append(f"New screening results: {figures['screenings']}{abnormal}")
+    if figures['unread_messages']:
+        lines.append(f"Unread messages: {figures['unread_messages']}")
+    if figures['points']:
+        lines.append(f"Points earned: {figures['points']}")
+    return '\n'.join(lines)
+
+
+def build_partition(partition_id, lease_seconds=600):
+    """Build one partition if nobody else holds it, returning the digests written or None"""
+    now = timezone.now()
+    claimable = Q(status='pending') | Q(status='running', locked_until__lt=now)
+    if not DigestPartition.objects.filter(claimable, pk=partition_id).update(
+        status='running', locked_until=now + timedelta(seconds=lease_seconds)
+    ):
+        return None
+    partition = DigestPartition.objects.select_related('run').get(pk=partition_id)
+    run = partition.run
+
+    figures = gather(run.kind, run.period_start, run.period_end, partition.first_user_id, partition.last_user_id)
+    items = []
+    for user_id, values in figures.items():
+        message = digest_message(values)
+        if message:
+            items.append(NotificationItem(
+                user_id=user_id, title=TITLES[run.kind], message=message, type='summary', action='view_summary',
+                related_id=str(run.pk), priority=NotificationItem.PRIORITY_LOW, category=CATEGORIES[run.kind],
+            ))
+
+    with transaction.atomic():
+        # Marking it done first is the checkpoint: a build whose lease ran out and was overtaken writes nothing
+        if not DigestPartition.objects.filter(pk=partition_id, status='running').update(
+            status='done', locked_until=None, digests=len(items), completed_at=timezone.now()
+        ):
+            return None
+        NotificationItem.objects.bulk_create(items, batch_size=1000)
+        # bulk_create skips save(), so the unread counters move here
+        UserProfile.adjust_notification_count([item.user_id for item in items], 1)
+    return len(items)
+
+
+def build_run(run, processes=2, lease_seconds=600):
+    """Build every unfinished partition of ``run`` on a process pool, returning ``(partitions, digests)``"""
+    pending = list(run.partitions.exclude(status='done').values_list('pk', flat=True))
+    built = digests = 0
+    if pending:
+        # Forked pool processes must not inherit the parent's open database connections
+        connections.close_all()
+        with concurrent.futures.ProcessPoolExecutor(max_workers=processes, initializer=django.setup) as pool:
+            for written in pool.map(build_partition, pending, [lease_seconds] * len(pending)):
+                if written is not None:
+                    built += 1
+                    digests += written
+    if not run.partitions.exclude(status='done').exists():
+        DigestRun.objects.filter(pk=run.pk, completed_at__isnull=True).update(completed_at=timezone.now())
+    return built, digests
@@ -0,0 +1,144 @@
+"""
+Release scheduled notifications when they fall due.
+
+Due notifications (``scheduled_for`` passed, not yet ``dispatched_at``) are
+read oldest first through the ``(dispatched_at, scheduled_for)`` index and
+leased to one dispatcher with a single conditional UPDATE per batch, so
+several dispatchers can run side by side: a row is only taken while nobody
+else's lease holds, and on databases with row locks the candidates are
+selected with ``SKIP LOCKED`` as well. A dispatcher that dies simply lets its
+lease run out and another one picks the rows up.
+
+Notifications whose user is inside their quiet hours are pushed back to when
+those hours end. The rest are announced through ``notifications_dispatched``,
+which push or socket integrations can connect to, and then marked
+dispatched. Delivery is therefore at least once. Only then do they show in
+the inbox, so that is also when they join their users' unread counters.
+"""
+import uuid
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, Max, Min, Q
+from django.dispatch import Signal
+from django.utils import timezone
+
+from vsla_backend.users.models import UserProfile
+
+from .fanout import in_quiet_hours, quiet_hours_end
+from .models import NotificationItem
+
+
+# Sent with ``notifications``, a list of NotificationItem, for every dispatched batch
+notifications_dispatched = Signal()
+
+
+def due(now):
+    """Scheduled notifications that are due and not held by a live lease"""
+    return Q(dispatched_at__isnull=True, scheduled_for__lte=now) & (
+        Q(claimed_until__isnull=True) | Q(claimed_until__lt=now)
+    )
+
+
+class DispatchResult:
+    """Counts and lag of one dispatch batch"""
+
+    def __init__(self):
+        self.dispatched = self.deferred = 0
+        self.lags = []
+
+    @property
+    def max_lag(self):
+        return max(self.lags, default=0.0)
+
+    @property
+    def median_lag(self):
+        lags = sorted(self.lags)
+        return lags[len(lags) // 2] if lags else 0.0
+
+
+class Dispatcher:
+    """Lease due notifications in batches and release them"""
+
+    def __init__(self, batch_size=500, lease_seconds=60):
+        self.batch_size = batch_size
+        self.lease_seconds = lease_seconds
+        self.token = uuid.uuid4().hex
+
+    def claim(self, now):
+        """Lease up to ``batch_size`` due notifications to this dispatcher, oldest first"""
+        with transaction.atomic():
+            candidates = list(
+                NotificationItem.objects.filter(due(now)).order_by('scheduled_for')
+                .select_for_update(skip_locked=True).values_list('id', flat=True)[:self.batch_size]
+            )
+            if not candidates:
+                return []
+            # Rows another dispatcher leased since the SELECT fail the condition and are left to it
+            NotificationItem.objects.filter(due(now), pk__in=candidates).update(
+                claimed_by=self.token, claimed_until=now + timedelta(seconds=self.lease_seconds)
+            )
+        return list(
+            NotificationItem.objects.filter(pk__in=candidates, claimed_by=self.token).select_related(
+                'user__notification_preferences'
+            )
+        )
+
+    def run_once(self, now=None):
+        """Dispatch one batch, returning a ``DispatchResult``"""
+        now = now or timezone.now()
+        result = DispatchResult()
+        notifications = self.claim(now)
+        if not notifications:
+            return result
+
+        local_time = timezone.localtime(now).time()
+        ready, deferred = [], {}
+        for notification in notifications:
+            preferences = getattr(notification.user, 'notification_preferences', None)
+            if preferences and in_quiet_hours(preferences.quiet_hours_start, preferences.quiet_hours_end, local_time):
+                deferred.setdefault(quiet_hours_end(preferences.quiet_hours_end, now), []).append(notification.pk)
+            else:
+                ready.append(notification)
+
+        for resume_at, ids in deferred.items():
+            NotificationItem.objects.filter(pk__in=ids, claimed_by=self.token).update(
+                scheduled_for=resume_at, claimed_by='', claimed_until=None
+            )
+            result.deferred += len(ids)
+
+        if ready:
+            notifications_dispatched.send(sender=NotificationItem, notifications=ready)
+            dispatched_at = timezone.now()
+            released = NotificationItem.objects.filter(
+                pk__in=[notification.pk for notification in ready], claimed_by=self.token
+            )
+            with transaction.atomic():
+                counts = Counter(released.filter(is_read=False).select_for_update().values_list('user_id', flat=True))
+                result.dispatched = released.update(dispatched_at=dispatched_at, claimed_by='', claimed_until=None)
+                # Released notifications now show in the inbox, so they join the unread counters,
+                # one UPDATE per distinct count
+                users_by_count = defaultdict(list)
+                for user_id, count in counts.items():
+                    users_by_count[count].append(user_id)
+                for count, user_ids in users_by_count.items():
+                    UserProfile.adjust_notification_count(user_ids, count)
+            result.lags = [(dispatched_at - notification.scheduled_for).total_seconds() for notification in ready]
+        return result
+
+
+def dispatch_metrics(now=None):
+    """Backlog and lag of the scheduled notification queue"""
+    now = now or timezone.now()
+    waiting = NotificationItem.objects.filter(dispatched_at__isnull=True, scheduled_for__isnull=False)
+    backlog = waiting.filter(scheduled_for__lte=now).aggregate(count=Count('id'), oldest=Min('scheduled_for'))
+    latest = NotificationItem.objects.aggregate(latest=Max('dispatched_at'))['latest']
+    oldest = backlog['oldest']
+    return {
+        'due': backlog['count'],
+        'in_flight': waiting.filter(claimed_until__gte=now).count(),
+        'scheduled': waiting.filter(scheduled_for__gt=now).count(),
+        'oldest_due_seconds': round((now - oldest).total_seconds(), 1) if oldest else 0.0,
+        'last_dispatched_at': latest,
+    }
@@ -0,0 +1,189 @@
+"""
+Send one notification template to many users.
+
+A campaign such as a health tip to every youth used to cost a render, an
+insert and a template save per recipient. Here the template is compiled once
+into literal and placeholder parts and cached until it is edited; when it
+only uses campaign-wide variables it is rendered once for everybody.
+
+Recipients are read in primary key order, a batch at a time, joined to their
+``NotificationPreference`` in the same query. Users who opted out of the
+notification's type are skipped; users inside their quiet hours get the
+notification scheduled for when those hours end. Each batch is written with
+``bulk_create``, after which the unread counters of the recipients it reached
+straight away and the template's ``usage_count`` are each bumped with one
+``F()`` update.
+"""
+import re
+import time
+from datetime import datetime, timedelta
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from vsla_backend.users.models import UserProfile
+
+from .models import NotificationItem, NotificationTemplate
+
+
+PLACEHOLDER_PATTERN = re.compile(r'\{(\w+)\}')
+
+# Per-user variables every template may use
+USER_VARIABLES = {'first_name', 'last_name', 'username', 'full_name'}
+
+# NotificationPreference flag that lets each notification type through
+PREFERENCE_FIELDS = {
+    'screening_result': 'screening_results',
+    'abnormal_result': 'screening_results',
+    'reminder': 'reminders',
+    'appointment': 'reminders',
+    'follow_up': 'reminders',
+    'achievement': 'achievements',
+    'message': 'messages',
+    'health_tip': 'health_tips',
+    'system': 'system_notifications',
+    'summary': 'system_notifications',
+}
+
+
+class CompiledText:
+    """A template string split once into literal text and ``{variable}`` placeholders"""
+
+    def __init__(self, text):
+        self.parts = []
+        position = 0
+        for match in PLACEHOLDER_PATTERN.finditer(text):
+            self.parts.append((text[position:match.start()], match.group(1)))
+            position = match.end()
+        self.tail = text[position:]
+        self.variables = {name for _, name in self.parts}
+
+    def render(self, context):
+        # Placeholders without a value stay as written, like the old str.replace rendering
+        pieces = []
+        for literal, name in self.parts:
+            pieces.append(literal)
+            pieces.append(str(context[name]) if name in context else f'{{{name}}}')
+        pieces.append(self.tail)
+        return ''.join(pieces)
+
+
+_compiled = {}
+
+
+def compile_template(template):
+    """``(title, message)`` as ``CompiledText``, cached until the template is edited"""
+    key = (template.pk, template.updated_at, template.title_template, template.message_template)
+    compiled = _compiled.get(template.pk)
+    if compiled is None or compiled[0] != key:
+        compiled = (key, CompiledText(template.title_template), CompiledText(template.message_template))
+        _compiled[template.pk] = compiled
+    return compiled[1], compiled[2]
+
+
+def in_quiet_hours(start, end, local_time):
+    """Whether a local wall-clock time falls within quiet hours running from ``start`` to ``end``"""
+    if start is None or end is None or start == end:
+        return False
+    if start < end:
+        return start <= local_time < end
+    # Overnight quiet hours
+    return local_time >= start or local_time < end
+
+
+def quiet_hours_end(end, now):
+    """The next moment, local time, at which quiet hours ending at ``end`` are over"""
+    local = timezone.localtime(now)
+    moment = timezone.make_aware(datetime.combine(local.date(), end), local.tzinfo)
+    if moment <= local:
+        moment = timezone.make_aware(datetime.combine(local.date() + timedelta(days=1), end), local.tzinfo)
+    return moment
+
+
+class FanoutResult:
+    """Counts of one fan-out run"""
+
+    def __init__(self):
+        self.sent = self.skipped = self.deferred = self.batches = 0
+        self.seconds = 0.0
+
+    @property
+    def per_second(self):
+        return self.sent / self.seconds if self.seconds else 0.0
+
+
+def fan_out(template, recipients=None, context=None, batch_size=1000, related_id='', priority=None,
+            category='', now=None):
+    """Create a notification from ``template`` for every user of ``recipients``.
+
+    ``recipients`` is a ``UserProfile`` queryset (default: all active users)
+    and ``context`` the campaign-wide template variables; ``first_name``,
+    ``last_name``, ``username`` and ``full_name`` are filled per user.
+    Returns a ``FanoutResult``.
+    """
+    started = time.perf_counter()
+    now = now or timezone.now()
+    priority = priority or NotificationItem.PRIORITY_MEDIUM
+    context = dict(context or {})
+    title_text, message_text = compile_template(template)
+    personal = bool((title_text.variables | message_text.variables) & (USER_VARIABLES - set(context)))
+    shared_title, shared_message = title_text.render(context), message_text.render(context)
+    local_time = timezone.localtime(now).time()
+    preference = PREFERENCE_FIELDS.get(template.type)
+
+    recipients = (recipients if recipients is not None else UserProfile.objects.filter(is_active=True)).order_by()
+    columns = [
+        'pk', 'first_name', 'last_name', 'username',
+        'notification_preferences__quiet_hours_start', 'notification_preferences__quiet_hours_end',
+    ]
+    if preference:
+        columns.append(f'notification_preferences__{preference}')
+
+    result = FanoutResult()
+    last_pk = 0
+    while True:
+        # Keyset batches over the primary key, each one query joined to the preferences
+        rows = list(recipients.filter(pk__gt=last_pk).order_by('pk').values_list(*columns)[:batch_size])
+        if not rows:
+            break
+        last_pk = rows[-1][0]
+
+        items = []
+        for row in rows:
+            pk, first_name, last_name, username, quiet_start, quiet_end = row[:6]
+            # No preference row means the defaults, which let everything through
+            if preference and row[6] is False:
+                result.skipped += 1
+                continue
+            if personal:
+                full_name = f'{first_name} {last_name}' if first_name and last_name else username
+                values = {
+                    'first_name': first_name, 'last_name': last_name, 'username': username, 'full_name': full_name,
+                    **context,
+                }
+                title, message = title_text.render(values), message_text.render(values)
+            else:
+                title, message = shared_title, shared_message
+            scheduled_for = None
+            if in_quiet_hours(quiet_start, quiet_end, local_time):
+                scheduled_for = quiet_hours_end(quiet_end, now)
+                result.deferred += 1
+            items.append(NotificationItem(
+                user_id=pk, title=title[:200], message=message, type=template.type, action=template.action,
+                related_id=related_id, priority=priority, category=category, scheduled_for=scheduled_for,
+            ))
+
+        if items:
+            with transaction.atomic():
+                NotificationItem.objects.bulk_create(items)
+                # bulk_create skips save(), so move the unread counters and usage here, once per batch;
+                # deferred notifications join the counters when the dispatcher releases them
+                UserProfile.adjust_notification_count([item.user_id for item in items if item.scheduled_for is None], 1)
+                NotificationTemplate.objects.filter(pk=template.pk).update(usage_count=F('usage_count') + len(items))
+        result.sent += len(items)
+        result.batches += 1
+
+    result.seconds = time.perf_counter() - started
+    return result
+
@@ -0,0 +1,79 @@
+import random
+import time
+from datetime import time as clock
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from vsla_backend.notifications.fanout import fan_out
+from vsla_backend.notifications.models import NotificationItem, NotificationPreference, NotificationTemplate
+from vsla_backend.users.models import UserProfile
+
+
+class Command(BaseCommand):
+    help = 'Benchmark fanning a template out to many users against creating notifications one by one'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200_000)
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--sample', type=int, default=2000, help='Users sent to one by one for comparison')
+
+    def handle(self, *args, **options):
+        if options['users'] < 1 or options['batch_size'] < 1 or options['sample'] < 1:
+            raise CommandError('--users, --batch-size and --sample must be at least 1')
+        # Seeded rows are rolled back afterwards
+        with transaction.atomic():
+            self._run(options['users'], options['batch_size'], options['sample'])
+            transaction.set_rollback(True)
+
+    def _seed(self, count, rng):
+        users = UserProfile.objects.bulk_create([
+            UserProfile(username=f'bench-{i}', phone_number=f'bench-{i}', first_name='Youth', last_name=str(i))
+            for i in range(count)
+        ], batch_size=5000)
+        preferences = []
+        for user in users:
+            if rng.random() < 0.3:
+                quiet = rng.random() < 0.3
+                preferences.append(NotificationPreference(
+                    user=user, health_tips=rng.random() < 0.8,
+                    quiet_hours_start=clock(22) if quiet else None, quiet_hours_end=clock(6) if quiet else None,
+                ))
+        NotificationPreference.objects.bulk_create(preferences, batch_size=5000)
+        return users
+
+    def _run(self, count, batch_size, sample):
+        rng = random.Random(42)
+        started = time.perf_counter()
+        users = self._seed(count, rng)
+        self.stdout.write(f'Seeded {count} users in {time.perf_counter() - started:.1f}s')
+        template = NotificationTemplate.objects.create(
+            name='bench-health-tip', title_template='Health tip for {first_name}',
+            message_template='Hi {first_name}, {tip}', type='health_tip', action='view_tip',
+        )
+        recipients = UserProfile.objects.filter(pk__gte=users[0].pk, pk__lte=users[-1].pk)
+        context = {'tip': 'Drink clean water every day.'}
+
+        # What a campaign looked like before: render, save and bump usage per recipient
+        began = time.perf_counter()
+        for user in users[:sample]:
+            rendered = template.render_notification({'first_name': user.first_name, **context})
+            NotificationItem.objects.create(user=user, title=rendered['title'], message=rendered['message'],
+                                            type=rendered['type'], action=rendered['action'])
+            template.usage_count += 1
+            template.save(update_fields=['usage_count'])
+        one_by_one = min(sample, count) / (time.perf_counter() - began)
+        self.stdout.write(f'{"one by one":<12} {one_by_one:10.0f} notifications/s ({min(sample, count)} users)')
+        NotificationItem.objects.filter(user__in=users[:sample]).delete()
+
+        result = fan_out(template, recipients, context, batch_size=batch_size)
+        self.stdout.write(
+            f'{"fan-out":<12} {result.per_second:10.0f} notifications/s ({result.sent} sent, '
+            f'{result.skipped} opted out, {result.deferred} deferred, {result.batches} batches)'
+        )
+
+        expected = recipients.exclude(notification_preferences__health_tips=False).count()
+        stored = NotificationItem.objects.filter(type='health_tip', user__in=recipients).count()
+        if result.sent != expected or stored != expected:
+            raise CommandError(f'Expected {expected} notifications, sent {result.sent}, stored {stored}')
+        self.stdout.write(self.style.SUCCESS(f'Fan-out is {result.per_second / one_by_one:.0f}x the one-by-one rate'))
@@ -0,0 +1,41 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from vsla_backend.notifications.digests import build_run, digest_period, start_run
+
+
+class Command(BaseCommand):
+    help = 'Build daily digests or weekly summaries on a process pool; rerun to resume an interrupted build'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=['daily', 'weekly'])
+        parser.add_argument(
+            '--date', type=date.fromisoformat,
+            help='A day of the period to summarise (default: yesterday, or last week)'
+        )
+        parser.add_argument('--processes', type=int, default=2, help='Size of the process pool')
+        parser.add_argument('--partition-size', type=int, default=5000, help='User ids per partition')
+        parser.add_argument('--lease', type=int, default=600, help='Seconds before an unfinished partition is retried')
+
+    def handle(self, *args, **options):
+        if options['processes'] < 1 or options['partition_size'] < 1:
+            raise CommandError('--processes and --partition-size must be at least 1')
+
+        started = time.monotonic()
+        period_start, period_end = digest_period(options['kind'], options['date'])
+        run = start_run(options['kind'], period_start, period_end, options['partition_size'])
+        total = run.partitions.count()
+        done = run.partitions.filter(status='done').count()
+        if done:
+            self.stdout.write(f'Resuming {run}: {done} of {total} partitions already built')
+
+        built, digests = build_run(run, options['processes'], options['lease'])
+        remaining = run.partitions.exclude(status='done').count()
+        self.stdout.write(
+            f'Built {built} partitions, {digests} digests in {time.monotonic() - started:.1f}s'
+        )
+        if remaining:
+            raise CommandError(f'{remaining} partitions are held by another build or unfinished; run again to resume')
+        self.stdout.write(self.style.SUCCESS(f'{run} is complete'))
@@ -0,0 +1,50 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from vsla_backend.notifications.dispatcher import Dispatcher, dispatch_metrics
+
+
+class Command(BaseCommand):
+    help = 'Release scheduled notifications as they fall due; several dispatchers may run at once'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Notifications leased at a time')
+        parser.add_argument('--lease', type=int, default=60, help='Seconds before an unfinished batch is retried')
+        parser.add_argument(
+            '--interval', type=int, default=0,
+            help='Keep running and poll for due notifications every this many seconds (0 drains and exits)'
+        )
+        parser.add_argument('--status', action='store_true', help='Only print backlog and lag metrics')
+
+    def handle(self, *args, **options):
+        if options['status']:
+            for name, value in dispatch_metrics().items():
+                self.stdout.write(f'{name}: {value}')
+            return
+        if options['batch_size'] < 1 or options['lease'] < 1:
+            raise CommandError('--batch-size and --lease must be at least 1')
+        if options['interval'] < 0:
+            raise CommandError('--interval cannot be negative')
+
+        dispatcher = Dispatcher(options['batch_size'], options['lease'])
+        total_dispatched = total_deferred = 0
+        while True:
+            close_old_connections()
+            result = dispatcher.run_once()
+            total_dispatched += result.dispatched
+            total_deferred += result.deferred
+            if result.dispatched or result.deferred:
+                self.stdout.write(
+                    f'{result.dispatched} dispatched, {result.deferred} deferred to quiet hours end, '
+                    f'lag median {result.median_lag:.1f}s max {result.max_lag:.1f}s'
+                )
+                continue
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Dispatched {total_dispatched} notifications, deferred {total_deferred}'
+        ))
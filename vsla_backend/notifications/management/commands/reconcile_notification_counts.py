@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from vsla_backend.notifications.models import NotificationItem
+from vsla_backend.users.models import UserProfile
+
+
+def unread_count_subquery():
+    """Delivered, unread notifications of the outer user, as a correlated subquery"""
+    unread = (
+        NotificationItem.objects.order_by()
+        .filter(NotificationItem.delivered(), user=OuterRef('pk'), is_read=False)
+        .values('user')
+        .annotate(total=Count('id'))
+        .values('total')
+    )
+    return Coalesce(Subquery(unread, output_field=IntegerField()), Value(0))
+
+
+class Command(BaseCommand):
+    help = 'Recompute every user\'s unread notification counter from their notifications'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Only compare the counters with the notifications and fail if they differ'
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            drifted = list(
+                UserProfile.objects.order_by('id')
+                .annotate(unread=unread_count_subquery())
+                .exclude(notification_count=F('unread'))
+                .values_list('id', 'username', 'notification_count', 'unread')
+            )
+
+            for user_id, username, stored, expected in drifted[:20]:
+                self.stdout.write(f'{username} (#{user_id}): stored {stored}, expected {expected}')
+            if len(drifted) > 20:
+                self.stdout.write(f'... and {len(drifted) - 20} more')
+
+            if options['check']:
+                if drifted:
+                    raise CommandError(f'{len(drifted)} notification counters have drifted')
+                self.stdout.write(self.style.SUCCESS('All notification counters are in sync'))
+                return
+
+            if drifted:
+                UserProfile.objects.filter(pk__in=[row[0] for row in drifted]).update(
+                    notification_count=unread_count_subquery()
+                )
+
+        self.stdout.write(self.style.SUCCESS(f'Reconciled {len(drifted)} notification counters'))
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from vsla_backend.notifications.fanout import fan_out
+from vsla_backend.notifications.models import NotificationTemplate
+from vsla_backend.users.models import UserProfile
+
+
+class Command(BaseCommand):
+    help = 'Send a notification template to every active user, or those of one role, in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('template', help='Name of the NotificationTemplate')
+        parser.add_argument('--role', choices=[choice for choice, _ in UserProfile.ROLE_CHOICES])
+        parser.add_argument('--var', action='append', default=[], metavar='NAME=VALUE', help='Template variable')
+        parser.add_argument('--related-id', default='')
+        parser.add_argument('--category', default='')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+        try:
+            template = NotificationTemplate.objects.get(name=options['template'], is_active=True)
+        except NotificationTemplate.DoesNotExist:
+            raise CommandError(f'No active template named "{options["template"]}"')
+        context = {}
+        for variable in options['var']:
+            name, separator, value = variable.partition('=')
+            if not separator:
+                raise CommandError(f'--var expects NAME=VALUE, got "{variable}"')
+            context[name] = value
+
+        recipients = UserProfile.objects.filter(is_active=True)
+        if options['role']:
+            recipients = recipients.filter(role=options['role'])
+        result = fan_out(
+            template, recipients, context, batch_size=options['batch_size'],
+            related_id=options['related_id'], category=options['category'],
+        )
+
+        self.stdout.write(
+            f'{result.skipped} opted out, {result.deferred} held until their quiet hours end'
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Sent {result.sent} notifications in {result.seconds:.1f}s ({result.per_second:.0f}/s)'
+        ))
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificationitem',
+            name='claimed_by',
+            field=models.CharField(blank=True, help_text='Dispatcher holding the notification', max_length=32),
+        ),
+        migrations.AddField(
+            model_name='notificationitem',
+            name='claimed_until',
+            field=models.DateTimeField(blank=True, help_text='Lease of that dispatcher', null=True),
+        ),
+        migrations.AddField(
+            model_name='notificationitem',
+            name='dispatched_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='notificationitem',
+            index=models.Index(fields=['dispatched_at', 'scheduled_for'], name='notificatio_dispatc_3be74d_idx'),
+        ),
+    ]
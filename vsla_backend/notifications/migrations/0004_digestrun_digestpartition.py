@@ -0,0 +1,50 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:29
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0003_notificationitem_dispatch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DigestRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('daily', 'Daily Digest'), ('weekly', 'Weekly Summary')], max_length=10)),
+                ('period_start', models.DateTimeField()),
+                ('period_end', models.DateTimeField()),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Digest Run',
+                'verbose_name_plural': 'Digest Runs',
+                'ordering': ['-period_start', 'kind'],
+                'unique_together': {('kind', 'period_start')},
+            },
+        ),
+        migrations.CreateModel(
+            name='DigestPartition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('first_user_id', models.PositiveBigIntegerField()),
+                ('last_user_id', models.PositiveBigIntegerField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done')], default='pending', max_length=10)),
+                ('locked_until', models.DateTimeField(blank=True, help_text='Lease of the process building it', null=True)),
+                ('digests', models.PositiveIntegerField(default=0, help_text='Summary notifications written')),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='partitions', to='notifications.digestrun')),
+            ],
+            options={
+                'verbose_name': 'Digest Partition',
+                'verbose_name_plural': 'Digest Partitions',
+                'ordering': ['run', 'first_user_id'],
+                'indexes': [models.Index(fields=['run', 'status'], name='notificatio_run_id_22b908_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:32
+
+from django.db import migrations, models
+
+
+PRIORITY_LEVELS = {'low': 1, 'medium': 2, 'high': 3}
+
+
+def priority_to_level(apps, schema_editor):
+    NotificationItem = apps.get_model('notifications', 'NotificationItem')
+    for name, level in PRIORITY_LEVELS.items():
+        NotificationItem.objects.filter(priority=name).update(priority_level=level)
+
+
+def level_to_priority(apps, schema_editor):
+    NotificationItem = apps.get_model('notifications', 'NotificationItem')
+    for name, level in PRIORITY_LEVELS.items():
+        NotificationItem.objects.filter(priority_level=level).update(priority=name)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0004_digestrun_digestpartition'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='notificationitem',
+            name='notificatio_user_id_9d7c3a_idx',
+        ),
+        migrations.AddField(
+            model_name='notificationitem',
+            name='priority_level',
+            field=models.PositiveSmallIntegerField(choices=[(1, 'Low'), (2, 'Medium'), (3, 'High')], default=2),
+        ),
+        migrations.RunPython(priority_to_level, level_to_priority),
+        migrations.RemoveField(
+            model_name='notificationitem',
+            name='priority',
+        ),
+        migrations.RenameField(
+            model_name='notificationitem',
+            old_name='priority_level',
+            new_name='priority',
+        ),
+        migrations.AddIndex(
+            model_name='notificationitem',
+            index=models.Index(fields=['user', 'is_read', '-timestamp', '-id'], name='notificatio_user_id_fcf52a_idx'),
+        ),
+    ]
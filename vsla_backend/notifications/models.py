@@ -1,4 +1,7 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, Q
+from django.db.models.signals import pre_delete
+from django.dispatch import receiver
 from vsla_backend.users.models import UserProfile
 
 
@@ -31,6 +34,15 @@ class NotificationItem(models.Model):
         ('schedule_maintenance', 'Schedule Maintenance'),
     ]
     
+    PRIORITY_LOW = 1
+    PRIORITY_MEDIUM = 2
+    PRIORITY_HIGH = 3
+    PRIORITY_CHOICES = [
+        (PRIORITY_LOW, 'Low'),
+        (PRIORITY_MEDIUM, 'Medium'),
+        (PRIORITY_HIGH, 'High'),
+    ]
+    
     user = models.ForeignKey(
         UserProfile, 
         on_delete=models.CASCADE, 
@@ -51,12 +63,13 @@ class NotificationItem(models.Model):
     timestamp = models.DateTimeField(auto_now_add=True)
     scheduled_for = models.DateTimeField(null=True, blank=True, help_text="For scheduled notifications")
     
-    # Additional metadata
-    priority = models.CharField(
-        max_length=10, 
-        choices=[('low', 'Low'), ('medium', 'Medium'), ('high', 'High')],
-        default='medium'
-    )
+    # Release of scheduled notifications by the dispatcher (see dispatcher.py)
+    dispatched_at = models.DateTimeField(null=True, blank=True)
+    claimed_by = models.CharField(max_length=32, blank=True, help_text="Dispatcher holding the notification")
+    claimed_until = models.DateTimeField(null=True, blank=True, help_text="Lease of that dispatcher")
+    
+    # Additional metadata; priority is a number so that it sorts by urgency
+    priority = models.PositiveSmallIntegerField(choices=PRIORITY_CHOICES, default=PRIORITY_MEDIUM)
     category = models.CharField(max_length=50, blank=True, help_text="Notification category for grouping")
     
     # Timestamps
@@ -68,21 +81,83 @@ class NotificationItem(models.Model):
         verbose_name_plural = 'Notification Items'
         ordering = ['-timestamp', '-priority']
         indexes = [
-            models.Index(fields=['user', 'is_read', 'timestamp']),
+            # Unread first, newest first: the inbox order (see views.NotificationInboxPagination)
+            models.Index(fields=['user', 'is_read', '-timestamp', '-id']),
             models.Index(fields=['type', 'timestamp']),
             models.Index(fields=['scheduled_for', 'timestamp']),
+            models.Index(fields=['dispatched_at', 'scheduled_for']),
         ]
     
     def __str__(self):
         return f"{self.user.get_full_name()} - {self.title} ({self.type})"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember whether the stored row is counted so save() can move the unread counter
+        if {'is_read', 'scheduled_for', 'dispatched_at'} <= set(field_names):
+            instance._stored_unread_count = instance.counts_as_unread()
+        return instance
+    
+    def refresh_from_db(self, *args, **kwargs):
+        # The row may have changed underneath, e.g. been released by the dispatcher
+        self.__dict__.pop('_stored_unread_count', None)
+        super().refresh_from_db(*args, **kwargs)
+    
+    @staticmethod
+    def delivered():
+        """Notifications the user can see: sent straight away, or released by the dispatcher"""
+        return Q(scheduled_for__isnull=True) | Q(dispatched_at__isnull=False)
+    
+    def counts_as_unread(self):
+        """Whether the notification is delivered and unread, i.e. part of the user's unread counter"""
+        return not self.is_read and (self.scheduled_for is None or self.dispatched_at is not None)
+    
+    def save(self, *args, **kwargs):
+        """Save the notification and keep the user's unread counter in sync"""
+        with transaction.atomic():
+            was_unread = self._stored_unread()
+            super().save(*args, **kwargs)
+            self._stored_unread_count = is_unread = self.counts_as_unread()
+            if was_unread != is_unread:
+                UserProfile.adjust_notification_count(self.user_id, 1 if is_unread else -1)
+    
+    def _stored_unread(self):
+        """Whether the row as stored counts towards the unread counter"""
+        if self._state.adding:
+            return False
+        if not hasattr(self, '_stored_unread_count'):
+            self._stored_unread_count = NotificationItem.objects.filter(
+                self.delivered(), pk=self.pk, is_read=False
+            ).exists()
+        return self._stored_unread_count
+    
     def mark_as_read(self):
-        """Mark notification as read"""
-        self.is_read = True
-        self.save(update_fields=['is_read'])
-        # Update user's notification count
-        self.user.notification_count = max(0, self.user.notification_count - 1)
-        self.user.save(update_fields=['notification_count'])
+        """Mark notification as read once it has been delivered"""
+        with transaction.atomic():
+            # Only the request that actually flips the flag moves the counter
+            updated = NotificationItem.objects.filter(self.delivered(), pk=self.pk, is_read=False).update(is_read=True)
+            if updated:
+                UserProfile.adjust_notification_count(self.user_id, -1)
+                self.is_read = True
+                self._stored_unread_count = False
+    
+    @classmethod
+    def mark_read(cls, user, ids=None):
+        """Mark the delivered, unread notifications of ``user`` among ``ids`` (default: all) as read, returning how many changed"""
+        notifications = cls.objects.filter(cls.delivered(), user=user, is_read=False)
+        if ids is not None:
+            notifications = notifications.filter(pk__in=ids)
+        with transaction.atomic():
+            # One UPDATE; the counter moves by the rows it actually flipped
+            updated = notifications.update(is_read=True)
+            UserProfile.adjust_notification_count(user.pk, -updated)
+        return updated
+    
+    @classmethod
+    def mark_all_as_read(cls, user):
+        """Mark every delivered, unread notification of ``user`` as read, returning how many changed"""
+        return cls.mark_read(user)
     
     def is_scheduled(self):
         """Check if notification is scheduled for future delivery"""
@@ -96,6 +171,13 @@ class NotificationItem(models.Model):
         return True
 
 
+@receiver(pre_delete, sender=NotificationItem)
+def remove_notification_from_counter(sender, instance, **kwargs):
+    """Take an unread notification out of its user's counter before it is deleted"""
+    if instance._stored_unread():
+        UserProfile.adjust_notification_count(instance.user_id, -1)
+
+
 class NotificationTemplate(models.Model):
     """Templates for common notification types"""
     
@@ -127,20 +209,17 @@ class NotificationTemplate(models.Model):
     def __str__(self):
         return f"{self.name} ({self.type})"
     
-    def increment_usage(self):
+    def increment_usage(self, count=1):
         """Increment usage counter"""
-        self.usage_count += 1
-        self.save(update_fields=['usage_count'])
+        NotificationTemplate.objects.filter(pk=self.pk).update(usage_count=F('usage_count') + count)
+        self.refresh_from_db(fields=['usage_count'])
     
     def render_notification(self, context_data):
         """Render notification using template and context data"""
-        title = self.title_template
-        message = self.message_template
-        
-        # Replace variables in templates
-        for key, value in context_data.items():
-            title = title.replace(f"{{{key}}}", str(value))
-            message = message.replace(f"{{{key}}}", str(value))
+        from .fanout import compile_template
+        title_text, message_text = compile_template(self)
+        title = title_text.render(context_data)
+        message = message_text.render(context_data)
         
         return {
             'title': title,
@@ -192,16 +271,63 @@ class NotificationPreference(models.Model):
         return f"{self.user.get_full_name()} - Notification Preferences"
     
     def is_quiet_hours(self):
-        """Check if current time is within quiet hours"""
+        """Check if the current local time is within quiet hours"""
         from django.utils import timezone
-        if not self.quiet_hours_start or not self.quiet_hours_end:
-            return False
-        
-        now = timezone.now().time()
-        start = self.quiet_hours_start
-        end = self.quiet_hours_end
-        
-        if start <= end:
-            return start <= now <= end
-        else:  # Overnight quiet hours
-            return now >= start or now <= end
+        from .fanout import in_quiet_hours
+        return in_quiet_hours(self.quiet_hours_start, self.quiet_hours_end, timezone.localtime().time())
+
+
+class DigestRun(models.Model):
+    """One daily digest or weekly summary build, split into user id partitions (see digests.py)"""
+    
+    KIND_CHOICES = [
+        ('daily', 'Daily Digest'),
+        ('weekly', 'Weekly Summary'),
+    ]
+    
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    period_start = models.DateTimeField()
+    period_end = models.DateTimeField()
+    completed_at = models.DateTimeField(null=True, blank=True)
+    
+    # Timestamps
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name = 'Digest Run'
+        verbose_name_plural = 'Digest Runs'
+        ordering = ['-period_start', 'kind']
+        unique_together = ['kind', 'period_start']
+    
+    def __str__(self):
+        from django.utils import timezone
+        return f"{self.get_kind_display()} from {timezone.localtime(self.period_start):%Y-%m-%d}"
+
+
+class DigestPartition(models.Model):
+    """Checkpoint of one user id range of a digest run; done partitions are skipped on resume"""
+    
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+    ]
+    
+    run = models.ForeignKey(DigestRun, on_delete=models.CASCADE, related_name='partitions')
+    first_user_id = models.PositiveBigIntegerField()
+    last_user_id = models.PositiveBigIntegerField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    locked_until = models.DateTimeField(null=True, blank=True, help_text="Lease of the process building it")
+    digests = models.PositiveIntegerField(default=0, help_text="Summary notifications written")
+    completed_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        verbose_name = 'Digest Partition'
+        verbose_name_plural = 'Digest Partitions'
+        ordering = ['run', 'first_user_id']
+        indexes = [
+            models.Index(fields=['run', 'status']),
+        ]
+    
+    def __str__(self):
+        return f"{self.run} users {self.first_user_id}-{self.last_user_id} ({self.status})"
@@ -0,0 +1,22 @@
+from rest_framework import serializers
+from .models import NotificationItem
+
+
+class NotificationItemSerializer(serializers.ModelSerializer):
+    """Serializer for a user's notifications"""
+    priority_display = serializers.CharField(source='get_priority_display', read_only=True)
+    
+    class Meta:
+        model = NotificationItem
+        fields = [
+            'id', 'title', 'message', 'type', 'action', 'related_id', 'is_read', 'timestamp',
+            'scheduled_for', 'priority', 'priority_display', 'category'
+        ]
+        read_only_fields = fields
+
+
+class NotificationMarkReadSerializer(serializers.Serializer):
+    """Notifications to mark as read; without ``ids`` every unread notification is marked"""
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), required=False, allow_empty=False, max_length=1000
+    )
@@ -0,0 +1,38 @@
+from django.test import TestCase
+
+from vsla_backend.chat.models import ChatRoom, ChatRoomParticipant, HealthWorkerMessage
+from vsla_backend.chat.websocket import create_message
+from vsla_backend.users.models import UserProfile
+
+from .digests import digest_period, gather
+
+
+class DigestUnreadMessagesTests(TestCase):
+    """Unread messages in the weekly summary"""
+
+    def setUp(self):
+        self.sender, self.reader = (
+            UserProfile.objects.create(username=name, email=f'{name}@example.org', phone_number=phone)
+            for name, phone in (('sender', '+260970000001'), ('reader', '+260970000002'))
+        )
+        self.room = ChatRoom.objects.create(room_type='direct', created_by=self.sender)
+        for user in (self.sender, self.reader):
+            ChatRoomParticipant.objects.create(chat_room=self.room, user=user)
+
+    def unread_messages(self):
+        start, end = digest_period('weekly')
+        return gather('weekly', start, end, self.reader.pk, self.reader.pk)[self.reader.pk]['unread_messages']
+
+    def test_direct_room_message_counts_once(self):
+        create_message(self.sender, self.room.pk, 'Hello')
+        self.assertTrue(HealthWorkerMessage.objects.filter(receiver=self.reader, is_read=False).exists())
+        self.assertEqual(self.unread_messages(), 1)
+
+    def test_message_outside_rooms_counts(self):
+        HealthWorkerMessage.objects.create(sender=self.sender, receiver=self.reader, message='Hello')
+        self.assertEqual(self.unread_messages(), 1)
+
+    def test_muted_room_is_left_out(self):
+        ChatRoomParticipant.objects.filter(chat_room=self.room, user=self.reader).update(mute_notifications=True)
+        create_message(self.sender, self.room.pk, 'Hello')
+        self.assertEqual(self.unread_messages(), 0)
@@ -0,0 +1,10 @@
+from django.urls import path
+from . import views
+
+app_name = 'notifications'
+
+urlpatterns = [
+    path('notifications/', views.NotificationInboxView.as_view(), name='notification-inbox'),
+    path('notifications/read/', views.mark_notifications_read, name='notifications-mark-read'),
+    path('notifications/<int:pk>/read/', views.mark_notification_read, name='notification-mark-read'),
+]
@@ -0,0 +1,58 @@
+from django.shortcuts import get_object_or_404
+from rest_framework import generics, permissions
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+from vsla_backend.pagination import KeysetPagination
+from .models import NotificationItem
+from .serializers import NotificationItemSerializer, NotificationMarkReadSerializer
+
+
+class NotificationInboxPagination(KeysetPagination):
+    """Keyset pagination over a user's notifications, unread first, then newest first"""
+    ordering = ('is_read', '-timestamp', '-id')
+
+
+class NotificationInboxView(generics.ListAPIView):
+    """The user's notifications, unread first, paginated by cursor; filter with ``unread`` and ``type``"""
+    serializer_class = NotificationItemSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = NotificationInboxPagination
+    
+    def get_queryset(self):
+        # Read in the pagination order straight off the (user, is_read, -timestamp, -id) index;
+        # scheduled notifications only show up once the dispatcher has released them
+        notifications = NotificationItem.objects.filter(NotificationItem.delivered(), user=self.request.user)
+        if self.request.query_params.get('unread') in ['true', '1']:
+            notifications = notifications.filter(is_read=False)
+        notification_type = self.request.query_params.get('type')
+        if notification_type:
+            notifications = notifications.filter(type=notification_type)
+        return notifications
+
+
+@api_view(['PUT'])
+@permission_classes([permissions.IsAuthenticated])
+def mark_notification_read(request, pk):
+    """Mark one of the user's notifications as read"""
+    notification = get_object_or_404(NotificationItem, NotificationItem.delivered(), pk=pk, user=request.user)
+    notification.mark_as_read()
+    request.user.refresh_from_db(fields=['notification_count'])
+    return Response({
+        'message': 'Notification marked as read',
+        'notifications': request.user.notification_count
+    })
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def mark_notifications_read(request):
+    """Mark the listed notifications, or all of them, as read in one UPDATE"""
+    serializer = NotificationMarkReadSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    
+    updated = NotificationItem.mark_read(request.user, serializer.validated_data.get('ids'))
+    request.user.refresh_from_db(fields=['notification_count'])
+    return Response({
+        'updated': updated,
+        'notifications': request.user.notification_count
+    })
@@ -0,0 +1,82 @@
+"""
+A peer navigator's caseload in one query.
+
+Each open assignment is annotated with correlated subqueries over its
+sessions, which SQLite answers from the ``(assignment, session_date)`` index:
+the latest session's type and follow-up flag, the satisfaction sum and count,
+and the sessions of the last 30 days. The assignments themselves are read
+through the ``(peer_navigator, status)`` index. The dashboard totals are then
+folded from those rows in Python, so the query count does not grow with the
+number of youth.
+"""
+from datetime import timedelta
+
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from vsla_backend.users.models import full_name_expression
+
+from .models import PeerNavigatorAssignment, SupportSession
+
+
+CASELOAD_STATUSES = ['active', 'pending']
+RECENT_DAYS = 30
+
+
+def session_total(aggregate, **filters):
+    """Correlated subquery of one aggregate over an assignment's sessions"""
+    sessions = SupportSession.objects.filter(assignment=OuterRef('pk'), **filters).order_by()
+    return Coalesce(
+        Subquery(sessions.values('assignment').annotate(total=aggregate).values('total')),
+        Value(0), output_field=IntegerField()
+    )
+
+
+def caseload_queryset(navigator, now=None):
+    """Open assignments of ``navigator`` with per-youth session figures, soonest next session first"""
+    now = now or timezone.now()
+    latest = SupportSession.objects.filter(assignment=OuterRef('pk')).order_by('-session_date', '-pk')
+    return PeerNavigatorAssignment.objects.filter(
+        peer_navigator=navigator, status__in=CASELOAD_STATUSES
+    ).select_related('youth').annotate(
+        youth_name=full_name_expression('youth'),
+        last_session_type=Subquery(latest.values('session_type')[:1]),
+        follow_up_needed=Coalesce(Subquery(latest.values('follow_up_needed')[:1]), Value(False)),
+        follow_up_notes=Subquery(latest.values('follow_up_notes')[:1]),
+        satisfaction_total=session_total(Sum('youth_satisfaction'), youth_satisfaction__isnull=False),
+        satisfaction_count=session_total(Count('pk'), youth_satisfaction__isnull=False),
+        recent_sessions=session_total(Count('pk'), session_date__gte=now - timedelta(days=RECENT_DAYS)),
+    ).order_by(F('next_session_date').asc(nulls_last=True), 'pk')
+
+
+def get_caseload(navigator, now=None):
+    """``(summary, assignments)`` of a navigator's dashboard"""
+    now = now or timezone.now()
+    assignments = list(caseload_queryset(navigator, now))
+    satisfaction_total = satisfaction_count = 0
+    summary = {
+        'active_youth': 0,
+        'pending_youth': 0,
+        'overdue_sessions': 0,
+        'unscheduled': 0,
+        'follow_ups_needed': 0,
+        'sessions_last_30_days': 0,
+        'average_satisfaction': None,
+    }
+    for assignment in assignments:
+        assignment.is_overdue = bool(assignment.next_session_date and assignment.next_session_date < now)
+        assignment.average_satisfaction = (
+            round(assignment.satisfaction_total / assignment.satisfaction_count, 2)
+            if assignment.satisfaction_count else None
+        )
+        summary['active_youth' if assignment.status == 'active' else 'pending_youth'] += 1
+        summary['overdue_sessions'] += assignment.is_overdue
+        summary['unscheduled'] += assignment.next_session_date is None
+        summary['follow_ups_needed'] += assignment.follow_up_needed
+        summary['sessions_last_30_days'] += assignment.recent_sessions
+        satisfaction_total += assignment.satisfaction_total
+        satisfaction_count += assignment.satisfaction_count
+    if satisfaction_count:
+        summary['average_satisfaction'] = round(satisfaction_total / satisfaction_count, 2)
+    return summary, assignments
@@ -0,0 +1,95 @@
+import random
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from vsla_backend.peer_navigation.caseload import get_caseload
+from vsla_backend.peer_navigation.models import PeerNavigatorAssignment, SupportSession
+from vsla_backend.peer_navigation.serializers import CaseloadEntrySerializer
+from vsla_backend.users.models import UserProfile
+
+
+SESSION_TYPES = [choice for choice, _ in SupportSession.SESSION_TYPE_CHOICES]
+
+
+class Command(BaseCommand):
+    help = 'Check that the caseload dashboard takes the same number of queries for any caseload size'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1, 10, 100, 1000])
+        parser.add_argument('--sessions', type=int, default=12, help='Support sessions per youth')
+
+    def handle(self, *args, **options):
+        if min(options['sizes']) < 1 or options['sessions'] < 0:
+            raise CommandError('--sizes must be at least 1 and --sessions not negative')
+        # Seeded rows are rolled back afterwards
+        with transaction.atomic():
+            self._run(options['sizes'], options['sessions'])
+            transaction.set_rollback(True)
+
+    def _seed(self, size, sessions, rng, now):
+        navigator = UserProfile.objects.create(
+            username=f'bench-nav-{size}', phone_number=f'bench-nav-{size}', role='peer_navigator'
+        )
+        youth = UserProfile.objects.bulk_create([
+            UserProfile(username=f'bench-{size}-{i}', phone_number=f'bench-{size}-{i}', first_name='Youth', last_name=str(i))
+            for i in range(size)
+        ])
+        assignments = PeerNavigatorAssignment.objects.bulk_create([
+            PeerNavigatorAssignment(
+                youth=person, peer_navigator=navigator, status=rng.choice(['active', 'active', 'pending', 'completed']),
+                total_sessions=sessions,
+                next_session_date=now + timedelta(days=rng.randint(-10, 20)) if rng.random() < 0.8 else None,
+            )
+            for person in youth
+        ])
+        # bulk_create skips SupportSession.save(), which would update the assignment per row
+        SupportSession.objects.bulk_create([
+            SupportSession(
+                assignment=assignment, session_date=now - timedelta(days=rng.randint(0, 120), minutes=i),
+                session_type=rng.choice(SESSION_TYPES), duration_minutes=30,
+                youth_satisfaction=rng.choice([None, 1, 2, 3, 4, 5]), follow_up_needed=rng.random() < 0.2,
+            )
+            for assignment in assignments for i in range(sessions)
+        ], batch_size=5000)
+        return navigator
+
+    def _run(self, sizes, sessions):
+        rng = random.Random(42)
+        now = timezone.now()
+        query_counts = set()
+        for size in sizes:
+            navigator = self._seed(size, sessions, rng, now)
+            with CaptureQueriesContext(connection) as captured:
+                began = time.perf_counter()
+                summary, assignments = get_caseload(navigator, now)
+                CaseloadEntrySerializer(assignments, many=True).data
+                elapsed = (time.perf_counter() - began) * 1000
+            query_counts.add(len(captured))
+            self.stdout.write(
+                f'{size:>6} youth  {len(captured)} queries  {elapsed:8.1f} ms  '
+                f'overdue={summary["overdue_sessions"]} follow-ups={summary["follow_ups_needed"]}'
+            )
+            self._check(navigator, summary, now)
+
+        if len(query_counts) > 1:
+            raise CommandError(f'Query count changes with caseload size: {sorted(query_counts)}')
+        self.stdout.write(self.style.SUCCESS('Query count is constant and figures match a per-youth computation'))
+
+    def _check(self, navigator, summary, now):
+        """Recompute the totals one youth at a time, as the dashboard did before"""
+        expected = {'active_youth': 0, 'pending_youth': 0, 'overdue_sessions': 0, 'follow_ups_needed': 0}
+        ratings = []
+        for assignment in navigator.youth_assignments.filter(status__in=['active', 'pending']):
+            expected['active_youth' if assignment.status == 'active' else 'pending_youth'] += 1
+            expected['overdue_sessions'] += bool(assignment.next_session_date and assignment.next_session_date < now)
+            latest = assignment.sessions.order_by('-session_date', '-pk').first()
+            expected['follow_ups_needed'] += bool(latest and latest.follow_up_needed)
+            ratings.extend(assignment.sessions.exclude(youth_satisfaction=None).values_list('youth_satisfaction', flat=True))
+        average = round(sum(ratings) / len(ratings), 2) if ratings else None
+        if any(summary[key] != value for key, value in expected.items()) or summary['average_satisfaction'] != average:
+            raise CommandError(f'Caseload summary {summary} differs from {expected}, average {average}')
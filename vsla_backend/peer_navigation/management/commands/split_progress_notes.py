@@ -0,0 +1,46 @@
+import re
+from datetime import datetime, timezone
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from vsla_backend.peer_navigation.models import PeerNavigatorAssignment, ProgressNote
+
+
+# Lines the old add_support_session() appended, stamped in UTC: "2025-01-31 14:05: text"
+ENTRY_PATTERN = re.compile(r'^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}): (.*)$')
+
+
+class Command(BaseCommand):
+    help = 'Move the legacy progress_notes text of every assignment into ProgressNote rows'
+
+    def handle(self, *args, **options):
+        moved = notes = 0
+        assignments = PeerNavigatorAssignment.objects.exclude(progress_notes='').only('id', 'progress_notes', 'created_at')
+        for assignment in assignments.iterator():
+            entries = split_entries(assignment.progress_notes, assignment.created_at)
+            with transaction.atomic():
+                for created_at, text in entries:
+                    note = ProgressNote.objects.create(assignment=assignment, note=text)
+                    # auto_now_add stamps the row, so restore the original time afterwards
+                    ProgressNote.objects.filter(pk=note.pk).update(created_at=created_at)
+                PeerNavigatorAssignment.objects.filter(pk=assignment.pk).update(progress_notes='')
+            moved += 1
+            notes += len(entries)
+
+        self.stdout.write(self.style.SUCCESS(f'Moved {notes} notes from {moved} assignments'))
+
+
+def split_entries(text, fallback_time):
+    """``[(created_at, text), ...]`` of a legacy notes field; untimed text keeps ``fallback_time``"""
+    entries = []
+    for line in text.splitlines():
+        match = ENTRY_PATTERN.match(line)
+        if match:
+            stamp = datetime.strptime(match.group(1), '%Y-%m-%d %H:%M').replace(tzinfo=timezone.utc)
+            entries.append([stamp, match.group(2)])
+        elif entries:
+            entries[-1][1] += '\n' + line
+        elif line.strip():
+            entries.append([fallback_time, line])
+    return [(created_at, note.strip()) for created_at, note in entries if note.strip()]
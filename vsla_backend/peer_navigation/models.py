@@ -1,4 +1,5 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Case, F, Q, Value, When
 from vsla_backend.users.models import UserProfile
 
 
@@ -49,7 +50,7 @@ class PeerNavigatorAssignment(models.Model):
     
     # Progress tracking
     goals = models.JSONField(default=list, help_text="Support goals for the youth")
-    progress_notes = models.TextField(blank=True)
+    progress_notes = models.TextField(blank=True, help_text="Legacy notes; new notes are ProgressNote rows")
     completion_date = models.DateTimeField(null=True, blank=True)
     
     # Timestamps
@@ -77,14 +78,36 @@ class PeerNavigatorAssignment(models.Model):
         self.completion_date = timezone.now()
         self.save(update_fields=['status', 'completion_date'])
     
-    def add_support_session(self, session_date, notes=""):
+    def add_support_session(self, session_date, notes="", author=None):
         """Add a support session"""
-        from django.utils import timezone
-        self.total_sessions += 1
-        self.last_session_date = session_date
-        if notes:
-            self.progress_notes += f"\n{timezone.now().strftime('%Y-%m-%d %H:%M')}: {notes}"
-        self.save(update_fields=['total_sessions', 'last_session_date', 'progress_notes'])
+        with transaction.atomic():
+            PeerNavigatorAssignment.record_sessions(self.pk, 1, session_date)
+            if notes:
+                self.add_progress_note(notes, author)
+        self.refresh_from_db(fields=['total_sessions', 'last_session_date'])
+    
+    def add_progress_note(self, note, author=None):
+        """Append a progress note"""
+        return ProgressNote.objects.create(assignment=self, author=author, note=note)
+    
+    @staticmethod
+    def record_sessions(assignment_id, count, latest_session_date):
+        """Atomically count ``count`` new sessions on an assignment.
+        
+        ``total_sessions`` is incremented with ``F()`` so concurrent session
+        logging cannot lose counts, and ``last_session_date`` only moves
+        forward, so back-dated sessions leave it alone.
+        """
+        if not count:
+            return
+        PeerNavigatorAssignment.objects.filter(pk=assignment_id).update(
+            total_sessions=F('total_sessions') + count,
+            last_session_date=Case(
+                When(Q(last_session_date__isnull=True) | Q(last_session_date__lt=latest_session_date),
+                     then=Value(latest_session_date)),
+                default=F('last_session_date'),
+            ),
+        )
     
     def schedule_next_session(self, next_date):
         """Schedule the next support session"""
@@ -144,9 +167,33 @@ class SupportSession(models.Model):
         return f"{self.assignment} - {self.get_session_type_display()} ({self.session_date.strftime('%Y-%m-%d')})"
     
     def save(self, *args, **kwargs):
-        # Update the assignment's last session date
-        if not self.pk:  # Only on creation
-            self.assignment.last_session_date = self.session_date
-            self.assignment.total_sessions += 1
-            self.assignment.save(update_fields=['last_session_date', 'total_sessions'])
-        super().save(*args, **kwargs)
+        # Count the session on its assignment, in SQL so concurrent sessions all count
+        creating = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if creating:
+                PeerNavigatorAssignment.record_sessions(self.assignment_id, 1, self.session_date)
+        if creating and self._meta.get_field('assignment').is_cached(self):
+            self.assignment.refresh_from_db(fields=['total_sessions', 'last_session_date'])
+
+
+class ProgressNote(models.Model):
+    """Append-only progress note on a peer navigator assignment"""
+    
+    assignment = models.ForeignKey(PeerNavigatorAssignment, on_delete=models.CASCADE, related_name='progress_note_entries')
+    author = models.ForeignKey(
+        UserProfile, on_delete=models.SET_NULL, null=True, blank=True, related_name='authored_progress_notes'
+    )
+    note = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name = 'Progress Note'
+        verbose_name_plural = 'Progress Notes'
+        ordering = ['-created_at', '-id']
+        indexes = [
+            models.Index(fields=['assignment', 'created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.assignment_id} - {self.created_at.strftime('%Y-%m-%d %H:%M')}"
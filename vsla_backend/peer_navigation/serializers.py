@@ -0,0 +1,57 @@
+from rest_framework import serializers
+from .models import PeerNavigatorAssignment, ProgressNote, SupportSession
+
+
+class CaseloadEntrySerializer(serializers.ModelSerializer):
+    """One youth on a peer navigator's caseload, from ``caseload.get_caseload``"""
+    youth_name = serializers.CharField(read_only=True)
+    youth_phone = serializers.CharField(source='youth.phone_number', read_only=True)
+    is_overdue = serializers.BooleanField(read_only=True)
+    last_session_type = serializers.CharField(read_only=True, allow_null=True)
+    follow_up_needed = serializers.BooleanField(read_only=True)
+    follow_up_notes = serializers.CharField(read_only=True, allow_null=True)
+    average_satisfaction = serializers.FloatField(read_only=True, allow_null=True)
+    recent_sessions = serializers.IntegerField(read_only=True)
+    
+    class Meta:
+        model = PeerNavigatorAssignment
+        fields = [
+            'id', 'youth', 'youth_name', 'youth_phone', 'status', 'support_areas', 'assigned_date',
+            'total_sessions', 'last_session_date', 'last_session_type', 'next_session_date', 'is_overdue',
+            'follow_up_needed', 'follow_up_notes', 'average_satisfaction', 'recent_sessions'
+        ]
+        read_only_fields = fields
+
+
+class ProgressNoteSerializer(serializers.ModelSerializer):
+    """Serializer for progress notes"""
+    author_name = serializers.CharField(source='author.get_full_name', read_only=True, default=None)
+    
+    class Meta:
+        model = ProgressNote
+        fields = ['id', 'assignment', 'author', 'author_name', 'note', 'created_at']
+        read_only_fields = ['id', 'assignment', 'author', 'created_at']
+
+
+class SupportSessionBulkItemSerializer(serializers.Serializer):
+    """Serializer for one record of a bulk session import.
+    
+    Assignments are checked against ``context['assignments']``, the ids the
+    uploader may log sessions for, fetched once for the whole import.
+    """
+    assignment = serializers.IntegerField()
+    session_date = serializers.DateTimeField()
+    session_type = serializers.ChoiceField(choices=SupportSession.SESSION_TYPE_CHOICES)
+    duration_minutes = serializers.IntegerField(min_value=0)
+    topics_discussed = serializers.ListField(required=False, default=list)
+    goals_set = serializers.ListField(required=False, default=list)
+    actions_agreed = serializers.ListField(required=False, default=list)
+    notes = serializers.CharField(required=False, allow_blank=True, default='')
+    youth_satisfaction = serializers.IntegerField(min_value=1, max_value=5, required=False, allow_null=True)
+    follow_up_needed = serializers.BooleanField(required=False, default=False)
+    follow_up_notes = serializers.CharField(required=False, allow_blank=True, default='')
+    
+    def validate_assignment(self, value):
+        if value not in self.context['assignments']:
+            raise serializers.ValidationError('Assignment not found')
+        return value
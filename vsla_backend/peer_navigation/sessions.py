@@ -0,0 +1,58 @@
+from django.db import transaction
+
+from .models import PeerNavigatorAssignment, SupportSession
+from .serializers import SupportSessionBulkItemSerializer
+
+
+def referenced_assignment_ids(records):
+    """Collect every assignment id mentioned in an upload"""
+    ids = set()
+    for record in records:
+        try:
+            ids.add(int(record['assignment']))
+        except (KeyError, TypeError, ValueError):
+            pass
+    return ids
+
+
+def import_sessions(records, uploaded_by, chunk_size=500):
+    """Validate and insert a batch of support sessions.
+
+    Peer navigators may only log sessions on their own assignments; staff on
+    any. Rows are written with ``bulk_create`` and each assignment's counters
+    are then updated once, however many of its sessions were in the upload.
+
+    Returns ``(created, errors)`` where ``errors`` is a list of
+    ``{'index': ..., 'errors': ...}`` entries for rejected records.
+    """
+    assignments = PeerNavigatorAssignment.objects.filter(
+        pk__in=referenced_assignment_ids(r for r in records if isinstance(r, dict))
+    )
+    if uploaded_by.role != 'staff':
+        assignments = assignments.filter(peer_navigator=uploaded_by)
+    serializer_context = {'assignments': set(assignments.values_list('pk', flat=True))}
+
+    sessions = []
+    errors = []
+    for index, record in enumerate(records):
+        serializer = SupportSessionBulkItemSerializer(data=record, context=serializer_context)
+        if not serializer.is_valid():
+            errors.append({'index': index, 'errors': serializer.errors})
+            continue
+        data = dict(serializer.validated_data)
+        sessions.append(SupportSession(assignment_id=data.pop('assignment'), **data))
+
+    created = []
+    with transaction.atomic():
+        for start in range(0, len(sessions), chunk_size):
+            created.extend(SupportSession.objects.bulk_create(sessions[start:start + chunk_size]))
+
+        # bulk_create bypasses save(), so count the new rows per assignment here
+        totals = {}
+        for session in created:
+            count, latest = totals.get(session.assignment_id, (0, session.session_date))
+            totals[session.assignment_id] = (count + 1, max(latest, session.session_date))
+        for assignment_id, (count, latest) in totals.items():
+            PeerNavigatorAssignment.record_sessions(assignment_id, count, latest)
+
+    return created, errors
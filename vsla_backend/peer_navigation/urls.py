@@ -0,0 +1,13 @@
+from django.urls import path
+from . import views
+
+app_name = 'peer_navigation'
+
+urlpatterns = [
+    path('peer-navigation/caseload/', views.caseload, name='caseload'),
+    path('peer-navigation/sessions/bulk/', views.SupportSessionBulkCreateView.as_view(), name='session-bulk-create'),
+    path(
+        'peer-navigation/assignments/<int:assignment_id>/notes/', views.ProgressNoteListCreateView.as_view(),
+        name='progress-note-list-create'
+    ),
+]
@@ -0,0 +1,92 @@
+from django.shortcuts import get_object_or_404
+from rest_framework import generics, permissions, status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from vsla_backend.users.models import UserProfile
+from .caseload import get_caseload
+from .models import PeerNavigatorAssignment
+from .serializers import CaseloadEntrySerializer, ProgressNoteSerializer
+from .sessions import import_sessions
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def caseload(request):
+    """Dashboard of a peer navigator's open assignments; staff may pass ``navigator``"""
+    if request.user.role not in ['staff', 'peer_navigator']:
+        return Response({'error': 'Insufficient permissions'}, status=status.HTTP_403_FORBIDDEN)
+    
+    navigator = request.user
+    if request.user.role == 'staff' and request.query_params.get('navigator'):
+        navigator_id = request.query_params['navigator']
+        if not navigator_id.isdigit():
+            return Response({'error': 'navigator must be a user id'}, status=status.HTTP_400_BAD_REQUEST)
+        navigator = get_object_or_404(UserProfile, pk=navigator_id, role='peer_navigator')
+    
+    summary, assignments = get_caseload(navigator)
+    return Response({
+        'navigator': navigator.id,
+        'summary': summary,
+        'youth': CaseloadEntrySerializer(assignments, many=True).data,
+    })
+
+
+class ProgressNoteListCreateView(generics.ListCreateAPIView):
+    """List an assignment's progress notes, newest first, or append one"""
+    serializer_class = ProgressNoteSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get_assignment(self):
+        if not hasattr(self, 'assignment'):
+            user = self.request.user
+            if user.role not in ['staff', 'peer_navigator']:
+                raise PermissionDenied('Insufficient permissions')
+            assignments = PeerNavigatorAssignment.objects.all()
+            if user.role != 'staff':
+                assignments = assignments.filter(peer_navigator=user)
+            self.assignment = get_object_or_404(assignments, pk=self.kwargs['assignment_id'])
+        return self.assignment
+    
+    def get_queryset(self):
+        return self.get_assignment().progress_note_entries.select_related('author')
+    
+    def perform_create(self, serializer):
+        serializer.save(assignment=self.get_assignment(), author=self.request.user)
+
+
+class SupportSessionBulkCreateView(APIView):
+    """Log many support sessions in one request, e.g. after an outreach day"""
+    permission_classes = [permissions.IsAuthenticated]
+    max_records = 5000
+    
+    def post(self, request):
+        if request.user.role not in ['staff', 'peer_navigator']:
+            return Response({'error': 'Insufficient permissions'}, status=status.HTTP_403_FORBIDDEN)
+        
+        # Accept either a bare list or {"records": [...]}
+        records = request.data.get('records') if isinstance(request.data, dict) else request.data
+        if not isinstance(records, list) or not records:
+            return Response({'error': 'Expected a non-empty list of records'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(records) > self.max_records:
+            return Response(
+                {'error': f'At most {self.max_records} records can be uploaded per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        created, errors = import_sessions(records, uploaded_by=request.user)
+        
+        if not errors:
+            response_status = status.HTTP_201_CREATED
+        elif created:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+        
+        return Response({
+            'created': len(created),
+            'failed': len(errors),
+            'ids': [session.id for session in created],
+            'errors': errors,
+        }, status=response_status)
@@ -0,0 +1,37 @@
+import time
+
+from django.utils import timezone
+
+from .models import UserReward
+
+
+def sweep_expired_rewards(now=None, chunk_size=1000):
+    """Move rewards past their expiry date to 'expired' in chunked bulk UPDATEs.
+
+    Each chunk selects the next ids from the ``(status, expiry_date)`` index
+    and updates only those rows, so no single statement holds locks on the
+    whole backlog. Returns ``{'swept', 'seconds', 'chunks'}`` where
+    ``chunks`` lists ``(rows, seconds)`` per UPDATE.
+    """
+    now = now or timezone.now()
+    expired = UserReward.objects.filter(status__in=UserReward.EXPIRABLE_STATUSES, expiry_date__lte=now)
+
+    chunks = []
+    started = time.perf_counter()
+    while True:
+        chunk_started = time.perf_counter()
+        ids = list(expired.order_by('expiry_date', 'id').values_list('id', flat=True)[:chunk_size])
+        if not ids:
+            break
+        # Re-check the condition so a reward used meanwhile is left alone;
+        # update() skips auto_now, so updated_at is set explicitly
+        rows = expired.filter(id__in=ids).update(status='expired', updated_at=now)
+        chunks.append((rows, time.perf_counter() - chunk_started))
+        if len(ids) < chunk_size:
+            break
+
+    return {
+        'swept': sum(rows for rows, _ in chunks),
+        'seconds': time.perf_counter() - started,
+        'chunks': chunks,
+    }
@@ -0,0 +1,145 @@
+import random
+import statistics
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection
+from django.db.models import Sum
+
+from vsla_backend.rewards.models import RewardItem, UserReward
+from vsla_backend.rewards.redemption import RedemptionError, redeem_reward
+from vsla_backend.users.models import PointsTransaction, UserProfile
+
+
+class Command(BaseCommand):
+    help = (
+        'Simulate a redemption spike on one limited reward from many threads and check that '
+        'no balance is overdrawn and no unit is sold twice. Seeded rows are deleted afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200, help='Youth accounts competing for the reward')
+        parser.add_argument('--points', type=int, default=100, help='Starting balance of every account')
+        parser.add_argument('--cost', type=int, default=30, help='Points required by the reward')
+        parser.add_argument('--stock', type=int, default=250, help='Units of the reward on offer')
+        parser.add_argument('--attempts', type=int, default=5, help='Redemption attempts per user')
+        parser.add_argument('--workers', type=int, default=16, help='Concurrent client threads')
+        parser.add_argument(
+            '--retry-rate', type=float, default=0.2,
+            help='Share of attempts that are resent with the same idempotency key'
+        )
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        prefix = f'load{uuid.uuid4().hex[:8]}'
+        user_ids, reward_item = self._seed(prefix, options)
+        try:
+            attempts = []
+            for user_id in user_ids:
+                for _ in range(options['attempts']):
+                    key = uuid.uuid4().hex
+                    attempts.append((user_id, key))
+                    if rng.random() < options['retry_rate']:
+                        attempts.append((user_id, key))
+            rng.shuffle(attempts)
+
+            self.stdout.write(
+                f'{len(attempts)} redemption attempts by {len(user_ids)} users on {options["workers"]} threads...'
+            )
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+                results = list(pool.map(lambda attempt: self._attempt(reward_item.pk, *attempt), attempts))
+            elapsed = time.perf_counter() - started
+
+            outcomes = Counter(outcome for outcome, _, _, _ in results)
+            latencies = sorted(latency for _, latency, _, _ in results)
+            self.stdout.write(
+                f'{len(results) / elapsed:.0f} attempts/s, '
+                f'p50 {statistics.median(latencies) * 1000:.1f} ms, '
+                f'p95 {latencies[int(len(latencies) * 0.95) - 1] * 1000:.1f} ms'
+            )
+            for outcome, count in sorted(outcomes.items()):
+                self.stdout.write(f'  {outcome}: {count}')
+
+            self._check(user_ids, reward_item, options, results)
+        finally:
+            UserReward.objects.filter(reward_item=reward_item).delete()
+            reward_item.delete()
+            UserProfile.objects.filter(pk__in=user_ids).delete()
+
+    def _seed(self, prefix, options):
+        UserProfile.objects.bulk_create([
+            UserProfile(username=f'{prefix}{i}', phone_number=f'{prefix}{i}', role='youth', points=options['points'])
+            for i in range(options['users'])
+        ])
+        user_ids = list(UserProfile.objects.filter(username__startswith=prefix).values_list('id', flat=True))
+        PointsTransaction.objects.bulk_create([
+            PointsTransaction(user_id=user_id, amount=options['points'], balance_after=options['points'], reason='snapshot')
+            for user_id in user_ids
+        ])
+        reward_item = RewardItem.objects.create(
+            name='Load test transport voucher', description='Load test', category='transport',
+            points_required=options['cost'], stock=options['stock'], redemption_code=prefix
+        )
+        return user_ids, reward_item
+
+    def _attempt(self, reward_item_id, user_id, key, retries=20):
+        started = time.perf_counter()
+        try:
+            for _ in range(retries):
+                try:
+                    user_reward, created = redeem_reward(UserProfile(pk=user_id), reward_item_id, idempotency_key=key)
+                    outcome = 'redeemed' if created else 'replayed'
+                    return outcome, time.perf_counter() - started, key, user_reward.pk
+                except RedemptionError as error:
+                    return error.code, time.perf_counter() - started, key, None
+                except OperationalError:
+                    # SQLite reports lock contention instead of waiting; back off and retry
+                    time.sleep(0.01)
+            return 'gave_up', time.perf_counter() - started, key, None
+        finally:
+            connection.close()
+
+    def _check(self, user_ids, reward_item, options, results):
+        problems = []
+        redeemed = [result for result in results if result[0] == 'redeemed']
+
+        # Every retry of a key must resolve to the reward its first attempt created
+        by_key = {}
+        for outcome, _, key, user_reward_id in results:
+            if user_reward_id is not None:
+                by_key.setdefault(key, set()).add(user_reward_id)
+        if any(len(ids) > 1 for ids in by_key.values()):
+            problems.append('an idempotency key produced more than one reward')
+
+        reward_item.refresh_from_db(fields=['stock'])
+        rewards = UserReward.objects.filter(reward_item=reward_item)
+        if rewards.count() != len(redeemed):
+            problems.append(f'{rewards.count()} rewards stored for {len(redeemed)} successful redemptions')
+        if reward_item.stock != options['stock'] - len(redeemed):
+            problems.append(f'stock is {reward_item.stock}, expected {options["stock"] - len(redeemed)}')
+
+        spent = dict(rewards.values('user').annotate(total=Sum('points_spent')).values_list('user', 'total'))
+        ledger = dict(
+            PointsTransaction.objects.filter(user_id__in=user_ids).values('user')
+            .annotate(total=Sum('amount')).values_list('user', 'total')
+        )
+        for user_id, points in UserProfile.objects.filter(pk__in=user_ids).values_list('id', 'points'):
+            if points < 0:
+                problems.append(f'user #{user_id} overdrew to {points}')
+            elif points != options['points'] - spent.get(user_id, 0):
+                problems.append(f'user #{user_id} has {points} points after spending {spent.get(user_id, 0)}')
+            elif points != ledger.get(user_id):
+                problems.append(f'user #{user_id} balance {points} disagrees with ledger {ledger.get(user_id)}')
+
+        for problem in problems[:20]:
+            self.stderr.write(problem)
+        if problems:
+            raise CommandError(f'{len(problems)} consistency problems found')
+        self.stdout.write(self.style.SUCCESS(
+            f'No overdrafts: {len(redeemed)} redemptions, {reward_item.stock} units left'
+        ))
@@ -0,0 +1,45 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from vsla_backend.rewards.expiry import sweep_expired_rewards
+
+
+class Command(BaseCommand):
+    help = 'Mark rewards past their expiry date as expired, once or on a fixed interval'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Rows updated per statement')
+        parser.add_argument(
+            '--interval', type=int, default=0,
+            help='Keep running and sweep every this many seconds (0 sweeps once and exits)'
+        )
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be at least 1')
+        if options['interval'] < 0:
+            raise CommandError('--interval cannot be negative')
+
+        while True:
+            started = time.monotonic()
+            # A long-running sweeper must not keep using a connection the server dropped
+            close_old_connections()
+            self.sweep(options['chunk_size'], options['verbosity'])
+            if not options['interval']:
+                return
+            time.sleep(max(0, options['interval'] - (time.monotonic() - started)))
+
+    def sweep(self, chunk_size, verbosity):
+        result = sweep_expired_rewards(chunk_size=chunk_size)
+        if verbosity > 1:
+            for index, (rows, seconds) in enumerate(result['chunks'], 1):
+                self.stdout.write(f'chunk {index}: {rows} rows in {seconds * 1000:.1f} ms')
+
+        chunk_times = [seconds for _, seconds in result['chunks']]
+        slowest = f', slowest chunk {max(chunk_times) * 1000:.1f} ms' if chunk_times else ''
+        self.stdout.write(self.style.SUCCESS(
+            f'Expired {result["swept"]} rewards in {len(chunk_times)} chunks '
+            f'({result["seconds"] * 1000:.1f} ms{slowest})'
+        ))
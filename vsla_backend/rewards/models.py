@@ -1,6 +1,6 @@
-from django.db import models
+from django.db import models, transaction
 from django.core.validators import MinValueValidator
-from vsla_backend.users.models import UserProfile
+from vsla_backend.users.models import PointsTransaction, UserProfile
 
 
 class RewardItem(models.Model):
@@ -22,6 +22,9 @@ class RewardItem(models.Model):
     category = models.CharField(max_length=20, choices=CATEGORY_CHOICES, default='health')
     redemption_code = models.CharField(max_length=50, unique=True)
     expiry_duration_days = models.IntegerField(default=30, validators=[MinValueValidator(1)])
+    stock = models.PositiveIntegerField(
+        null=True, blank=True, help_text="Units left to redeem; leave empty for unlimited"
+    )
     
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
@@ -75,6 +78,9 @@ class UserReward(models.Model):
         ('used', 'Used'),
     ]
     
+    # Statuses that still move to 'expired' once expiry_date has passed
+    EXPIRABLE_STATUSES = ['pending', 'active']
+    
     user = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='rewards')
     reward_item = models.ForeignKey(RewardItem, on_delete=models.CASCADE, related_name='redemptions')
     achievement = models.ForeignKey(Achievement, on_delete=models.CASCADE, related_name='user_achievements', null=True, blank=True)
@@ -84,6 +90,10 @@ class UserReward(models.Model):
     expiry_date = models.DateTimeField()
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     points_spent = models.IntegerField()
+    points_transaction = models.OneToOneField(
+        PointsTransaction, on_delete=models.SET_NULL, null=True, blank=True, related_name='user_reward',
+        help_text="Ledger entry that paid for this redemption"
+    )
     
     # Usage tracking
     used_date = models.DateTimeField(null=True, blank=True)
@@ -98,6 +108,9 @@ class UserReward(models.Model):
         verbose_name_plural = 'User Rewards'
         ordering = ['-redemption_date']
         unique_together = ['user', 'reward_item', 'redemption_date']
+        indexes = [
+            models.Index(fields=['status', 'expiry_date']),
+        ]
     
     def __str__(self):
         return f"{self.user.get_full_name()} - {self.reward_item.name}"
@@ -105,7 +118,12 @@ class UserReward(models.Model):
     def save(self, *args, **kwargs):
         if not self.expiry_date:
             from django.utils import timezone
-            self.expiry_date = timezone.now() + timezone.timedelta(days=self.reward_item.expiry_duration_days)
+            # Reuse a loaded reward item, otherwise read just the one column
+            if UserReward.reward_item.is_cached(self):
+                duration = self.reward_item.expiry_duration_days
+            else:
+                duration = RewardItem.objects.values_list('expiry_duration_days', flat=True).get(pk=self.reward_item_id)
+            self.expiry_date = timezone.now() + timezone.timedelta(days=duration)
         super().save(*args, **kwargs)
     
     def is_expired(self):
@@ -139,6 +157,12 @@ class UserAchievement(models.Model):
     
     def save(self, *args, **kwargs):
         # Award points to user when achievement is unlocked
-        if not self.pk:  # Only on creation
-            self.user.add_points(self.achievement.points_rewarded)
-        super().save(*args, **kwargs)
+        if self.pk or not self.achievement.points_rewarded:
+            return super().save(*args, **kwargs)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            # Keyed on the achievement so a repeated unlock can never pay twice
+            self.user.add_points(
+                self.achievement.points_rewarded, reason='achievement',
+                idempotency_key=f'achievement:{self.achievement_id}', reference=self.achievement_id
+            )
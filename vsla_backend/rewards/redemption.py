@@ -0,0 +1,101 @@
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from vsla_backend.users.models import InsufficientPoints, PointsTransaction
+from .models import RewardItem, UserReward
+
+
+class RedemptionError(Exception):
+    """A redemption that cannot go through; ``code`` says why"""
+
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+
+
+class _Replayed(Exception):
+    """Unwinds a redemption that lost a race with a retry of the same request"""
+
+    def __init__(self, entry):
+        self.entry = entry
+
+
+REDEMPTION_KEY_PREFIX = 'redeem:'
+# Longest client key that still fits PointsTransaction.idempotency_key once prefixed
+MAX_IDEMPOTENCY_KEY_LENGTH = (
+    PointsTransaction._meta.get_field('idempotency_key').max_length - len(REDEMPTION_KEY_PREFIX)
+)
+
+
+def redemption_key(idempotency_key):
+    """Namespace client keys so they cannot collide with other ledger entries"""
+    return f'{REDEMPTION_KEY_PREFIX}{idempotency_key}' if idempotency_key else None
+
+
+def replayed_redemption(user, idempotency_key):
+    """The reward an earlier request with the same key created, if any"""
+    key = redemption_key(idempotency_key)
+    if not key:
+        return None
+    return UserReward.objects.select_related('reward_item').filter(
+        user=user, points_transaction__idempotency_key=key
+    ).first()
+
+
+def redeem_reward(user, reward_item_id, idempotency_key=None):
+    """Redeem a reward item for ``user``, returning ``(user_reward, created)``.
+
+    A limited item's unit is reserved with a conditional ``UPDATE`` (``stock
+    > 0``), the points are taken with another (``points >= n``), and the
+    ``UserReward`` is written in the same short transaction. If any step
+    fails the transaction rolls back and releases the reservation. Rows are
+    always locked item first, then user, so concurrent redemptions queue on
+    the item row instead of deadlocking.
+    """
+    if idempotency_key and len(str(idempotency_key)) > MAX_IDEMPOTENCY_KEY_LENGTH:
+        raise RedemptionError(
+            'invalid_idempotency_key', f'Idempotency key must be at most {MAX_IDEMPOTENCY_KEY_LENGTH} characters'
+        )
+    existing = replayed_redemption(user, idempotency_key)
+    if existing:
+        return existing, False
+
+    reward_item = RewardItem.objects.only(
+        'id', 'name', 'points_required', 'expiry_duration_days', 'stock', 'is_available', 'redemption_code'
+    ).filter(pk=reward_item_id).first()
+    if reward_item is None or not reward_item.is_available:
+        raise RedemptionError('not_found', 'Reward not available')
+
+    try:
+        with transaction.atomic():
+            if reward_item.stock is not None:
+                reserved = RewardItem.objects.filter(pk=reward_item.pk, stock__gt=0).update(stock=F('stock') - 1)
+                if not reserved:
+                    raise RedemptionError('out_of_stock', 'Reward is out of stock')
+                reward_item.stock -= 1
+
+            try:
+                entry, created = PointsTransaction.record(
+                    user.pk, -reward_item.points_required, 'redemption',
+                    idempotency_key=redemption_key(idempotency_key), reference=reward_item.pk
+                )
+            except InsufficientPoints:
+                raise RedemptionError('insufficient_points', 'Insufficient points')
+            if not created:
+                raise _Replayed(entry)
+
+            now = timezone.now()
+            user_reward = UserReward.objects.create(
+                user=user,
+                reward_item=reward_item,
+                points_transaction=entry,
+                status='active',
+                points_spent=reward_item.points_required,
+                expiry_date=now + timezone.timedelta(days=reward_item.expiry_duration_days),
+            )
+    except _Replayed:
+        return replayed_redemption(user, idempotency_key), False
+
+    user.points = entry.balance_after
+    return user_reward, True
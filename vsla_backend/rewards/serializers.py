@@ -0,0 +1,51 @@
+from rest_framework import serializers
+from .models import RewardItem, Achievement, UserReward, UserAchievement
+
+
+class RewardItemSerializer(serializers.ModelSerializer):
+    """Serializer for reward items"""
+    
+    class Meta:
+        model = RewardItem
+        fields = [
+            'id', 'name', 'description', 'points_required', 'image_url', 'is_available',
+            'category', 'expiry_duration_days', 'stock', 'created_at', 'updated_at'
+        ]
+        read_only_fields = ['id', 'created_at', 'updated_at']
+
+
+class AchievementSerializer(serializers.ModelSerializer):
+    """Serializer for achievements"""
+    
+    class Meta:
+        model = Achievement
+        fields = ['id', 'name', 'description', 'points_rewarded', 'icon', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'created_at', 'updated_at']
+
+
+class UserRewardSerializer(serializers.ModelSerializer):
+    """Serializer for a user's reward redemptions"""
+    reward_name = serializers.CharField(source='reward_item.name', read_only=True)
+    redemption_code = serializers.CharField(source='reward_item.redemption_code', read_only=True)
+    
+    class Meta:
+        model = UserReward
+        fields = [
+            'id', 'reward_item', 'reward_name', 'redemption_code', 'redemption_date',
+            'expiry_date', 'status', 'points_spent', 'used_date', 'notes'
+        ]
+        read_only_fields = fields
+
+
+class UserAchievementSerializer(serializers.ModelSerializer):
+    """Serializer for unlocked achievements"""
+    achievement = AchievementSerializer(read_only=True)
+    
+    class Meta:
+        model = UserAchievement
+        fields = ['id', 'achievement', 'unlocked_date']
+
+
+class RewardRedemptionSerializer(serializers.Serializer):
+    """Serializer for reward redemption requests"""
+    reward_item = serializers.IntegerField()
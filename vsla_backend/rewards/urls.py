@@ -0,0 +1,14 @@
+from django.urls import path
+from . import views
+
+app_name = 'rewards'
+
+urlpatterns = [
+    # Reward catalogue and redemption
+    path('rewards/', views.RewardItemListView.as_view(), name='reward-list'),
+    path('rewards/redeem/', views.RewardRedemptionView.as_view(), name='reward-redeem'),
+    
+    # Achievements and history
+    path('achievements/', views.AchievementListView.as_view(), name='achievement-list'),
+    path('user-rewards/', views.UserRewardListView.as_view(), name='user-reward-list'),
+]
@@ -0,0 +1,74 @@
+from rest_framework import status, generics, permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from .models import RewardItem, Achievement, UserReward
+from .redemption import RedemptionError, redeem_reward
+from .serializers import (
+    RewardItemSerializer, AchievementSerializer, UserRewardSerializer,
+    RewardRedemptionSerializer
+)
+
+
+class RewardItemListView(generics.ListAPIView):
+    """List rewards that can currently be redeemed"""
+    serializer_class = RewardItemSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get_queryset(self):
+        queryset = RewardItem.objects.filter(is_available=True)
+        category = self.request.query_params.get('category')
+        if category:
+            queryset = queryset.filter(category=category)
+        return queryset
+
+
+class RewardRedemptionView(APIView):
+    """Redeem a reward item with the current user's points"""
+    permission_classes = [permissions.IsAuthenticated]
+    
+    error_statuses = {
+        'not_found': status.HTTP_404_NOT_FOUND,
+        'out_of_stock': status.HTTP_409_CONFLICT,
+        'insufficient_points': status.HTTP_400_BAD_REQUEST,
+        'invalid_idempotency_key': status.HTTP_400_BAD_REQUEST,
+    }
+    
+    def post(self, request):
+        serializer = RewardRedemptionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        # Mobile clients resend the same key when retrying a timed out request
+        idempotency_key = request.headers.get('Idempotency-Key') or request.data.get('idempotency_key')
+        
+        try:
+            user_reward, created = redeem_reward(
+                request.user, serializer.validated_data['reward_item'], idempotency_key=idempotency_key
+            )
+        except RedemptionError as error:
+            return Response({'error': str(error), 'code': error.code}, status=self.error_statuses[error.code])
+        
+        return Response({
+            'message': 'Reward redeemed successfully' if created else 'Reward already redeemed',
+            'reward': UserRewardSerializer(user_reward).data,
+            'new_balance': request.user.points
+        }, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+
+
+class AchievementListView(generics.ListAPIView):
+    """List all achievements"""
+    queryset = Achievement.objects.all()
+    serializer_class = AchievementSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+
+class UserRewardListView(generics.ListAPIView):
+    """List the current user's redeemed rewards"""
+    serializer_class = UserRewardSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get_queryset(self):
+        queryset = UserReward.objects.filter(user=self.request.user).select_related('reward_item')
+        status_filter = self.request.query_params.get('status')
+        if status_filter:
+            queryset = queryset.filter(status=status_filter)
+        return queryset
@@ -39,6 +39,7 @@ INSTALLED_APPS = [
     'vsla_backend.peer_navigation',
     'vsla_backend.notifications',
     'vsla_backend.chat',
+    'vsla_backend.media_processing',
 ]
 
 MIDDLEWARE = [
@@ -71,6 +72,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'vsla_backend.wsgi.application'
+ASGI_APPLICATION = 'vsla_backend.asgi.application'
 
 # Database
 DATABASES = {
@@ -140,3 +142,10 @@ CORS_ALLOWED_ORIGINS = [
 CORS_ALLOW_ALL_ORIGINS = True
 
 CORS_ALLOW_CREDENTIALS = True
+
+# Real-time chat fan-out. The in-memory layer only reaches clients of the same
+# ASGI worker; with several workers or nodes switch to the Redis layer:
+# {'BACKEND': 'vsla_backend.chat.layers.RedisChannelLayer', 'OPTIONS': {'url': 'redis://localhost:6379/0'}}
+CHAT_CHANNEL_LAYER = {
+    'BACKEND': 'vsla_backend.chat.layers.InMemoryChannelLayer',
+}
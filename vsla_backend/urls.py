@@ -10,6 +10,11 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/v1/', include('vsla_backend.users.urls')),
     path('api/v1/', include('vsla_backend.health_screening.urls')),
+    path('api/v1/', include('vsla_backend.rewards.urls')),
+    path('api/v1/', include('vsla_backend.health_access.urls')),
+    path('api/v1/', include('vsla_backend.chat.urls')),
+    path('api/v1/', include('vsla_backend.peer_navigation.urls')),
+    path('api/v1/', include('vsla_backend.notifications.urls')),
 ]
 
 if settings.DEBUG:
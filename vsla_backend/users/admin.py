@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import UserProfile
+from .models import PointsTransaction, UserProfile
 
 
 @admin.register(UserProfile)
@@ -52,7 +52,24 @@ class UserProfileAdmin(UserAdmin):
 		}),
 	)
 	
-	readonly_fields = ['created_at', 'updated_at', 'last_login', 'date_joined']
+	# Balances only change through the points ledger
+	readonly_fields = ['points', 'created_at', 'updated_at', 'last_login', 'date_joined']
 	
 	def get_queryset(self, request):
 		return super().get_queryset(request).select_related()
+
+
+@admin.register(PointsTransaction)
+class PointsTransactionAdmin(admin.ModelAdmin):
+	"""Read-only admin interface for the points ledger"""
+	
+	list_display = ['user', 'amount', 'balance_after', 'reason', 'reference', 'created_at']
+	list_filter = ['reason', 'created_at']
+	search_fields = ['user__username', 'user__phone_number', 'reference', 'idempotency_key']
+	raw_id_fields = ['user']
+	
+	def has_add_permission(self, request):
+		return False
+	
+	def has_change_permission(self, request, obj=None):
+		return False
@@ -0,0 +1,105 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, Max, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from vsla_backend.users.models import PointsTransaction, UserProfile
+
+
+def ledger_total_subquery():
+    """Sum of the outer user's ledger entries, as a correlated subquery"""
+    total = (
+        PointsTransaction.objects.order_by()
+        .filter(user=OuterRef('pk'))
+        .values('user')
+        .annotate(total=Sum('amount'))
+        .values('total')
+    )
+    return Coalesce(Subquery(total, output_field=IntegerField()), Value(0))
+
+
+class Command(BaseCommand):
+    help = (
+        'Fold old points ledger entries into one snapshot entry per user, and open '
+        'the ledger for balances that predate it'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=90,
+            help='Compact entries older than this many days; keep it well beyond the client retry window, '
+                 'since compacted idempotency keys can be replayed'
+        )
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Only check that every balance equals the sum of its ledger and fail if not'
+        )
+
+    def handle(self, *args, **options):
+        if options['days'] < 1:
+            raise CommandError('--days must be at least 1')
+
+        drifted = list(
+            UserProfile.objects.order_by('id')
+            .annotate(ledger_total=ledger_total_subquery())
+            .exclude(points=F('ledger_total'))
+            .values_list('id', 'username', 'points', 'ledger_total')
+        )
+
+        if options['check']:
+            for user_id, username, points, ledger_total in drifted[:20]:
+                self.stdout.write(f'{username} (#{user_id}): balance {points}, ledger {ledger_total}')
+            if len(drifted) > 20:
+                self.stdout.write(f'... and {len(drifted) - 20} more')
+            if drifted:
+                raise CommandError(f'{len(drifted)} points balances disagree with the ledger')
+            self.stdout.write(self.style.SUCCESS('All points balances match the ledger'))
+            return
+
+        opened = self.open_ledgers(drifted)
+        compacted, removed = self.compact(timezone.now() - datetime.timedelta(days=options['days']))
+        self.stdout.write(self.style.SUCCESS(
+            f'Opened {opened} ledgers; compacted {compacted} users, removing {removed} entries'
+        ))
+
+    def open_ledgers(self, drifted):
+        """Give balances earned before the ledger existed an opening snapshot"""
+        opened = 0
+        for user_id, username, points, ledger_total in drifted:
+            with transaction.atomic():
+                if PointsTransaction.objects.filter(user_id=user_id).exists():
+                    self.stderr.write(f'{username} (#{user_id}): balance {points}, ledger {ledger_total}; left as is')
+                    continue
+                PointsTransaction.objects.create(
+                    user_id=user_id, amount=points, balance_after=points, reason='snapshot'
+                )
+                opened += 1
+        return opened
+
+    def compact(self, cutoff):
+        """Replace each user's entries before ``cutoff`` with their latest one, rewritten as a snapshot"""
+        groups = (
+            PointsTransaction.objects.order_by()
+            .filter(created_at__lt=cutoff)
+            .values('user')
+            .annotate(total=Sum('amount'), entries=Count('id'), last_id=Max('id'))
+            .filter(entries__gt=1)
+        )
+
+        compacted = removed = 0
+        for group in list(groups):
+            with transaction.atomic():
+                old = PointsTransaction.objects.filter(
+                    user_id=group['user'], created_at__lt=cutoff, id__lte=group['last_id']
+                )
+                removed += old.exclude(id=group['last_id']).delete()[0]
+                # The latest entry keeps its timestamp and balance_after, which
+                # already reflect everything folded into it
+                PointsTransaction.objects.filter(id=group['last_id']).update(
+                    amount=group['total'], reason='snapshot', reference='', idempotency_key=None
+                )
+                compacted += 1
+        return compacted, removed
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:48
+
+from django.conf import settings
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PointsTransaction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.IntegerField(help_text='Signed change to the balance')),
+                ('balance_after', models.IntegerField(validators=[django.core.validators.MinValueValidator(0)])),
+                ('reason', models.CharField(choices=[('award', 'Award'), ('achievement', 'Achievement'), ('redemption', 'Redemption'), ('refund', 'Refund'), ('adjustment', 'Adjustment'), ('snapshot', 'Snapshot')], max_length=20)),
+                ('reference', models.CharField(blank=True, help_text='ID of related object', max_length=100)),
+                ('idempotency_key', models.CharField(blank=True, help_text='Client supplied key; retries with the same key are applied once', max_length=64, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='points_transactions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Points Transaction',
+                'verbose_name_plural': 'Points Transactions',
+                'ordering': ['-created_at', '-id'],
+                'indexes': [models.Index(fields=['user', 'created_at'], name='users_point_user_id_4027da_idx')],
+                'unique_together': {('user', 'idempotency_key')},
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_pointstransaction'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='profile_image_variants',
+            field=models.JSONField(blank=True, default=dict, help_text='Downscaled copies of the profile image by size name'),
+        ),
+    ]
@@ -1,4 +1,6 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import Case, F, Q, Value, When
+from django.db.models.functions import Concat, Greatest
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import MinValueValidator, MaxValueValidator
 
@@ -22,6 +24,9 @@ class UserProfile(AbstractUser):
     points = models.IntegerField(default=0, validators=[MinValueValidator(0)])
     notification_count = models.IntegerField(default=0, validators=[MinValueValidator(0)])
     profile_image = models.ImageField(upload_to='profile_images/', blank=True, null=True)
+    profile_image_variants = models.JSONField(
+        default=dict, blank=True, help_text="Downscaled copies of the profile image by size name"
+    )
     age = models.PositiveIntegerField(blank=True, null=True, validators=[MinValueValidator(0), MaxValueValidator(120)])
     location = models.CharField(max_length=200, blank=True)
     interests = models.JSONField(default=list, blank=True)
@@ -36,33 +41,156 @@ class UserProfile(AbstractUser):
         verbose_name_plural = 'User Profiles'
         ordering = ['-created_at']
     
+    _stored_profile_image = None
+    
     def __str__(self):
         return f"{self.get_full_name()} ({self.phone_number})"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored image so saving a new one can queue its variants
+        if 'profile_image' in field_names:
+            instance._stored_profile_image = instance.profile_image.name or None
+        return instance
+    
     def get_full_name(self):
         if self.first_name and self.last_name:
             return f"{self.first_name} {self.last_name}"
         return self.username
     
-    def add_points(self, points_to_add):
+    def add_points(self, points_to_add, reason='award', idempotency_key=None, reference=''):
         """Add points to user's account"""
-        self.points += points_to_add
-        self.save(update_fields=['points'])
+        entry, _ = PointsTransaction.record(self.pk, points_to_add, reason, idempotency_key, reference)
+        self.refresh_from_db(fields=['points'])
+        return entry
     
-    def deduct_points(self, points_to_deduct):
+    def deduct_points(self, points_to_deduct, reason='redemption', idempotency_key=None, reference=''):
         """Deduct points from user's account"""
-        if self.points >= points_to_deduct:
-            self.points -= points_to_deduct
-            self.save(update_fields=['points'])
-            return True
-        return False
+        try:
+            PointsTransaction.record(self.pk, -points_to_deduct, reason, idempotency_key, reference)
+        except InsufficientPoints:
+            return False
+        finally:
+            self.refresh_from_db(fields=['points'])
+        return True
     
-    def increment_notifications(self):
+    def increment_notifications(self, amount=1):
         """Increment notification count"""
-        self.notification_count += 1
-        self.save(update_fields=['notification_count'])
+        UserProfile.adjust_notification_count(self.pk, amount)
+        self.refresh_from_db(fields=['notification_count'])
     
     def clear_notifications(self):
         """Clear notification count"""
+        UserProfile.objects.filter(pk=self.pk).update(notification_count=0)
         self.notification_count = 0
-        self.save(update_fields=['notification_count'])
+    
+    @staticmethod
+    def adjust_notification_count(user_ids, delta):
+        """Atomically add ``delta`` to the unread counter of one or more users.
+        
+        The change is applied in SQL with ``F()`` so concurrent requests cannot
+        lose updates, and the counter never drops below zero.
+        """
+        if not delta:
+            return
+        if not isinstance(user_ids, (list, tuple, set, frozenset)):
+            user_ids = [user_ids]
+        count = F('notification_count') + delta
+        if delta < 0:
+            count = Greatest(count, Value(0))
+        UserProfile.objects.filter(pk__in=user_ids).update(notification_count=count)
+
+
+class InsufficientPoints(Exception):
+    """Raised when a deduction would take a balance below zero"""
+
+
+class PointsTransaction(models.Model):
+    """Append-only ledger of every change to a user's points balance"""
+    
+    REASON_CHOICES = [
+        ('award', 'Award'),
+        ('achievement', 'Achievement'),
+        ('redemption', 'Redemption'),
+        ('refund', 'Refund'),
+        ('adjustment', 'Adjustment'),
+        ('snapshot', 'Snapshot'),
+    ]
+    
+    user = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='points_transactions')
+    amount = models.IntegerField(help_text="Signed change to the balance")
+    balance_after = models.IntegerField(validators=[MinValueValidator(0)])
+    reason = models.CharField(max_length=20, choices=REASON_CHOICES)
+    reference = models.CharField(max_length=100, blank=True, help_text="ID of related object")
+    idempotency_key = models.CharField(
+        max_length=64, null=True, blank=True,
+        help_text="Client supplied key; retries with the same key are applied once"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name = 'Points Transaction'
+        verbose_name_plural = 'Points Transactions'
+        ordering = ['-created_at', '-id']
+        unique_together = ['user', 'idempotency_key']
+        indexes = [
+            models.Index(fields=['user', 'created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.user_id}: {self.amount:+d} ({self.reason})"
+    
+    @classmethod
+    def record(cls, user_id, amount, reason, idempotency_key=None, reference=''):
+        """Apply ``amount`` to the user's balance and append it to the ledger.
+        
+        The balance moves with a single conditional ``UPDATE`` (``points >= n``
+        for deductions), so concurrent requests can neither lose updates nor
+        overdraw. Returns ``(entry, created)``; a repeated ``idempotency_key``
+        returns the original entry without touching the balance.
+        """
+        if idempotency_key:
+            existing = cls.objects.filter(user_id=user_id, idempotency_key=idempotency_key).first()
+            if existing:
+                return existing, False
+        
+        try:
+            with transaction.atomic():
+                users = UserProfile.objects.filter(pk=user_id)
+                if amount < 0:
+                    users = users.filter(points__gte=-amount)
+                if not users.update(points=F('points') + amount):
+                    if not UserProfile.objects.filter(pk=user_id).exists():
+                        raise UserProfile.DoesNotExist
+                    raise InsufficientPoints
+                balance = UserProfile.objects.values_list('points', flat=True).get(pk=user_id)
+                entry = cls.objects.create(
+                    user_id=user_id, amount=amount, balance_after=balance, reason=reason,
+                    reference=str(reference), idempotency_key=idempotency_key or None
+                )
+        except IntegrityError:
+            # A concurrent retry with the same key won; its balance change stands
+            if not idempotency_key:
+                raise
+            return cls.objects.get(user_id=user_id, idempotency_key=idempotency_key), False
+        return entry, True
+
+
+def full_name_expression(prefix=''):
+    """SQL equivalent of ``UserProfile.get_full_name()`` for annotations.
+    
+    ``prefix`` is the relation path to the user, e.g. ``'patient'``. Returns
+    NULL when a nullable relation is empty.
+    """
+    path = f'{prefix}__' if prefix else ''
+    cases = [
+        When(Q(**{f'{path}first_name': ''}) | Q(**{f'{path}last_name': ''}), then=F(f'{path}username')),
+    ]
+    if prefix:
+        cases.insert(0, When(Q(**{f'{prefix}__isnull': True}), then=Value(None)))
+    return Case(
+        *cases,
+        default=Concat(F(f'{path}first_name'), Value(' '), F(f'{path}last_name')),
+        output_field=models.CharField(),
+    )
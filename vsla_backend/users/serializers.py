@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from django.contrib.auth import authenticate
+from vsla_backend.media_processing.serializers import VariantURLsField
 from .models import UserProfile
 
 
@@ -55,13 +56,14 @@ class UserLoginSerializer(serializers.Serializer):
 
 class UserProfileSerializer(serializers.ModelSerializer):
     """Serializer for user profile display and update"""
+    profile_image_variants = VariantURLsField()
     
     class Meta:
         model = UserProfile
         fields = [
             'id', 'username', 'phone_number', 'first_name', 'last_name',
             'email', 'role', 'points', 'notification_count', 'profile_image',
-            'age', 'location', 'interests', 'is_active', 'created_at',
+            'profile_image_variants', 'age', 'location', 'interests', 'is_active', 'created_at',
             'updated_at'
         ]
         read_only_fields = ['id', 'username', 'phone_number', 'points', 'created_at', 'updated_at']
@@ -23,4 +23,5 @@ urlpatterns = [
     # Notifications
     path('notifications/count/', views.user_notifications_count, name='notifications-count'),
     path('notifications/clear/', views.clear_notifications, name='clear-notifications'),
+    path('notifications/dispatch/status/', views.notification_dispatch_status, name='notification-dispatch-status'),
 ]
@@ -5,7 +5,7 @@ from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import login, logout
 from django.shortcuts import get_object_or_404
-from .models import UserProfile
+from .models import PointsTransaction, UserProfile
 from .serializers import (
     UserRegistrationSerializer, UserLoginSerializer, UserProfileSerializer,
     UserProfileUpdateSerializer, ChangePasswordSerializer
@@ -43,9 +43,6 @@ class UserLoginView(APIView):
             login(request, user)
             refresh = RefreshToken.for_user(user)
             
-            # Update notification count
-            user.increment_notifications()
-            
             return Response({
                 'message': 'Login successful',
                 'user': UserProfileSerializer(user).data,
@@ -123,16 +120,34 @@ class UserPointsView(APIView):
             return Response({'error': 'Insufficient permissions'}, status=status.HTTP_403_FORBIDDEN)
         
         user_id = request.data.get('user_id')
-        points_to_add = request.data.get('points', 0)
+        try:
+            points_to_add = int(request.data.get('points', 0))
+        except (TypeError, ValueError):
+            return Response({'error': 'points must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        if points_to_add <= 0:
+            return Response({'error': 'points must be positive'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Mobile clients resend the same key when retrying a timed out request
+        idempotency_key = request.headers.get('Idempotency-Key') or request.data.get('idempotency_key')
+        max_key_length = PointsTransaction._meta.get_field('idempotency_key').max_length
+        if idempotency_key and len(str(idempotency_key)) > max_key_length:
+            return Response(
+                {'error': f'Idempotency key must be at most {max_key_length} characters'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
         try:
-            user = UserProfile.objects.get(id=user_id)
-            user.add_points(points_to_add)
+            entry, created = PointsTransaction.record(
+                user_id, points_to_add, 'adjustment',
+                idempotency_key=idempotency_key, reference=request.user.id
+            )
             return Response({
-                'message': f'{points_to_add} points added successfully',
-                'new_balance': user.points
+                'message': f'{entry.amount} points added successfully',
+                'new_balance': entry.balance_after,
+                'transaction_id': entry.id,
+                'replayed': not created
             }, status=status.HTTP_200_OK)
-        except UserProfile.DoesNotExist:
+        except (UserProfile.DoesNotExist, ValueError):
             return Response({'error': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
 
 
@@ -152,6 +167,8 @@ class UserListByRoleView(generics.ListAPIView):
 @permission_classes([permissions.IsAuthenticated])
 def user_notifications_count(request):
     """Get user notifications count"""
+    # Answered from the denormalized counter on the user row loaded by
+    # authentication, so the notifications table is never touched here
     user = request.user
     return Response({
         'user_id': user.id,
@@ -159,12 +176,26 @@ def user_notifications_count(request):
     })
 
 
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def notification_dispatch_status(request):
+    """Backlog and lag of scheduled notification dispatch, for monitoring"""
+    from vsla_backend.notifications.dispatcher import dispatch_metrics
+    
+    if request.user.role != 'staff':
+        return Response({'error': 'Insufficient permissions'}, status=status.HTTP_403_FORBIDDEN)
+    return Response(dispatch_metrics())
+
+
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
 def clear_notifications(request):
     """Clear user notifications"""
+    from vsla_backend.notifications.models import NotificationItem
+    
     user = request.user
-    user.clear_notifications()
+    NotificationItem.mark_all_as_read(user)
+    user.refresh_from_db(fields=['notification_count'])
     return Response({
         'message': 'Notifications cleared successfully',
         'notifications': user.notification_count